@@ -1,9 +1,14 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, stream_with_context, g
 from flask_cors import CORS
-from services import SimulationEngine
+from services import SimulationEngine, SUPPORTED_YEARS, SCENARIOS, BASE_YEAR, HORIZON_END, STATS_LAYERS
+from tiles import MVT_MIMETYPE
+from executor import Overloaded
+import metrics
 from dotenv import load_dotenv
 import os
 import json
+import hashlib
+import time
 
 # Load env vars
 load_dotenv()
@@ -11,8 +16,44 @@ load_dotenv()
 app = Flask(__name__, static_folder='static', template_folder='templates')
 CORS(app)  # Enable CORS
 
-# Initialize simulation engine
+# Initialize simulation engine and precompute every year/scenario in the background
 engine = SimulationEngine()
+engine.start_warm_up()
+
+# Send per-stage timings of each request to browsers as a Server-Timing header
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# Seconds clients are asked to wait when the simulation queue is full
+OVERLOAD_RETRY_AFTER = 2
+
+SCENARIO_ERROR = f"Invalid scenario. Supported: {', '.join(SCENARIOS)} or a scenario_id from POST /api/scenarios"
+
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    g.timing_token = metrics.begin_request()
+
+@app.after_request
+def finish_request_timing(response):
+    token = g.pop('timing_token', None)
+    if token is None:
+        return response
+    timings = metrics.end_request(token)
+    elapsed = time.perf_counter() - g.pop('request_start')
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.HTTP_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = metrics.server_timing_header(timings + [("total", elapsed)])
+    return response
+
+def overloaded(e):
+    """503 with Retry-After for requests turned away by the simulation queue."""
+    return jsonify({"error": str(e)}), 503, {'Retry-After': str(OVERLOAD_RETRY_AFTER)}
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Stage timings, payload sizes, cache hit/miss counts and request latency (Prometheus text format)."""
+    return app.response_class(metrics.REGISTRY.render(), content_type=metrics.PROMETHEUS_MIMETYPE)
 
 @app.route('/')
 def index():
@@ -28,40 +69,356 @@ def get_predictions():
         year = int(request.args.get('year', 2025))
         scenario = request.args.get('scenario', 'Before')
         
-        if year not in [2025, 2030, 2035, 2040]:
-            return jsonify({"error": "Invalid year. Supported: 2025, 2030, 2035, 2040"}), 400
-            
-        print(f"Generating prediction for Year: {year}, Scenario: {scenario}")
-        
-        df = engine.get_prediction(year, scenario)
-        geojson_str = engine.to_geojson(df)
-        
-        return geojson_str, 200, {'Content-Type': 'application/json'}
+        if year not in SUPPORTED_YEARS:
+            return jsonify({"error": f"Invalid year. Supported: {', '.join(map(str, SUPPORTED_YEARS))}"}), 400
+        if not engine.has_scenario(scenario):
+            return jsonify({"error": SCENARIO_ERROR}), 400
+
+        # ?format=geojson (default) or ?format=binary (columnar float32 grid frame)
+        fmt = request.args.get('format', 'geojson')
+
+        # ?stream=1 (or ?format=ndjson) sends features as they are predicted, chunk by chunk
+        if request.args.get('stream') == '1' or fmt == 'ndjson':
+            body, mimetype = engine.stream_encoded(year, scenario, fmt)
+            return app.response_class(stream_with_context(body), mimetype=mimetype)
+
+        result = engine.get_encoded(year, scenario, fmt)
+
+        # Clients revalidate with If-None-Match and get a 304 while the result is unchanged
+        response = app.response_class(result.body, mimetype=result.mimetype)
+        response.set_etag(result.etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
         
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/stats', methods=['GET'])
+def get_layer_stats():
+    """
+    Per-layer summary statistics (quantiles, legend breaks, histogram) so clients can
+    style tiles or streamed chunks without the full grid. ?metric=a,b selects layers;
+    ?sketch=1 adds each layer's mergeable quantile sketch.
+    """
+    try:
+        year = int(request.args.get('year', 2025))
+        scenario = request.args.get('scenario', 'Before')
+        if not engine.has_scenario(scenario):
+            return jsonify({"error": SCENARIO_ERROR}), 400
+        layers = [m for m in request.args.get('metric', ','.join(STATS_LAYERS)).split(',') if m.strip()]
+        unknown = [m for m in layers if m not in STATS_LAYERS]
+        if unknown or not layers:
+            return jsonify({"error": f"Unknown metric. Supported: {', '.join(STATS_LAYERS)}"}), 400
+
+        stats = engine.get_stats(year, scenario)
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    keep_sketch = request.args.get('sketch') == '1'
+    body = json.dumps({
+        "year": year,
+        "scenario": scenario,
+        "layers": {
+            m: stats[m] if keep_sketch else {k: v for k, v in stats[m].items() if k != 'sketch'}
+            for m in layers
+        },
+    }).encode('utf-8')
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/surface-3d', methods=['GET'])
+def get_surface_3d():
+    """GeoJSON cells of ?metric= with a server-side extrusion height (metres) for the Cesium view."""
+    try:
+        year, scenario = parse_year_scenario(request.args)
+        result = engine.get_surface_3d(year, scenario, request.args.get('metric', 'heat_risk_index'))
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    response = app.response_class(result.body, mimetype=result.mimetype)
+    response.set_etag(result.etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/predictions/horizon', methods=['GET'])
+def get_prediction_horizon():
+    """Per-cell time series for many years from one batched prediction."""
+    try:
+        scenario = request.args.get('scenario', 'Before')
+        if not engine.has_scenario(scenario):
+            return jsonify({"error": SCENARIO_ERROR}), 400
+
+        # Either an explicit list (?years=2025,2031,2040) or a range (?start=&end=&step=)
+        if 'years' in request.args:
+            years = [int(y) for y in request.args['years'].split(',') if y.strip()]
+        else:
+            start = int(request.args.get('start', BASE_YEAR))
+            end = int(request.args.get('end', HORIZON_END))
+            step = int(request.args.get('step', 1))
+            if step < 1:
+                return jsonify({"error": "step must be a positive number of years"}), 400
+            years = list(range(start, end + 1, step))
+
+        horizon = engine.predict_horizon(years, scenario)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    body = json.dumps({
+        "years": horizon["years"].tolist(),
+        "scenario": horizon["scenario"],
+        "cells": {k: v.tolist() for k, v in horizon["cells"].items()},
+        "series": {k: v.tolist() for k, v in horizon["series"].items()},
+    })
+    return body, 200, {'Content-Type': 'application/json'}
+
+@app.route('/api/ensemble', methods=['GET'])
+def get_ensemble():
+    """Per-cell mean and P10/P90 heat risk over a Monte Carlo ensemble of growth rates."""
+    try:
+        year = int(request.args.get('year', 2025))
+        scenario = request.args.get('scenario', 'Before')
+        members = int(request.args.get('members', 200))
+        seed = int(request.args.get('seed', 0))
+        if scenario not in SCENARIOS:
+            return jsonify({"error": f"Invalid scenario. Supported: {', '.join(SCENARIOS)}"}), 400
+
+        ensemble = engine.predict_ensemble(year, scenario, members, seed)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    body = json.dumps({
+        "year": ensemble["year"],
+        "scenario": ensemble["scenario"],
+        "members": ensemble["members"],
+        "seed": ensemble["seed"],
+        "cells": {k: v.tolist() for k, v in ensemble["cells"].items()},
+        "heat_risk_index": {k: v.tolist() for k, v in ensemble["heat_risk_index"].items()},
+    })
+    return body, 200, {'Content-Type': 'application/json'}
+
+def parse_year_scenario(args):
+    """Validated (year, scenario) from request args or a JSON body; raises ValueError."""
+    year = int(args.get('year', 2025))
+    scenario = args.get('scenario', 'Before')
+    if year not in SUPPORTED_YEARS:
+        raise ValueError(f"Invalid year. Supported: {', '.join(map(str, SUPPORTED_YEARS))}")
+    if not engine.has_scenario(scenario):
+        raise ValueError(SCENARIO_ERROR)
+    return year, scenario
+
+@app.route('/api/cells/point', methods=['GET'])
+def get_cell_at_point():
+    """Prediction of the cell containing ?lat=&lon= (O(1) grid lookup)."""
+    try:
+        year, scenario = parse_year_scenario(request.args)
+        lat, lon = float(request.args['lat']), float(request.args['lon'])
+        cell = engine.query_point(year, scenario, lat, lon)
+    except Overloaded as e:
+        return overloaded(e)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    if cell is None:
+        return jsonify({"error": "Point is outside the city grid"}), 404
+    return jsonify(cell), 200
+
+@app.route('/api/cells/nearest', methods=['GET'])
+def get_nearest_cells():
+    """The ?k= cells nearest to ?lat=&lon=, closest first."""
+    try:
+        year, scenario = parse_year_scenario(request.args)
+        lat, lon = float(request.args['lat']), float(request.args['lon'])
+        k = int(request.args.get('k', 8))
+        cells = engine.query_nearest(year, scenario, lat, lon, k)
+    except Overloaded as e:
+        return overloaded(e)
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({"cells": cells}), 200
+
+@app.route('/api/cells/region', methods=['POST'])
+def get_region_cells():
+    """Cells intersecting a GeoJSON polygon: {"geometry": ..., "year": ..., "scenario": ...}."""
+    try:
+        payload = request.get_json(silent=True) or {}
+        year, scenario = parse_year_scenario(payload)
+        if not isinstance(payload.get('geometry'), dict):
+            raise ValueError("Body needs a GeoJSON 'geometry' (or Feature)")
+        region = engine.query_region(year, scenario, payload['geometry'])
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(region), 200
+
+@app.route('/api/scenarios', methods=['POST'])
+def create_footprint_scenario():
+    """
+    Registers a development footprint as a scenario and runs it for one year:
+    {"footprint": GeoJSON, "impacts": {...}, "year": 2030}. The returned
+    scenario_id works as ?scenario= on the prediction, tile and cell APIs.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        year = int(payload.get('year', 2025))
+        if year not in SUPPORTED_YEARS:
+            raise ValueError(f"Invalid year. Supported: {', '.join(map(str, SUPPORTED_YEARS))}")
+        if 'footprint' not in payload:
+            raise ValueError("Body needs a GeoJSON 'footprint'")
+        footprint = engine.register_footprint(payload['footprint'], payload.get('impacts'))
+        summary = engine.footprint_summary(footprint.scenario_id, year)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(summary), 200
+
+@app.route('/api/scenarios/compare', methods=['POST'])
+def compare_scenarios():
+    """
+    Ranks candidate scenarios against the shared Before baseline:
+    {"scenarios": ["After", "fp-...", {"footprint": ..., "impacts": ...}],
+     "years": [2030, 2040], "rank_by": "heat_risk_increase"}.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        scenarios = payload.get('scenarios')
+        if not isinstance(scenarios, list):
+            raise ValueError("Body needs a 'scenarios' list")
+        years = payload.get('years', SUPPORTED_YEARS)
+        if not isinstance(years, list):
+            years = [years]
+        comparison = engine.compare_scenarios(scenarios, years, payload.get('rank_by', 'heat_risk_increase'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(comparison), 200
+
+@app.route('/api/scenarios/<scenario_id>', methods=['GET'])
+def get_footprint_scenario(scenario_id):
+    """Summary of a registered footprint scenario for ?year=."""
+    try:
+        year = int(request.args.get('year', 2025))
+        if year not in SUPPORTED_YEARS:
+            raise ValueError(f"Invalid year. Supported: {', '.join(map(str, SUPPORTED_YEARS))}")
+        summary = engine.footprint_summary(scenario_id, year)
+    except KeyError:
+        return jsonify({"error": f"Unknown scenario id '{scenario_id}' (re-POST the footprint)"}), 404
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(summary), 200
+
+@app.route('/tiles/<layer>/<int:year>/<scenario>/<int:z>/<int:x>/<int:y>.pbf', methods=['GET'])
+def get_tile(layer, year, scenario, z, x, y):
+    """Mapbox Vector Tile of one prediction layer, aggregated to the zoom level."""
+    try:
+        tile = engine.get_tile(layer, year, scenario, z, x, y)
+    except Overloaded as e:
+        return overloaded(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    response = app.response_class(tile, mimetype=MVT_MIMETYPE)
+    response.set_etag(hashlib.blake2b(tile, digest_size=16).hexdigest())
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/it-park', methods=['GET'])
+def get_it_park():
+    """IT park boundary and points; built once per version of the source CSV and revalidated by ETag."""
+    result = engine.get_it_park_geojson()
+    if result is None:
+        return jsonify({"error": "IT park data not available"}), 404
+
+    response = app.response_class(result.body, mimetype=result.mimetype)
+    response.set_etag(result.etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/api/impact-analysis', methods=['GET'])
 def get_impact_analysis():
     try:
         year = int(request.args.get('year', 2025))
+        # Seconds the client is willing to wait for a fresh LLM answer (default: none)
+        wait = min(float(request.args.get('wait', 0)), 10.0)
         
-        # Run "Before" simulation for that year
-        df_before = engine.get_prediction(year, "Before")
+        # Only the cells the IT park changes, against the cached "Before" run for that year
+        delta = engine.get_scenario_delta(year, "After")
         
-        # Run "After" simulation for that year
-        df_after = engine.get_prediction(year, "After")
-        
-        # Analyze
+        # Analyze; recommendations may be "pending" and are then polled by recommendation_id
         from services import ImpactAnalysisEngine
-        analysis = ImpactAnalysisEngine.analyze_impact(df_before, df_after)
+        analysis = ImpactAnalysisEngine.analyze_impact(delta, wait=wait)
         
         return jsonify(analysis), 200
         
+    except Overloaded as e:
+        return overloaded(e)
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/impact-analysis/recommendations/<recommendation_id>', methods=['GET'])
+def poll_recommendations(recommendation_id):
+    from services import ImpactAnalysisEngine
+    advice = ImpactAnalysisEngine.poll_recommendations(recommendation_id)
+    if advice is None:
+        return jsonify({"error": f"Unknown recommendation id '{recommendation_id}'"}), 404
+    return jsonify(advice), 200
+
+@app.route('/api/impact-analysis/stats', methods=['GET'])
+def get_recommendation_stats():
+    from services import recommendation_service
+    return jsonify(recommendation_service.stats()), 200
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+# Ordered from least to most severe
+RISK_LEVELS = ["Low", "Medium", "High"]
+PLANNING_DECISIONS = [
+    "Acceptable with standard measures",
+    "Moderate risk – green buffers & traffic control needed",
+    "High risk – redesign with strong mitigation",
+]
+
+# Baseline heat-risk quantiles separating the classes (medium, high)
+RISK_QUANTILES = (0.6, 0.8)
+
+
+def risk_thresholds(values, quantiles=RISK_QUANTILES):
+    """Class boundaries as quantiles of a reference distribution (NaNs ignored)."""
+    return tuple(float(q) for q in np.nanquantile(np.asarray(values, dtype=np.float64), quantiles))
+
+
+def classify(values, thresholds, labels, inclusive=True):
+    """
+    Bins `values` against ascending `thresholds` into an ordered Categorical
+    of `labels` (one more label than thresholds). With `inclusive` a value
+    equal to a threshold falls in the upper class (`>=`), otherwise in the
+    lower one (`>`). NaN stays missing.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(labels) != len(thresholds) + 1:
+        raise ValueError("classify needs exactly one more label than thresholds")
+
+    codes = np.digitize(values, thresholds, right=not inclusive).astype(np.int8)
+    codes[np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def classify_risk_levels(values, low_threshold, high_threshold):
+    """Low/Medium/High: High at or above `high_threshold`, Medium at or above `low_threshold`."""
+    return classify(values, (low_threshold, high_threshold), RISK_LEVELS, inclusive=True)
+
+
+def planning_decisions(risk, medium_threshold, high_threshold):
+    """Planning decision per cell: strictly above a threshold moves to the stricter decision."""
+    return classify(risk, (medium_threshold, high_threshold), PLANNING_DECISIONS, inclusive=False)
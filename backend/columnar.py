@@ -0,0 +1,126 @@
+"""
+Columnar on-disk copy of the processed city grid: one .npy file per column plus
+a manifest. Loading memory-maps every column read-only, so all workers on a
+host share one page-cache copy and startup does no parsing.
+
+Layout:
+    <root>/<source version>/manifest.json
+    <root>/<source version>/NNN.npy      (one per column, named in the manifest)
+
+Usage (rebuild from the CSV explicitly; the backend also does it on demand):
+    python backend/columnar.py data/processed/city_with_heat_risk.csv
+"""
+import json
+import os
+import shutil
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def columnar_dir(csv_path):
+    """Default store next to the CSV: city.csv -> city.columns/"""
+    return os.path.splitext(csv_path)[0] + ".columns"
+
+
+def _column_array(series):
+    values = series.to_numpy()
+    if values.dtype.kind == "O":
+        # Strings are stored fixed-width so they can be memory-mapped too
+        values = series.astype(str).to_numpy().astype(str)
+    return np.ascontiguousarray(values)
+
+
+def write_columnar(df, root, version):
+    """
+    Writes `df` under root/<version>/. Files are staged in a private directory
+    and renamed into place, so concurrent writers and readers never see a
+    partial store. Older versions are removed.
+    """
+    target = os.path.join(root, version)
+    staging = os.path.join(root, f".staging-{uuid.uuid4().hex}")
+    os.makedirs(staging)
+
+    columns = []
+    for name in df.columns:
+        values = _column_array(df[name])
+        filename = f"{len(columns):03d}.npy"
+        np.save(os.path.join(staging, filename), values, allow_pickle=False)
+        columns.append({"name": str(name), "file": filename, "dtype": values.dtype.str})
+
+    manifest = {"format": FORMAT_VERSION, "version": version, "rows": int(len(df)), "columns": columns}
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # Another process published this version first
+        shutil.rmtree(staging, ignore_errors=True)
+
+    for entry in os.listdir(root):
+        if entry != version and not entry.startswith(".staging-"):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return target
+
+
+def load_columnar(root, version, mmap=True):
+    """
+    Returns the stored frame as a DataFrame whose columns are read-only
+    memory-mapped arrays, or None if no complete store exists for `version`.
+    """
+    directory = os.path.join(root, version)
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION or manifest.get("version") != version:
+        return None
+
+    mode = "r" if mmap else None
+    data = {}
+    for column in manifest["columns"]:
+        values = np.load(os.path.join(directory, column["file"]), mmap_mode=mode, allow_pickle=False)
+        if len(values) != manifest["rows"]:
+            return None
+        data[column["name"]] = values
+    # copy=False keeps each column backed by its mapping instead of consolidating blocks
+    return pd.DataFrame(data, copy=False)
+
+
+def load_or_build(csv_path, version, root=None):
+    """
+    Memory-maps the columnar store for `version` of `csv_path`, building it
+    from the CSV first when missing or stale. Falls back to the parsed CSV if
+    the store cannot be written (e.g. a read-only data directory).
+    """
+    root = root or columnar_dir(csv_path)
+    df = load_columnar(root, version)
+    if df is not None:
+        return df
+
+    df = pd.read_csv(csv_path)
+    try:
+        os.makedirs(root, exist_ok=True)
+        write_columnar(df, root, version)
+    except OSError as e:
+        print(f"Columnar store not written ({e}); using the parsed CSV")
+        return df
+    mapped = load_columnar(root, version)
+    return mapped if mapped is not None else df
+
+
+if __name__ == "__main__":
+    from services import file_version
+
+    for path in sys.argv[1:]:
+        root = columnar_dir(path)
+        os.makedirs(root, exist_ok=True)
+        target = write_columnar(pd.read_csv(path), root, file_version(path))
+        print(f"{path} -> {target}")
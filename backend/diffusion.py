@@ -0,0 +1,185 @@
+import math
+
+import numpy as np
+from scipy import sparse
+from scipy.ndimage import gaussian_filter
+from scipy.signal import fftconvolve
+from scipy.sparse.linalg import cg, splu
+
+# Gaussian kernels are cut at this many sigmas (scipy.ndimage's default)
+TRUNCATE = 4.0
+
+# "auto" switches from the separable filter to FFT convolution on grids of at
+# least FFT_MIN_CELLS when the per-cell cost of the two 1-D passes, 2 * (2r + 1),
+# exceeds FFT_COST_FACTOR times log2 of the padded grid size. Calibrated with
+# benchmarks/bench_diffusion.py: on the city-scale grids separable wins for any
+# realistic sigma; at 1M cells FFT takes over from sigma ~12.
+FFT_MIN_CELLS = 1_000_000
+FFT_COST_FACTOR = 10.0
+
+# "implicit" factorizes the system once per grid shape up to this many cells
+# and reuses it for every column and call; larger grids use conjugate gradients
+DIRECT_SOLVE_MAX_CELLS = 250_000
+CG_RTOL = 1e-8
+
+DIFFUSION_MODES = ["off", "gaussian", "implicit"]
+GAUSSIAN_BACKENDS = ["auto", "separable", "fft"]
+
+
+class GridLayout:
+    """
+    Scatter/gather between a flat cell table and its (ny, nx) grid. The index
+    is computed once per dataset, so no call has to sort the frame by (y, x).
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+        self.x0, self.y0 = int(x.min()), int(y.min())
+        self.nx = int(x.max()) - self.x0 + 1
+        self.ny = int(y.max()) - self.y0 + 1
+        self.flat_index = (y - self.y0) * self.nx + (x - self.x0)
+        self.complete = len(np.unique(self.flat_index)) == self.nx * self.ny == len(x)
+        if not self.complete:
+            mask = np.zeros(self.nx * self.ny)
+            mask[self.flat_index] = 1.0
+            self.mask = mask.reshape(self.ny, self.nx)
+
+    @property
+    def shape(self):
+        return (self.ny, self.nx)
+
+    def to_grid(self, values):
+        grid = np.zeros(self.nx * self.ny)
+        grid[self.flat_index] = values
+        return grid.reshape(self.shape)
+
+    def from_grid(self, grid):
+        return grid.ravel()[self.flat_index]
+
+
+# --- Gaussian kernel backends ---
+def gaussian_kernel(sigma):
+    radius = int(TRUNCATE * sigma + 0.5)
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+def separable_gaussian(grid, sigma):
+    """Two 1-D passes; cost grows with the kernel width."""
+    return gaussian_filter(grid, sigma, mode="nearest", truncate=TRUNCATE)
+
+
+def fft_gaussian(grid, sigma):
+    """FFT convolution with the same kernel and edge handling as separable_gaussian."""
+    kernel = gaussian_kernel(sigma)
+    radius = len(kernel) // 2
+    padded = np.pad(grid, radius, mode="edge")
+    return fftconvolve(padded, np.outer(kernel, kernel), mode="valid")
+
+
+def pick_gaussian_backend(shape, sigma):
+    if shape[0] * shape[1] < FFT_MIN_CELLS:
+        return "separable"
+    radius = int(TRUNCATE * sigma + 0.5)
+    padded = (shape[0] + 2 * radius) * (shape[1] + 2 * radius)
+    separable_cost = 2 * (2 * radius + 1)
+    return "fft" if separable_cost > FFT_COST_FACTOR * math.log2(max(padded, 2)) else "separable"
+
+
+# --- Implicit steady-state diffusion ---
+def _neumann_laplacian_1d(n):
+    main = np.full(n, -2.0)
+    main[0] = main[-1] = -1.0 if n > 1 else 0.0
+    off = np.ones(n - 1)
+    return sparse.diags([off, main, off], [-1, 0, 1], format="csr")
+
+
+def diffusion_operator(shape, alpha):
+    """I - alpha * Laplacian on a grid with zero-flux (Neumann) edges: SPD."""
+    ny, nx = shape
+    laplacian = (
+        sparse.kron(sparse.identity(ny), _neumann_laplacian_1d(nx))
+        + sparse.kron(_neumann_laplacian_1d(ny), sparse.identity(nx))
+    )
+    return (sparse.identity(ny * nx) - alpha * laplacian).tocsc()
+
+
+class ImplicitSolver:
+    """
+    Solves (I - alpha L) u = f: the steady state of a source f relaxing through
+    diffusion, i.e. one implicit Euler step of the heat equation. With
+    alpha = sigma**2 / 2 its spread matches a Gaussian of the same sigma.
+    """
+
+    def __init__(self, shape, sigma):
+        self.shape = shape
+        self.operator = diffusion_operator(shape, sigma ** 2 / 2)
+        n = shape[0] * shape[1]
+        self.method = "direct" if n <= DIRECT_SOLVE_MAX_CELLS else "cg"
+        self._lu = splu(self.operator) if self.method == "direct" else None
+        self._jacobi = sparse.diags(1.0 / self.operator.diagonal())
+
+    def solve(self, grid):
+        f = grid.ravel()
+        if self._lu is not None:
+            u = self._lu.solve(f)
+        else:
+            u, info = cg(self.operator, f, x0=f, rtol=CG_RTOL, M=self._jacobi)
+            if info != 0:
+                raise RuntimeError(f"Diffusion solve did not converge (cg info={info})")
+        return u.reshape(self.shape)
+
+
+# --- Stage ---
+class DiffusionStage:
+    """
+    Spatial diffusion of feature columns over the city grid.
+
+    mode "gaussian" smooths with a Gaussian of `sigma` cells (separable
+    filter or FFT convolution, picked by kernel and grid size under "auto");
+    mode "implicit" solves steady-state heat diffusion with a sparse system
+    whose factorization is cached per grid. Grids with missing cells use
+    normalized convolution so empty cells do not pull values towards zero.
+    """
+
+    def __init__(self, layout, mode="gaussian", sigma=1.2, backend="auto"):
+        if mode not in DIFFUSION_MODES[1:]:
+            raise ValueError(f"Unknown diffusion mode '{mode}'. Supported: {', '.join(DIFFUSION_MODES)}")
+        if backend not in GAUSSIAN_BACKENDS:
+            raise ValueError(f"Unknown diffusion backend '{backend}'. Supported: {', '.join(GAUSSIAN_BACKENDS)}")
+        self.layout = layout
+        self.mode = mode
+        self.sigma = sigma
+        if mode == "implicit":
+            self.backend = "implicit"
+            self._solver = ImplicitSolver(layout.shape, sigma)
+        else:
+            self.backend = pick_gaussian_backend(layout.shape, sigma) if backend == "auto" else backend
+        self._weights = None if layout.complete else self._smooth(layout.mask)
+
+    def _smooth(self, grid):
+        if self.backend == "implicit":
+            return self._solver.solve(grid)
+        if self.backend == "fft":
+            return fft_gaussian(grid, self.sigma)
+        return separable_gaussian(grid, self.sigma)
+
+    def smooth(self, values):
+        """Diffuses one flat column (cells,) and returns it in the same row order."""
+        grid = self._smooth(self.layout.to_grid(values))
+        if self._weights is not None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                grid = grid / self._weights
+        return self.layout.from_grid(grid)
+
+    def apply(self, cols, names):
+        """Diffuses `names` in a dict of columns shaped (cells,) or (k, cells)."""
+        for name in names:
+            values = np.asarray(cols[name], dtype=np.float64)
+            if values.ndim == 1:
+                cols[name] = self.smooth(values)
+            else:
+                cols[name] = np.stack([self.smooth(row) for row in values])
+        return cols
@@ -0,0 +1,204 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+# Rows are rendered and flushed to the buffer in blocks of this size so the
+# intermediate Python strings never hold more than one block at a time.
+ENCODE_BLOCK_ROWS = 20000
+
+# FeatureCollection framing, shared by the buffered and streaming encoders
+GEOJSON_PREFIX = b'{"type": "FeatureCollection", "features": ['
+GEOJSON_SEPARATOR = b", "
+GEOJSON_SUFFIX = b"]}"
+
+
+def _format_float(values):
+    """Format a float array exactly as json.dumps would (NaN -> null)."""
+    out = list(map(float.__repr__, values.tolist()))
+    bad = np.flatnonzero(~np.isfinite(values))
+    for i in bad.tolist():
+        v = values[i]
+        out[i] = "null" if np.isnan(v) else ("Infinity" if v > 0 else "-Infinity")
+    return out
+
+
+def _format_column(series):
+    """Render one dataframe column to a list of JSON value literals."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Format each category once and index the literals by code
+        literals = np.array(
+            [json.dumps(c) if isinstance(c, str) else _format_column(pd.Series([c]))[0]
+             for c in series.cat.categories] + ["null"],
+            dtype=object,
+        )
+        return literals[series.cat.codes.to_numpy()].tolist()
+
+    values = series.to_numpy()
+    kind = values.dtype.kind
+
+    if kind == "f":
+        return _format_float(values)
+    if kind in "iu":
+        return list(map(str, values.tolist()))
+    if kind == "b":
+        return ["true" if v else "false" for v in values.tolist()]
+
+    return ["null" if pd.isna(v) else json.dumps(v) for v in series.astype(object).tolist()]
+
+
+def _geojson_features(df, cell_size):
+    """Render every row of `df` to a GeoJSON Feature string."""
+    half = cell_size / 2
+    lat = df["lat"].to_numpy(dtype=np.float64)
+    lon = df["lon"].to_numpy(dtype=np.float64)
+
+    x0 = _format_float(lon - half)
+    x1 = _format_float(lon + half)
+    y0 = _format_float(lat - half)
+    y1 = _format_float(lat + half)
+    rings = [
+        "[[[%s, %s], [%s, %s], [%s, %s], [%s, %s], [%s, %s]]]" % (a, b, c, b, c, d, a, d, a, b)
+        for a, b, c, d in zip(x0, y0, x1, y1)
+    ]
+    if df.index.dtype.kind in "iu":
+        ids = ['"%d"' % i for i in df.index.tolist()]
+    else:
+        ids = [json.dumps(str(i)) for i in df.index.tolist()]
+
+    columns = [_format_column(df[col]) for col in df.columns]
+    props = ", ".join(json.dumps(str(col)).replace("%", "%%") + ": %s" for col in df.columns)
+
+    template = (
+        '{"id": %s, "type": "Feature", "properties": {' + props + '}, '
+        '"geometry": {"type": "Polygon", "coordinates": %s}}'
+    )
+    return [template % row for row in zip(ids, *columns, rings)]
+
+
+def iter_geojson_features(df, cell_size, block_rows=ENCODE_BLOCK_ROWS):
+    """Yields lists of GeoJSON Feature strings for consecutive blocks of rows."""
+    for start in range(0, len(df), block_rows):
+        yield _geojson_features(df.iloc[start:start + block_rows], cell_size)
+
+
+def encode_grid_geojson(df, cell_size):
+    """
+    Encode a prediction grid as a GeoJSON FeatureCollection.
+
+    Every row becomes a square Polygon of side `cell_size` centred on its
+    `lat`/`lon`. The corner coordinates are computed column-wise with NumPy and
+    the output matches `GeoDataFrame.to_json()` for the same frame, without
+    building any shapely geometries. Returns UTF-8 encoded bytes.
+    """
+    buffer = io.BytesIO()
+    buffer.write(GEOJSON_PREFIX)
+    for i, block in enumerate(iter_geojson_features(df, cell_size)):
+        if i:
+            buffer.write(GEOJSON_SEPARATOR)
+        buffer.write(", ".join(block).encode("utf-8"))
+    buffer.write(GEOJSON_SUFFIX)
+    return buffer.getvalue()
+
+
+# --- Binary grid frame ---
+# Layout: b"IDGF" | uint32 LE header length | JSON header | 8-byte aligned column
+# buffers (decoded by dashboard/grid_client.py and backend/static/js/main.js).
+# Every column is a little-endian float32 array of ny * nx values in row-major
+# (y, x) order, NaN where the grid has no cell. Cell geometry is not repeated
+# per row: the header carries the grid origin, spacing and size once.
+GRID_FRAME_MAGIC = b"IDGF"
+GRID_FRAME_VERSION = 1
+GRID_FRAME_MIMETYPE = "application/vnd.indiem.grid"
+
+# Columns implied by the grid geometry in the header
+GRID_INDEX_COLUMNS = ["x", "y", "lat", "lon"]
+
+
+def _pad8(n):
+    return (-n) % 8
+
+
+def grid_geometry(df, cell_size):
+    """
+    Describes the regular grid behind a prediction frame. Returns a dict with
+    nx/ny, the index of the first cell (x0, y0), the lon/lat of that cell
+    (origin), the lon/lat spacing between cells (step), the rendered
+    cell_size, and `flat_index`: each row's position in a row-major (ny, nx) array.
+    """
+    x = df["x"].to_numpy().astype(np.int64)
+    y = df["y"].to_numpy().astype(np.int64)
+    x0, y0 = int(x.min()), int(y.min())
+    nx, ny = int(x.max()) - x0 + 1, int(y.max()) - y0 + 1
+
+    # lat/lon are linear in the integer cell indices; the origin is cell (x0, y0)
+    lon, lat = df["lon"].to_numpy(), df["lat"].to_numpy()
+    lon_step = (lon.max() - lon.min()) / (nx - 1) if nx > 1 else cell_size
+    lat_step = (lat.max() - lat.min()) / (ny - 1) if ny > 1 else cell_size
+
+    return {
+        "nx": nx,
+        "ny": ny,
+        "x0": x0,
+        "y0": y0,
+        "origin": [float(lon.min()), float(lat.min())],
+        "step": [float(lon_step), float(lat_step)],
+        "cell_size": cell_size,
+        "flat_index": (y - y0) * nx + (x - x0),
+    }
+
+
+def encode_grid_frame(df, cell_size):
+    """
+    Encode a prediction grid as a binary columnar frame (see layout above).
+    Numeric columns become float32 (ny, nx) arrays and categorical columns
+    their float32 codes; other columns are dropped.
+    """
+    grid = grid_geometry(df, cell_size)
+    flat_index = grid.pop("flat_index")
+    nx, ny = grid["nx"], grid["ny"]
+
+    names = [
+        col for col in df.columns
+        if col not in GRID_INDEX_COLUMNS
+        and (df[col].dtype.kind in "fiub" or isinstance(df[col].dtype, pd.CategoricalDtype))
+    ]
+
+    columns, buffers, offset = [], [], 0
+    for name in names:
+        column = {"name": str(name), "dtype": "<f4", "offset": offset, "count": ny * nx}
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Categories travel in the header; the column holds their codes (NaN if missing)
+            column["categories"] = [str(c) for c in series.cat.categories]
+            data = series.cat.codes.to_numpy().astype(np.float64)
+            data[data < 0] = np.nan
+        else:
+            data = series.to_numpy(dtype=np.float64)
+        values = np.full(ny * nx, np.nan, dtype="<f4")
+        values[flat_index] = data
+        columns.append(column)
+        buffers.append(values.tobytes())
+        offset += values.nbytes + _pad8(values.nbytes)
+
+    header = {
+        "version": GRID_FRAME_VERSION,
+        "grid": grid,
+        "layout": "row-major (y, x)",
+        "cells": int(len(df)),
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad so the first column starts 8-byte aligned (typed-array views need it)
+    header_bytes += b" " * _pad8(len(GRID_FRAME_MAGIC) + 4 + len(header_bytes))
+
+    out = io.BytesIO()
+    out.write(GRID_FRAME_MAGIC)
+    out.write(np.uint32(len(header_bytes)).astype("<u4").tobytes())
+    out.write(header_bytes)
+    for data in buffers:
+        out.write(data)
+        out.write(b"\0" * _pad8(len(data)))
+    return out.getvalue()
+
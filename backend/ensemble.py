@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from inference import CompiledTreeEnsemble
+
+# Members x cells evaluated per task; bounds the stacked feature matrix of one task
+ENSEMBLE_TASK_ROWS = 262_144
+
+# Reported bands (percent)
+ENSEMBLE_PERCENTILES = (10, 90)
+
+# Standard deviation of each growth rate across members (same units as PROJECTION_RATES).
+# Samples are clipped at zero, so no member reverses the direction of a trend.
+RATE_SPREAD = {
+    "temp_rate": 0.015,
+    "traffic_rate": 0.5,
+    "pm25_rate": 0.4,
+    "green_loss_rate": 0.2,
+}
+
+
+def sample_rates(rates, n_members, seed=0, spread=RATE_SPREAD):
+    """N parameter sets around `rates`: a dict of (n_members, 1) arrays."""
+    rng = np.random.default_rng(seed)
+    return {
+        name: np.clip(rng.normal(value, spread.get(name, 0.0), n_members), 0, None)[:, None]
+        for name, value in rates.items()
+    }
+
+
+# --- Worker side ---
+_worker = {}
+
+
+def _init_worker(predictor, features, project, scenario):
+    _worker.update(predictor=predictor, features=features, project=project, scenario=scenario)
+
+
+def _run_task(task):
+    cols, x, y, years_passed, scenario_type, member_rates = task
+    return evaluate_members(
+        _worker["predictor"], _worker["features"], _worker["project"], _worker["scenario"],
+        cols, x, y, years_passed, scenario_type, member_rates, n_threads=1,
+    )
+
+
+def evaluate_members(predictor, features, project, scenario, cols, x, y, years_passed, scenario_type,
+                     member_rates, n_threads=None):
+    """
+    Projects a block of cells under every member's rates, stacking the
+    (members x cells) feature grids into one matrix for a single batched
+    model call. Returns (mean, p10, p90) of the heat risk per cell.
+    `n_threads` limits the compiled predictor inside pool workers.
+    """
+    projected = project({col: cols[col][None, :] for col in features}, years_passed, member_rates)
+    projected = scenario(projected, scenario_type, x, y)
+
+    n_members = len(next(iter(member_rates.values())))
+    shape = (n_members, len(x))
+    X = pd.DataFrame({col: np.broadcast_to(projected[col], shape).ravel() for col in features})
+    if isinstance(predictor, CompiledTreeEnsemble):
+        risk = predictor.predict(X, n_threads=n_threads).reshape(shape)
+    else:
+        risk = predictor.predict(X).reshape(shape)
+
+    low, high = np.percentile(risk, ENSEMBLE_PERCENTILES, axis=0)
+    return risk.mean(axis=0), low, high
+
+
+# --- Driver ---
+class EnsembleRunner:
+    """
+    Runs Monte Carlo ensembles chunked over cells. Chunks go to a process
+    pool when more than one worker is configured; the pool is created on
+    first use and reused. Workers are forked where the platform supports it,
+    so they inherit the loaded modules instead of re-importing the app.
+    """
+
+    def __init__(self, workers=None, task_rows=ENSEMBLE_TASK_ROWS):
+        self.workers = workers or os.cpu_count() or 1
+        self.task_rows = task_rows
+        self._pool = None
+        self._pool_predictor = None
+
+    def _get_pool(self, predictor, features, project, scenario):
+        if self._pool is None or self._pool_predictor is not predictor:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=context, initializer=_init_worker,
+                initargs=(predictor, features, project, scenario),
+            )
+            self._pool_predictor = predictor
+        return self._pool
+
+    def run(self, predictor, features, project, scenario, base_df, years_passed, scenario_type, member_rates):
+        n_members = len(next(iter(member_rates.values())))
+        n_cells = len(base_df)
+        cells_per_task = max(1, self.task_rows // n_members)
+
+        cols = {col: base_df[col].to_numpy() for col in features}
+        x, y = base_df["x"].to_numpy(), base_df["y"].to_numpy()
+        tasks = [
+            (
+                {col: values[start:start + cells_per_task] for col, values in cols.items()},
+                x[start:start + cells_per_task],
+                y[start:start + cells_per_task],
+                years_passed, scenario_type, member_rates,
+            )
+            for start in range(0, n_cells, cells_per_task)
+        ]
+
+        if self.workers <= 1 or len(tasks) == 1:
+            results = [
+                evaluate_members(predictor, features, project, scenario, *task) for task in tasks
+            ]
+        else:
+            pool = self._get_pool(predictor, features, project, scenario)
+            results = list(pool.map(_run_task, tasks))
+
+        mean, low, high = (np.concatenate(parts) for parts in zip(*results))
+        return {"mean": mean, f"p{ENSEMBLE_PERCENTILES[0]}": low, f"p{ENSEMBLE_PERCENTILES[1]}": high}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+from metrics import SIMULATION_REQUESTS
+
+
+class Overloaded(Exception):
+    """Too many distinct simulations are pending; the client should retry later (HTTP 503)."""
+
+
+# --- Worker side ---
+_worker = {}
+
+
+def _init_worker(engine, engine_class):
+    # Forked workers inherit the parent's engine (and its memory-mapped base data);
+    # spawned workers load their own
+    _worker["engine"] = engine if engine is not None else engine_class()
+
+
+def _run_task(task):
+    """Runs one engine method; returns its result and the stage timings it recorded."""
+    method, args = task
+    token = metrics.begin_request()
+    try:
+        result = getattr(_worker["engine"], method)(*args)
+    finally:
+        timings = metrics.end_request(token)
+    return result, timings
+
+
+# --- Driver ---
+class SimulationExecutor:
+    """
+    Runs expensive simulations once per distinct key.
+
+    Concurrent calls with the same key are coalesced (single flight): the
+    first caller computes, later callers wait for and share its result. At
+    most `max_pending` distinct computations may be queued or running;
+    beyond that `coalesce` raises Overloaded instead of piling up threads.
+    With more than one worker, `call` runs engine methods in a process pool
+    so CPU-bound work escapes the GIL; the pool is created on first use and
+    recreated when the engine's model or data version changes. Workers are
+    forked where the platform supports it and share the read-only base data.
+    """
+
+    def __init__(self, workers=1, max_pending=16):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._inflight = {}   # key -> Future of the leader's result
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_version = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def offloading(self):
+        return self.workers > 1
+
+    def pending(self):
+        return len(self._inflight)
+
+    def coalesce(self, key, fn):
+        """Returns fn(), sharing one evaluation among concurrent callers with the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                if len(self._inflight) >= self.max_pending:
+                    SIMULATION_REQUESTS.inc(outcome="rejected")
+                    raise Overloaded(f"Simulation queue is full ({self.max_pending} pending); retry shortly")
+                future = self._inflight[key] = Future()
+        SIMULATION_REQUESTS.inc(outcome="run" if leader else "coalesced")
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _get_pool(self, engine, version):
+        with self._pool_lock:
+            if self._pool is None or self._pool_version != version:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                methods = multiprocessing.get_all_start_methods()
+                fork = "fork" in methods
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("fork" if fork else "spawn"),
+                    initializer=_init_worker, initargs=(engine if fork else None, type(engine)),
+                )
+                self._pool_version = version
+            return self._pool
+
+    def call(self, engine, version, method, *args):
+        """engine.method(*args), in a pool worker when offloading. Arguments and result are pickled."""
+        if not self.offloading:
+            return getattr(engine, method)(*args)
+        pool = self._get_pool(engine, version)
+        try:
+            result, timings = pool.submit(_run_task, (method, args)).result()
+        except BrokenProcessPool:
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        # Worker stages count towards this process's metrics and the caller's Server-Timing
+        for name, seconds in timings:
+            metrics.record_stage(name, seconds)
+        return result
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import math
+from collections import namedtuple
+
+import numpy as np
+import shapely
+from shapely.geometry import shape as geojson_shape
+
+# Development impacts at full cell coverage. The defaults are the IT park's
+# (apply_scenario): additive deltas scale with the covered fraction of a
+# cell, the PM2.5 factor is applied as factor ** fraction.
+DEFAULT_IMPACTS = {
+    "temperature_delta": 1.5,
+    "traffic_delta": 900.0,
+    "pm25_factor": 1.15,
+    "green_cover_delta": -20.0,
+}
+
+# Scenario ids: prefix + content hash of the normalized footprint and impacts
+SCENARIO_ID_PREFIX = "fp-"
+
+# Footprint coordinates are snapped to this many degrees before hashing
+COORDINATE_PRECISION = 1e-9
+
+# A registered development proposal. `rows` and `coverage` are the grid cells
+# the footprint touches and the covered fraction of each (0, 1].
+FootprintScenario = namedtuple("FootprintScenario", ["scenario_id", "geometry", "impacts", "rows", "coverage"])
+
+
+def parse_footprint(footprint):
+    """Shapely polygon(s) from a GeoJSON geometry or Feature; raises ValueError."""
+    if not isinstance(footprint, dict):
+        raise ValueError("footprint must be a GeoJSON geometry or Feature")
+    if footprint.get("type") == "Feature":
+        footprint = footprint.get("geometry") or {}
+    try:
+        geometry = geojson_shape(footprint)
+    except Exception as e:
+        raise ValueError(f"Invalid GeoJSON footprint: {e}")
+    if geometry.is_empty or geometry.geom_type not in ("Polygon", "MultiPolygon"):
+        raise ValueError("footprint must be a non-empty Polygon or MultiPolygon")
+    if not geometry.is_valid:
+        raise ValueError("footprint polygon is not valid (self-intersecting?)")
+    return shapely.normalize(shapely.set_precision(geometry, COORDINATE_PRECISION))
+
+
+def parse_impacts(impacts):
+    """DEFAULT_IMPACTS overridden by the given values; raises ValueError."""
+    impacts = impacts or {}
+    unknown = set(impacts) - set(DEFAULT_IMPACTS)
+    if unknown:
+        raise ValueError(f"Unknown impact parameters: {', '.join(sorted(unknown))}. "
+                         f"Supported: {', '.join(DEFAULT_IMPACTS)}")
+    merged = dict(DEFAULT_IMPACTS)
+    for name, value in impacts.items():
+        try:
+            merged[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Impact '{name}' must be a number")
+        if not math.isfinite(merged[name]):
+            raise ValueError(f"Impact '{name}' must be finite")
+    if merged["pm25_factor"] <= 0:
+        raise ValueError("pm25_factor must be positive")
+    return merged
+
+
+def scenario_id(geometry, impacts):
+    """Content address of a proposal: equal footprints and impacts share an id."""
+    canonical = json.dumps(
+        {"footprint": shapely.to_wkt(geometry, rounding_precision=9), "impacts": impacts},
+        sort_keys=True,
+    )
+    return SCENARIO_ID_PREFIX + hashlib.blake2b(canonical.encode("utf-8"), digest_size=10).hexdigest()
+
+
+def apply_impacts(cols, rows, coverage, impacts):
+    """
+    Adds a footprint's impacts to projected feature columns shaped (cells,)
+    or (k, cells); `rows` index the last axis. Cells outside the footprint
+    keep their values bit for bit.
+    """
+    temperature = np.array(cols["temperature"], dtype=np.float64)
+    traffic = np.array(cols["traffic"], dtype=np.float64)
+    pm25 = np.array(cols["pm25"], dtype=np.float64)
+    green_cover = np.array(cols["green_cover"], dtype=np.float64)
+
+    temperature[..., rows] += coverage * impacts["temperature_delta"]
+    traffic[..., rows] += coverage * impacts["traffic_delta"]
+    pm25[..., rows] *= impacts["pm25_factor"] ** coverage
+    green_cover[..., rows] += coverage * impacts["green_cover_delta"]
+
+    cols["temperature"] = temperature
+    cols["traffic"] = np.clip(traffic, 0, None)
+    cols["pm25"] = pm25
+    cols["green_cover"] = np.clip(green_cover, 0, None)
+    return cols
@@ -0,0 +1,180 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Rows evaluated per block. A block allocates a few (n_trees x rows) arrays of
+# 1-8 bytes per element; 512 rows keeps a 500-tree ensemble's temporaries in L2.
+BLOCK_ROWS = 512
+
+# Trees up to this depth are evaluated through a per-tree lookup table indexed by
+# the packed outcome of all their split tests (2**depth - 1 bits, one byte).
+LUT_MAX_DEPTH = 3
+
+
+def _float32_floor(threshold):
+    """Largest float32 <= threshold, so float32 `x <= t` matches sklearn's float64 test."""
+    t32 = np.asarray(threshold, dtype=np.float32)
+    over = t32.astype(np.float64) > threshold
+    return np.where(over, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+class CompiledTreeEnsemble:
+    """
+    A fitted GradientBoostingRegressor flattened into contiguous NumPy arrays.
+
+    Every tree is padded to a perfect binary tree of the ensemble's max depth
+    and stored in heap order: node n has children 2n+1 / 2n+2. Padding nodes
+    have an infinite threshold (always left) and copy their leaf value down, so
+    every row visits exactly `max_depth` nodes per tree.
+
+    A batch is evaluated level-synchronously for all trees at once. The split
+    tests are computed per feature by broadcasting a feature row against every
+    threshold that uses it. For shallow trees the test outcomes of each tree
+    are packed into a byte that indexes a per-tree leaf table; deeper trees
+    walk the levels by gathering one test outcome per level.
+    Predictions match `model.predict` to float rounding.
+    """
+
+    def __init__(self, feature, threshold, leaf_value, max_depth, baseline, feature_names):
+        self.feature = feature          # (n_trees, n_internal) int
+        self.threshold = threshold      # (n_trees, n_internal) float32
+        self.leaf_value = leaf_value    # (n_trees, n_leaves) float64, learning rate applied
+        self.max_depth = max_depth
+        self.baseline = baseline
+        self.feature_names = feature_names
+
+        n_trees, n_internal = feature.shape
+        n_features = len(feature_names)
+
+        # Node slots grouped by the feature they test
+        flat_feature = feature.ravel()
+        self._groups = [
+            (f, np.flatnonzero(flat_feature == f)) for f in range(n_features)
+        ]
+        self._group_thresholds = [threshold.ravel()[ix][:, None] for _, ix in self._groups]
+
+        self._use_lut = max_depth <= LUT_MAX_DEPTH
+        if self._use_lut:
+            n_codes = 1 << n_internal
+            codes = np.arange(n_codes)
+            leaf = np.zeros(n_codes, dtype=np.intp)
+            for _ in range(max_depth):
+                went_left = (codes >> leaf) & 1
+                leaf = 2 * leaf + 2 - went_left
+            leaf -= n_internal
+
+            self._bit_weights = (1 << np.arange(n_internal, dtype=np.uint8))[None, :, None]
+            self._code_table = leaf_value[:, leaf].ravel()
+            index_dtype = np.uint16 if n_trees * n_codes <= np.iinfo(np.uint16).max else np.intp
+            self._tree_offsets = (np.arange(n_trees, dtype=index_dtype) * n_codes)[:, None]
+
+    @classmethod
+    def from_gradient_boosting(cls, model):
+        """Compiles a fitted single-output sklearn GradientBoostingRegressor."""
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        depth = max(1, max(t.max_depth for t in trees))
+        n_internal = (1 << depth) - 1
+
+        feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+        threshold = np.full((len(trees), n_internal), np.inf, dtype=np.float64)
+        leaf_value = np.zeros((len(trees), n_internal + 1), dtype=np.float64)
+
+        for i, tree in enumerate(trees):
+            stack = [(0, 0, 0)]  # (sklearn node, heap slot, depth)
+            while stack:
+                node, slot, level = stack.pop()
+                if tree.children_left[node] < 0:
+                    # Padding below an early leaf always goes left, ending at its
+                    # left-most descendant; fill the whole span for simplicity.
+                    first = slot
+                    for _ in range(depth - level):
+                        first = 2 * first + 1
+                    span = 1 << (depth - level)
+                    first -= n_internal
+                    leaf_value[i, first:first + span] = tree.value[node, 0, 0] * model.learning_rate
+                    continue
+                feature[i, slot] = tree.feature[node]
+                threshold[i, slot] = tree.threshold[node]
+                stack.append((tree.children_left[node], 2 * slot + 1, level + 1))
+                stack.append((tree.children_right[node], 2 * slot + 2, level + 1))
+
+        if model.init_ == "zero":
+            baseline = 0.0
+        else:
+            probe = np.zeros((1, model.n_features_in_))
+            baseline = float(np.ravel(model.init_.predict(probe))[0])
+
+        feature_names = list(getattr(model, "feature_names_in_", range(model.n_features_in_)))
+
+        return cls(
+            feature=feature,
+            threshold=_float32_floor(threshold),
+            leaf_value=leaf_value,
+            max_depth=depth,
+            baseline=baseline,
+            feature_names=feature_names,
+        )
+
+    @property
+    def n_trees(self):
+        return self.feature.shape[0]
+
+    def _split_tests(self, Xt):
+        """(n_trees, n_internal, rows) uint8: 1 where the row goes left at that node."""
+        n_rows = Xt.shape[1]
+        passed = np.empty((self.feature.size, n_rows), dtype=np.uint8)
+        for (f, ix), thresholds in zip(self._groups, self._group_thresholds):
+            if len(ix):
+                passed[ix] = Xt[f][None, :] <= thresholds
+        return passed.reshape(self.feature.shape + (n_rows,))
+
+    def _predict_block(self, Xt):
+        """Evaluates all trees for one block; Xt is (n_features, rows) float32."""
+        passed = self._split_tests(Xt)
+
+        if self._use_lut:
+            code = np.bitwise_or.reduce(passed * self._bit_weights, axis=1)
+            index = np.add(code, self._tree_offsets, dtype=self._tree_offsets.dtype)
+            values = np.take(self._code_table, index)
+        else:
+            n_trees, n_internal, n_rows = passed.shape
+            trees = np.arange(n_trees)[:, None]
+            rows = np.arange(n_rows)[None, :]
+            slot = np.zeros((n_trees, n_rows), dtype=np.intp)
+            for _ in range(self.max_depth):
+                slot = 2 * slot + 2 - passed[trees, slot, rows]
+            values = self.leaf_value[trees, slot - n_internal]
+
+        return self.baseline + values.sum(axis=0)
+
+    def predict(self, X, n_threads=None):
+        """
+        Predicts a batch. Accepts a DataFrame (columns are reordered to the
+        training features) or a 2-D array already in feature order.
+        """
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy()
+        # sklearn evaluates splits on float32 inputs
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+
+        out = np.empty(n_rows, dtype=np.float64)
+
+        def run(start, stop):
+            for block in range(start, stop, BLOCK_ROWS):
+                end = min(block + BLOCK_ROWS, stop)
+                out[block:end] = self._predict_block(np.ascontiguousarray(X[block:end].T))
+
+        n_threads = n_threads or os.cpu_count() or 1
+        n_blocks = -(-n_rows // BLOCK_ROWS)
+        if n_threads <= 1 or n_blocks <= 1:
+            run(0, n_rows)
+        else:
+            # NumPy releases the GIL in the array kernels, so contiguous runs of
+            # blocks scale across cores
+            per_task = -(-n_blocks // (n_threads * 4)) * BLOCK_ROWS
+            with ThreadPoolExecutor(max_workers=n_threads) as pool:
+                list(pool.map(lambda start: run(start, min(start + per_task, n_rows)),
+                              range(0, n_rows, per_task)))
+        return out
@@ -0,0 +1,188 @@
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Prometheus text exposition format
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram upper bounds: seconds for latencies, bytes for payloads (1 KiB .. 256 MiB)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(10))
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(series[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "indiem_stage_seconds", "Time spent in one simulation pipeline stage", ["stage"])
+PAYLOAD_BYTES = REGISTRY.histogram(
+    "indiem_payload_bytes", "Size of encoded response payloads", ["kind"], SIZE_BUCKETS)
+CACHE_REQUESTS = REGISTRY.counter(
+    "indiem_cache_requests_total", "Cache lookups by cache and outcome", ["cache", "outcome"])
+HTTP_SECONDS = REGISTRY.histogram(
+    "indiem_http_request_seconds", "Flask request latency", ["endpoint", "method", "status"])
+SIMULATION_REQUESTS = REGISTRY.counter(
+    "indiem_simulation_requests_total", "Result cache misses by outcome: run, coalesced or rejected", ["outcome"])
+
+
+# --- Recording helpers ---
+# Stage timings of the current request, for the Server-Timing header. Unset outside
+# requests (warm-up, background LLM calls), where only the histograms are updated.
+_request_timings = contextvars.ContextVar("indiem_request_timings", default=None)
+
+
+def begin_request():
+    """Starts collecting stage timings for the current request; returns a token for end_request."""
+    return _request_timings.set([])
+
+
+def end_request(token):
+    """Stops collecting and returns the request's [(stage, seconds), ...]."""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def stage(name):
+    """Times the enclosed block as pipeline stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_payload(kind, body):
+    PAYLOAD_BYTES.observe(len(body), kind=kind)
+
+
+def cache_lookup(cache, value):
+    """Counts a lookup as a hit unless `value` is None; returns `value`."""
+    CACHE_REQUESTS.inc(cache=cache, outcome="miss" if value is None else "hit")
+    return value
+
+
+def server_timing_header(timings):
+    """Server-Timing value for [(stage, seconds), ...]; repeated stages are summed."""
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items())
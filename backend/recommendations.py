@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+
+from metrics import stage, cache_lookup
+
+load_dotenv()
+
+# LLM backend: an HTTP endpoint (LLM_ENDPOINT, e.g. a self-hosted model or the test
+# stub) takes precedence over Gemini (GEMINI_API_KEY). Without either, only the
+# rule-based recommendations are served.
+LLM_ENDPOINT = os.getenv("LLM_ENDPOINT")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+
+# Hard limit on one LLM call (seconds); slower answers are dropped for the fallback
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "8"))
+
+# Distinct rounded-delta keys kept in the recommendation cache
+RECOMMENDATION_CACHE_ITEMS = int(os.getenv("RECOMMENDATION_CACHE_ITEMS", "256"))
+
+# Deltas are rounded to these steps before keying the cache and prompting, so
+# nearby slider positions share one LLM answer
+DELTA_STEPS = {
+    "temperature_rise": 0.1,
+    "traffic_increase": 50,
+    "pm25_worsening": 0.5,
+    "green_cover_loss": 1.0,
+}
+
+SEVERITY_LEVELS = ["Low", "Moderate", "High", "Critical"]
+
+PROMPT_TEMPLATE = """
+You are a City Planner.
+Data:
+Temp Rise: {temperature_rise}C
+Traffic: +{traffic_increase}
+PM2.5: +{pm25_worsening}
+Green Loss: {green_cover_loss}%
+
+Provide:
+1. Severity (Low/Moderate/High/Critical)
+2. 3 short, specific mitigation strategies.
+Output JSON: {{ "severity": "...", "recommendations": [...] }}
+"""
+
+
+# --- Rule-based fallback ---
+# (delta, level that counts as one unit of pressure, mitigation)
+RULES = [
+    ("temperature_rise", 0.5, "Cool roofs and reflective paving across the IT park campus"),
+    ("traffic_increase", 300, "Traffic demand management: staggered shifts and shuttle services"),
+    ("pm25_worsening", 5, "Dust control and electric fleet mandates for park operations"),
+    ("green_cover_loss", 7, "Green buffers and tree plantation along the park boundary"),
+]
+
+
+def rule_based_recommendations(deltas):
+    """Deterministic severity and the three mitigations for the largest pressures."""
+    pressure = {key: max(0.0, deltas.get(key, 0.0)) / unit for key, unit, _ in RULES}
+    score = max(pressure.values())
+    level = 0 if score < 1 else 1 if score < 2 else 2 if score < 4 else 3
+
+    ranked = sorted(RULES, key=lambda rule: -pressure[rule[0]])
+    return {
+        "severity": f"{SEVERITY_LEVELS[level]} Impact",
+        "recommendations": [text for _, _, text in ranked[:3]],
+    }
+
+
+def round_deltas(deltas):
+    """Snaps every delta to its DELTA_STEPS grid."""
+    return {
+        key: round(round(deltas.get(key, 0.0) / step) * step, 2)
+        for key, step in DELTA_STEPS.items()
+    }
+
+
+def _parse_llm_answer(text):
+    clean_text = text.replace("```json", "").replace("```", "").strip()
+    result = json.loads(clean_text)
+
+    severity = str(result.get("severity", "Moderate")).strip()
+    for level in SEVERITY_LEVELS:
+        if severity.lower().startswith(level.lower()):
+            severity = f"{level} Impact"
+            break
+    recommendations = [str(r) for r in result.get("recommendations", [])]
+    if not recommendations:
+        raise ValueError("LLM answer has no recommendations")
+    return {"severity": severity, "recommendations": recommendations}
+
+
+# --- LLM clients ---
+class HTTPLLMClient:
+    """POSTs {"prompt": ...} to an endpoint that answers {"text": ...}."""
+
+    def __init__(self, url, timeout=LLM_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def generate(self, prompt):
+        response = self.session.post(self.url, json={"prompt": prompt}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["text"]
+
+
+class GeminiClient:
+    def __init__(self, api_key, model_name=GEMINI_MODEL, timeout=LLM_TIMEOUT):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.timeout = timeout
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt, request_options={"timeout": self.timeout})
+        return response.text
+
+
+def default_llm_client():
+    if LLM_ENDPOINT:
+        return HTTPLLMClient(LLM_ENDPOINT)
+    if GEMINI_API_KEY:
+        return GeminiClient(GEMINI_API_KEY)
+    return None
+
+
+# --- Service ---
+class RecommendationService:
+    """
+    Serves mitigation recommendations without blocking on the LLM.
+
+    Answers are cached per rounded-delta key. A miss returns the rule-based
+    recommendations at once with status "pending" and starts one background
+    LLM call per key; clients poll `poll(recommendation_id)` for the result.
+    A call that fails or outlives `timeout` resolves to the rule-based answer,
+    which is then cached like an LLM answer.
+    """
+
+    def __init__(self, client=None, timeout=LLM_TIMEOUT, max_items=RECOMMENDATION_CACHE_ITEMS, workers=2):
+        self.client = client
+        self.timeout = timeout
+        self.max_items = max_items
+        self._cache = OrderedDict()      # recommendation_id -> answer dict
+        self._pending = {}               # recommendation_id -> (future, deadline, rounded deltas)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-recommendations")
+        self._stats = {"hits": 0, "misses": 0, "llm_ok": 0, "llm_failed": 0, "timeouts": 0}
+
+    @staticmethod
+    def recommendation_id(rounded):
+        key = json.dumps(rounded, sort_keys=True).encode("utf-8")
+        return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+    def recommend(self, deltas, wait=0.0):
+        """
+        Returns a dict with severity, recommendations, source ("llm" or
+        "rules"), status ("ready" or "pending") and recommendation_id. `wait`
+        is how long (seconds) the caller is willing to block for a new answer.
+        """
+        rounded = round_deltas(deltas)
+        rec_id = self.recommendation_id(rounded)
+
+        with self._lock:
+            cached = cache_lookup("recommendation", self._cache.get(rec_id))
+            if cached is not None:
+                self._cache.move_to_end(rec_id)
+                self._stats["hits"] += 1
+                return dict(cached, status="ready", recommendation_id=rec_id)
+            self._stats["misses"] += 1
+
+            if self.client is None:
+                answer = self._store(rec_id, dict(rule_based_recommendations(rounded), source="rules"))
+                return dict(answer, status="ready", recommendation_id=rec_id)
+
+            if rec_id not in self._pending:
+                future = self._pool.submit(self._generate, rounded)
+                self._pending[rec_id] = (future, time.monotonic() + self.timeout, rounded)
+
+        if wait > 0:
+            future = self._pending.get(rec_id, (None,))[0]
+            if future is not None:
+                try:
+                    future.result(timeout=min(wait, self.timeout))
+                except Exception:
+                    pass
+        return self.poll(rec_id)
+
+    def poll(self, rec_id):
+        """Current answer for a recommendation id; None if the id is unknown."""
+        with self._lock:
+            cached = self._cache.get(rec_id)
+            if cached is not None:
+                return dict(cached, status="ready", recommendation_id=rec_id)
+            pending = self._pending.get(rec_id)
+        if pending is None:
+            return None
+
+        future, deadline, rounded = pending
+        if future.done():
+            try:
+                answer = dict(future.result(), source="llm")
+                self._count("llm_ok")
+            except Exception as e:
+                print(f"LLM recommendation failed, using rule-based fallback: {e}")
+                answer = dict(rule_based_recommendations(rounded), source="rules")
+                self._count("llm_failed")
+        elif time.monotonic() > deadline:
+            print(f"LLM recommendation timed out after {self.timeout}s, using rule-based fallback")
+            answer = dict(rule_based_recommendations(rounded), source="rules")
+            self._count("timeouts")
+        else:
+            fallback = dict(rule_based_recommendations(rounded), source="rules")
+            return dict(fallback, status="pending", recommendation_id=rec_id)
+
+        with self._lock:
+            if self._pending.get(rec_id) is pending:
+                del self._pending[rec_id]
+                answer = self._store(rec_id, answer)
+            else:
+                answer = self._cache.get(rec_id, answer)
+        return dict(answer, status="ready", recommendation_id=rec_id)
+
+    def _generate(self, rounded):
+        with stage("llm_call"):
+            text = self.client.generate(PROMPT_TEMPLATE.format(**rounded))
+        return _parse_llm_answer(text)
+
+    def _store(self, rec_id, answer):
+        """Caches an answer (lock held by caller)."""
+        self._cache[rec_id] = answer
+        self._cache.move_to_end(rec_id)
+        while len(self._cache) > self.max_items:
+            self._cache.popitem(last=False)
+        return answer
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, cached=len(self._cache), pending=len(self._pending))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -3,11 +3,31 @@ import pandas as pd
 import numpy as np
 import joblib
 import geopandas as gpd
-from shapely.geometry import Polygon, Point
-import google.generativeai as genai
+from shapely.geometry import Point, shape as geojson_shape
 from dotenv import load_dotenv
-from scipy.ndimage import gaussian_filter
 import json
+import hashlib
+import threading
+from collections import namedtuple, OrderedDict
+
+from encoders import (
+    encode_grid_geojson, encode_grid_frame, grid_geometry, iter_geojson_features,
+    GRID_FRAME_MIMETYPE, GEOJSON_PREFIX, GEOJSON_SEPARATOR, GEOJSON_SUFFIX,
+)
+from inference import CompiledTreeEnsemble
+from columnar import load_or_build
+from classification import classify_risk_levels, risk_thresholds
+from diffusion import DiffusionStage, GridLayout
+from spatial import GridIndex, IT_PARK_BOUNDS, bounds_mask
+from footprints import (
+    DEFAULT_IMPACTS, FootprintScenario, apply_impacts, parse_footprint, parse_impacts, scenario_id,
+)
+from ensemble import EnsembleRunner, sample_rates
+from executor import SimulationExecutor
+from tiles import GridPyramid, TileCache, encode_tile, MAX_ZOOM
+from recommendations import RecommendationService, default_llm_client
+from metrics import stage, cache_lookup, record_payload
+from stats import LayerStats, summarize
 
 # Load env variables (API Key)
 load_dotenv()
@@ -18,93 +38,904 @@ MODEL_PATH = os.path.join(BASE_DIR, "models", "heat_risk_model.pkl")
 DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "city_with_heat_risk.csv")
 IT_PARK_PATH = os.path.join(BASE_DIR, "data", "processed", "it_park_impact.csv")
 
-# Configure Gemini
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Base grid storage: "columnar" memory-maps a per-column .npy copy of DATA_PATH
+# (built on first use, shared by all workers through the page cache); "csv" parses it
+BASE_DATA_FORMAT = os.getenv("BASE_DATA_FORMAT", "columnar")
+
+# Rendered cell footprint (degrees)
+CELL_SIZE = 0.02
+
+# Heat-risk inference backend: "sklearn" (model.predict) or "compiled" (inference.py)
+INFERENCE_BACKEND = os.getenv("HEAT_RISK_INFERENCE", "sklearn")
+
+# Re-predict only the cells a scenario changes, reusing the Before prediction ("0" disables)
+INCREMENTAL_SCENARIOS = os.getenv("SCENARIO_DELTA_EVAL", "1") != "0"
+
+# Vector tiles: on-disk tile cache ("" disables it) and per-process in-memory LRU size
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", os.path.join(BASE_DIR, "data", "tile_cache"))
+TILE_CACHE_ITEMS = int(os.getenv("TILE_CACHE_ITEMS", "4096"))
+TILE_LAYERS = ["heat_risk_index", "temperature", "traffic", "pm25", "green_cover"]
+
+# Layers summarized by get_stats (quantile breaks, histogram, sketch) for map legends
+STATS_LAYERS = TILE_LAYERS
+
+# 3D surface for the Cesium view: each layer's range is scaled to 0..SURFACE_3D_MAX_HEIGHT metres
+SURFACE_3D_MAX_HEIGHT = 300.0
+
+# Simulation input space served by the API
+SUPPORTED_YEARS = [2025, 2030, 2035, 2040]
+SCENARIOS = ["Before", "After"]
+
+# Projection assumptions: annual growth from the base year, valid up to HORIZON_END
+BASE_YEAR = 2025
+HORIZON_END = 2060
+PROJECTION_RATES = {
+    "temp_rate": 0.04,
+    "traffic_rate": 1.5,
+    "pm25_rate": 1.0,
+    "green_loss_rate": 0.5,
+}
+
+# A cached, fully serialized prediction for one (year, scenario). `changed` holds the row
+# positions re-predicted against the Before frame, or None for a full prediction.
+SimulationResult = namedtuple("SimulationResult", ["frame", "body", "etag", "changed"])
+
+# A cached response body in one transport format
+EncodedResult = namedtuple("EncodedResult", ["body", "etag", "mimetype"])
+
+# Transport formats for prediction grids: name -> (encoder, mimetype)
+TRANSPORT_FORMATS = {
+    "geojson": (encode_grid_geojson, "application/json"),
+    "binary": (encode_grid_frame, GRID_FRAME_MIMETYPE),
+}
+
+# Spatial diffusion of projected features before prediction: "off" (default), "gaussian"
+# (separable or FFT kernel, DIFFUSION_BACKEND=auto|separable|fft) or "implicit" (sparse
+# steady-state solve). DIFFUSION_SIGMA is the spread in grid cells.
+DIFFUSION = os.getenv("DIFFUSION", "off")
+DIFFUSION_SIGMA = float(os.getenv("DIFFUSION_SIGMA", "1.2"))
+DIFFUSION_BACKEND = os.getenv("DIFFUSION_BACKEND", "auto")
+DIFFUSION_COLUMNS = os.getenv("DIFFUSION_COLUMNS", "temperature,traffic,pm25").split(",")
+
+# Monte Carlo ensembles: member cap per request and worker processes ("1" runs in-process)
+ENSEMBLE_MAX_MEMBERS = int(os.getenv("ENSEMBLE_MAX_MEMBERS", "2000"))
+ENSEMBLE_WORKERS = int(os.getenv("ENSEMBLE_WORKERS", str(os.cpu_count() or 1)))
+
+# Result cache misses: concurrent identical requests share one simulation, which runs in
+# SIMULATION_WORKERS processes ("1" runs in the request thread). Beyond SIMULATION_MAX_PENDING
+# distinct simulations queued or running, requests are turned away (503).
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", str(os.cpu_count() or 1)))
+SIMULATION_MAX_PENDING = int(os.getenv("SIMULATION_MAX_PENDING", "16"))
+
+# User-defined footprint scenarios (POST /api/scenarios) kept registered, least recently used
+# evicted first together with their cached results
+FOOTPRINT_SCENARIO_ITEMS = int(os.getenv("FOOTPRINT_SCENARIO_ITEMS", "64"))
+
+# Batch scenario comparison limits and the metrics it can rank by (lower is better)
+COMPARE_MAX_SCENARIOS = int(os.getenv("COMPARE_MAX_SCENARIOS", "200"))
+COMPARE_MAX_YEARS = 8
+COMPARE_RANK_METRICS = [
+    "heat_risk_increase", "heat_risk_total", "high_risk_cells_added",
+    "temperature_rise", "traffic_increase", "pm25_worsening", "green_cover_loss",
+]
+
+# Largest k accepted by nearest-cell queries
+SPATIAL_MAX_K = 1000
+
+# Columns returned per cell by spatial queries
+CELL_COLUMNS = ["x", "y", "lat", "lon", "temperature", "traffic", "pm25", "green_cover",
+                "heat_risk_index", "risk_level"]
+
+# Streamed prediction formats: name -> mimetype. Streams are projected, predicted and
+# encoded STREAM_CHUNK_ROWS rows at a time.
+STREAM_FORMATS = {
+    "geojson": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "50000"))
+
+# Only the cells a scenario changed: aligned Before/After rows for one year
+ScenarioDelta = namedtuple("ScenarioDelta", ["year", "scenario", "before", "after"])
+
+# LLM mitigation recommendations (Gemini or LLM_ENDPOINT), cached and generated off-request
+recommendation_service = RecommendationService(default_llm_client())
+
+def file_version(path):
+    """Cheap change marker for a file: modification time and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+def project_features(cols, years_passed, rates=PROJECTION_RATES):
+    """
+    Applies the annual growth assumptions to the model feature columns.
+    `years_passed` may be a scalar or an array that broadcasts against the
+    columns, e.g. shape (n_years, 1) to project every year in one pass.
+    """
+    return {
+        "temperature": cols["temperature"] + (years_passed * rates["temp_rate"]),
+        "traffic": cols["traffic"] * (1 + (years_passed * (rates["traffic_rate"] / 100))),
+        "pm25": cols["pm25"] * (1 + (years_passed * (rates["pm25_rate"] / 100))),
+        "green_cover": cols["green_cover"] * (1 - (years_passed * (rates["green_loss_rate"] / 100))),
+    }
+
+def zone_deltas(before, after, weights=None):
+    """
+    Mean change of the model features over a zone, rounded for reporting.
+    `before`/`after` map feature names to aligned per-cell values (frames or
+    dicts of arrays); `weights` (e.g. footprint coverage) weights the means.
+    """
+    def change(col):
+        if weights is None:
+            return after[col].mean() - before[col].mean()
+        return np.average(after[col], weights=weights) - np.average(before[col], weights=weights)
+
+    return {
+        "temperature_rise": round(float(change("temperature")), 2),
+        "traffic_increase": round(float(change("traffic")), 0),
+        "pm25_worsening": round(float(change("pm25")), 2),
+        "green_cover_loss": round(float(-change("green_cover")), 1),
+    }
+
+def apply_scenario(cols, scenario_type, x, y):
+    """Adds the scenario's development impacts to projected feature columns."""
+    if scenario_type == "After":
+        it_park_mask = bounds_mask(x, y, IT_PARK_BOUNDS)
+        impacts = DEFAULT_IMPACTS
+        cols["temperature"] = np.where(it_park_mask, cols["temperature"] + impacts["temperature_delta"], cols["temperature"])
+        cols["traffic"] = np.where(it_park_mask, cols["traffic"] + impacts["traffic_delta"], cols["traffic"])
+        cols["pm25"] = np.where(it_park_mask, cols["pm25"] * impacts["pm25_factor"], cols["pm25"])
+        cols["green_cover"] = np.where(it_park_mask, cols["green_cover"] + impacts["green_cover_delta"], cols["green_cover"])
+
+    cols["traffic"] = np.clip(cols["traffic"], 0, None)
+    cols["green_cover"] = np.clip(cols["green_cover"], 0, None)
+    return cols
 
 class ModelService:
     _model = None
+    _version = None
+    _compiled = None
 
     @classmethod
     def get_model(cls):
-        if cls._model is None:
-            if not os.path.exists(MODEL_PATH):
-                raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Please run train_models.py first.")
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Please run train_models.py first.")
+        version = file_version(MODEL_PATH)
+        if cls._model is None or cls._version != version:
             cls._model = joblib.load(MODEL_PATH)
+            cls._version = version
+            cls._compiled = None
         return cls._model
 
+    @classmethod
+    def get_predictor(cls):
+        """Returns the object whose .predict() serves heat-risk inference."""
+        model = cls.get_model()
+        if INFERENCE_BACKEND == "sklearn":
+            return model
+        if INFERENCE_BACKEND != "compiled":
+            raise ValueError(f"Unknown HEAT_RISK_INFERENCE backend: {INFERENCE_BACKEND}")
+        if cls._compiled is None:
+            cls._compiled = CompiledTreeEnsemble.from_gradient_boosting(model)
+        return cls._compiled
+
+    @classmethod
+    def model_version(cls):
+        cls.get_model()
+        return cls._version
+
 class SimulationEngine:
     def __init__(self):
-        self.base_df = pd.read_csv(DATA_PATH)
-        self.model = ModelService.get_model()
         self.features = ["temperature", "traffic", "pm25", "green_cover"]
+        self._results = {}
+        self._results_lock = threading.Lock()
+        self.ensemble_runner = EnsembleRunner(workers=ENSEMBLE_WORKERS)
+        self.simulations = SimulationExecutor(SIMULATION_WORKERS, SIMULATION_MAX_PENDING)
+        self.tile_cache = TileCache(memory_items=TILE_CACHE_ITEMS, disk_dir=TILE_CACHE_DIR or None)
+        self._footprints = OrderedDict()
+        self._it_park = None   # (file version, EncodedResult) of get_it_park_geojson
+        self._load_base_data()
+
+    def _load_base_data(self):
+        self.data_version = file_version(DATA_PATH)
+        if BASE_DATA_FORMAT == "columnar":
+            # Read-only mapped columns; simulations copy before modifying
+            self.base_df = load_or_build(DATA_PATH, self.data_version)
+        else:
+            self.base_df = pd.read_csv(DATA_PATH)
+        self.model = ModelService.get_model()
+        self.predictor = ModelService.get_predictor()
+        # Row <-> (ny, nx) grid index, computed once per dataset for the diffusion stage
+        self.grid_layout = GridLayout(self.base_df["x"].to_numpy(), self.base_df["y"].to_numpy())
+        self.diffusion = None
+        if DIFFUSION != "off":
+            self.diffusion = DiffusionStage(self.grid_layout, DIFFUSION, DIFFUSION_SIGMA, DIFFUSION_BACKEND)
+        # Point / polygon / nearest-cell lookups over the cell centroids
+        self.spatial_index = GridIndex(self.base_df, CELL_SIZE)
+        # Registered footprints are rasterized against the grid they will be applied to
+        for key, footprint in list(self._footprints.items()):
+            self._footprints[key] = self._rasterize(footprint.scenario_id, footprint.geometry, footprint.impacts)
+        # Risk classes are fixed against today's city-wide heat-risk distribution
+        self.risk_thresholds = risk_thresholds(self.base_df["heat_risk_index"])
         self.n_lat = self.base_df["y"].nunique()
         self.n_lon = self.base_df["x"].nunique()
 
-    def get_prediction(self, year, scenario_type="Before"):
-        df = self.base_df.copy()
-        years_passed = max(0, year - 2025)
+    # --- Result Cache ---
+    def has_scenario(self, scenario_type):
+        """Built-in scenario or a registered footprint scenario id."""
+        return scenario_type in SCENARIOS or scenario_type in self._footprints
+
+    def _cacheable(self, year, scenario_type):
+        """Only the supported input space is retained, so arbitrary years cannot grow the cache."""
+        return year in SUPPORTED_YEARS and self.has_scenario(scenario_type)
+
+    def _cache_key(self, year, scenario_type):
+        """Keys results by inputs plus model/data versions; reloads stale inputs."""
+        model = ModelService.get_model()
+        if file_version(DATA_PATH) != self.data_version or model is not self.model:
+            with self._results_lock:
+                self._load_base_data()
+                self._results.clear()
+        return (year, scenario_type, ModelService.model_version(), self.data_version)
+
+    def get_result(self, year, scenario_type="Before"):
+        """
+        Returns the cached SimulationResult for (year, scenario), computing and
+        serializing it on a miss. The frame is shared between callers and must
+        be treated as read-only.
+        """
+        key = self._cache_key(year, scenario_type)
+        result = cache_lookup("result", self._results.get(key))
+        if result is not None:
+            return result
+
+        def simulate():
+            # A flight that finished just before this one started may have filled the cache
+            result = self._results.get(key)
+            if result is not None:
+                return result
+            print(f"Generating prediction for Year: {year}, Scenario: {scenario_type}")
+            result = self._offload_result(year, scenario_type)
+            record_payload("geojson", result.body)
+            if not self._cacheable(year, scenario_type):
+                return result
+            with self._results_lock:
+                return self._results.setdefault(key, result)
+
+        return self.simulations.coalesce(key, simulate)
+
+    def _offload_result(self, year, scenario_type):
+        """_compute_result in a simulation worker, or in this thread without a pool."""
+        if not self.simulations.offloading:
+            return self._compute_result(year, scenario_type)
+        before = None
+        if INCREMENTAL_SCENARIOS and scenario_type != "Before":
+            # Resolved here (cached or coalesced) so workers never simulate Before themselves
+            before = self.get_result(year, "Before").frame[self.features + ["heat_risk_index"]]
+        with stage("offload"):
+            return self.simulations.call(
+                self, (self.model, self.data_version), "_compute_result",
+                year, scenario_type, self._footprints.get(scenario_type), before,
+            )
+
+    def _compute_result(self, year, scenario_type, footprint=None, before=None):
+        """
+        Simulates and serializes one (year, scenario). In a worker process the
+        footprint of a registered scenario and the Before columns of an
+        incremental run are passed in, as the worker's registry and result
+        cache are a snapshot from when it was forked.
+        """
+        added = footprint is not None and footprint.scenario_id not in self._footprints
+        if added:
+            self._footprints[footprint.scenario_id] = footprint
+        try:
+            df, changed = self._simulate(year, scenario_type, before=before)
+        finally:
+            if added:
+                del self._footprints[footprint.scenario_id]
+        with stage("geojson_encode"):
+            body = self.to_geojson(df)
+        with stage("etag"):
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return SimulationResult(df, body, etag, changed)
+
+    def get_encoded(self, year, scenario_type="Before", fmt="geojson"):
+        """Returns the cached response body for (year, scenario) in a transport format."""
+        if fmt not in TRANSPORT_FORMATS:
+            raise ValueError(f"Unknown format '{fmt}'. Supported: {', '.join(TRANSPORT_FORMATS)}")
+        encoder, mimetype = TRANSPORT_FORMATS[fmt]
+
+        result = self.get_result(year, scenario_type)
+        if fmt == "geojson":
+            return EncodedResult(result.body, result.etag, mimetype)
+
+        key = (self._cache_key(year, scenario_type), fmt)
+        encoded = cache_lookup("encoded", self._results.get(key))
+        if encoded is not None:
+            return encoded
+
+        with stage(f"{fmt}_encode"):
+            body = encoder(result.frame, CELL_SIZE)
+        record_payload(fmt, body)
+        encoded = EncodedResult(body, hashlib.blake2b(body, digest_size=16).hexdigest(), mimetype)
+        if not self._cacheable(year, scenario_type):
+            return encoded
+        with self._results_lock:
+            return self._results.setdefault(key, encoded)
+
+    # --- Vector Tiles ---
+    def get_tile(self, layer, year, scenario_type, z, x, y):
+        """
+        Returns one Mapbox Vector Tile of `layer` for (year, scenario). Tiles are
+        cut from a cached mean/max pyramid of the prediction grid and kept in a
+        memory + disk LRU keyed by model/data version, so a retrained model or
+        new base data never serves stale tiles.
+        """
+        if layer not in TILE_LAYERS:
+            raise ValueError(f"Unknown layer '{layer}'. Supported: {', '.join(TILE_LAYERS)}")
+        if not self._cacheable(year, scenario_type):
+            raise ValueError(f"Tiles are served for years {SUPPORTED_YEARS} and scenarios {SCENARIOS} "
+                             f"or registered footprint scenarios")
+        if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Invalid tile {z}/{x}/{y}")
+
+        cache_key = self._cache_key(year, scenario_type)
+        _, _, model_version, data_version = cache_key
+        tile_key = f"{model_version}-{data_version}/{layer}/{year}/{scenario_type}/{z}/{x}/{y}.pbf"
+        tile = cache_lookup("tile", self.tile_cache.get(tile_key))
+        if tile is not None:
+            return tile
+
+        pyramid = self._get_pyramid(cache_key, layer)
+        with stage("tile_encode"):
+            tile = encode_tile(pyramid, layer, z, x, y)
+        record_payload("tile", tile)
+        self.tile_cache.put(tile_key, tile)
+        return tile
+
+    def _get_pyramid(self, cache_key, layer):
+        key = (cache_key, "pyramid", layer)
+        pyramid = cache_lookup("pyramid", self._results.get(key))
+        if pyramid is not None:
+            return pyramid
+
+        year, scenario_type = cache_key[:2]
+        frame = self.get_result(year, scenario_type).frame
+        with stage("pyramid_build"):
+            grid = grid_geometry(frame, CELL_SIZE)
+            values = np.full(grid["ny"] * grid["nx"], np.nan)
+            values[grid.pop("flat_index")] = frame[layer].to_numpy(dtype=np.float64)
+            pyramid = GridPyramid(values.reshape(grid["ny"], grid["nx"]), grid)
+        with self._results_lock:
+            return self._results.setdefault(key, pyramid)
+
+    # --- Layer Statistics ---
+    def get_stats(self, year, scenario_type="Before"):
+        """
+        Per-layer summaries of the prediction for (year, scenario): quantiles,
+        legend breaks, min/max, mean/std, histogram and a mergeable quantile
+        sketch (see stats.py). For the supported years they are exact, computed
+        once from the cached result and cached with it; any other year within
+        the horizon is summarized chunk by chunk without holding the full grid.
+        """
+        if not BASE_YEAR <= year <= HORIZON_END:
+            raise ValueError(f"Year must lie within {BASE_YEAR}-{HORIZON_END}")
+        if not self._cacheable(year, scenario_type):
+            return self._stream_stats(year, scenario_type)
+
+        key = (self._cache_key(year, scenario_type), "stats")
+        stats = cache_lookup("stats", self._results.get(key))
+        if stats is not None:
+            return stats
+
+        frame = self.get_result(year, scenario_type).frame
+        with stage("layer_stats"):
+            stats = {layer: summarize(frame[layer].to_numpy()) for layer in STATS_LAYERS}
+        with self._results_lock:
+            return self._results.setdefault(key, stats)
+
+    def _stream_stats(self, year, scenario_type):
+        """get_stats from prediction chunks: one LayerStats per layer, sketch quantiles."""
+        accumulators = {layer: LayerStats() for layer in STATS_LAYERS}
+        for chunk in self.iter_prediction_chunks(year, scenario_type):
+            with stage("layer_stats"):
+                for layer, accumulator in accumulators.items():
+                    accumulator.add(chunk[layer].to_numpy())
+        return {layer: accumulator.summary() for layer, accumulator in accumulators.items()}
+
+    def get_surface_3d(self, year, scenario_type, layer):
+        """
+        GeoJSON cells of one layer with an extrusion `height` in metres, the layer
+        normalized over its own min..max for (year, scenario). Cached per layer
+        next to the result, so the 3D view needs no client-side pass or disk file.
+        """
+        if layer not in STATS_LAYERS:
+            raise ValueError(f"Unknown metric '{layer}'. Supported: {', '.join(STATS_LAYERS)}")
+        if not self._cacheable(year, scenario_type):
+            raise ValueError(f"3D surfaces are served for years {SUPPORTED_YEARS} and scenarios {SCENARIOS} "
+                             f"or registered footprint scenarios")
+
+        key = (self._cache_key(year, scenario_type), "surface_3d", layer)
+        encoded = cache_lookup("surface_3d", self._results.get(key))
+        if encoded is not None:
+            return encoded
+
+        frame = self.get_result(year, scenario_type).frame
+        summary = self.get_stats(year, scenario_type)[layer]
+        with stage("surface_3d_encode"):
+            values = frame[layer].to_numpy(dtype=np.float64)
+            span = max(summary["max"] - summary["min"], 1e-6)
+            surface = pd.DataFrame({
+                "lat": frame["lat"].to_numpy(),
+                "lon": frame["lon"].to_numpy(),
+                layer: values,
+                "height": np.round((values - summary["min"]) / span * SURFACE_3D_MAX_HEIGHT, 2),
+            }, index=frame.index)
+            body = encode_grid_geojson(surface, CELL_SIZE)
+        record_payload("surface_3d", body)
+        encoded = EncodedResult(body, hashlib.blake2b(body, digest_size=16).hexdigest(), "application/json")
+        with self._results_lock:
+            return self._results.setdefault(key, encoded)
+
+    def warm_up(self, years=SUPPORTED_YEARS, scenarios=SCENARIOS):
+        """Fills the result cache for every (year, scenario) combination, format and its stats."""
+        for year in years:
+            for scenario_type in scenarios:
+                try:
+                    for fmt in TRANSPORT_FORMATS:
+                        self.get_encoded(year, scenario_type, fmt)
+                    self.get_stats(year, scenario_type)
+                except Exception as e:
+                    print(f"Warm-up failed for {year}/{scenario_type}: {e}")
+
+    def start_warm_up(self, years=SUPPORTED_YEARS, scenarios=SCENARIOS):
+        """Runs warm_up in a daemon thread so startup is not blocked."""
+        thread = threading.Thread(
+            target=self.warm_up, args=(years, scenarios), name="simulation-warm-up", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def get_scenario_delta(self, year, scenario_type="After"):
+        """Returns the Before/After rows of the cells `scenario_type` changes in `year`."""
+        before = self.get_result(year, "Before").frame
+        after = self.get_result(year, scenario_type)
+        changed = after.changed
+        if changed is None:
+            changed = self._changed_rows(before, after.frame)
+        return ScenarioDelta(year, scenario_type, before.iloc[changed], after.frame.iloc[changed])
+
+    def _changed_rows(self, before, after):
+        """Positions of rows whose model feature vector differs between two frames."""
+        a = before[self.features].to_numpy()
+        b = after[self.features].to_numpy()
+        return np.flatnonzero((a != b).any(axis=1))
+
+    def get_prediction(self, year, scenario_type="Before", incremental=None):
+        return self._simulate(year, scenario_type, incremental)[0]
+
+    def _apply_scenario(self, cols, scenario_type, x, y, start=0):
+        """
+        apply_scenario for built-in scenarios, the footprint's rasterized
+        impacts for a registered scenario id. `x`/`y` are the cells of the
+        columns' last axis, which begin at base-grid row `start`.
+        """
+        footprint = self._footprints.get(scenario_type)
+        if footprint is None:
+            return apply_scenario(cols, scenario_type, x, y)
+        inside = (footprint.rows >= start) & (footprint.rows < start + len(x))
+        return apply_impacts(cols, footprint.rows[inside] - start, footprint.coverage[inside], footprint.impacts)
+
+    def _project_frame(self, df, year, scenario_type, start=0):
+        """
+        Applies the year's projection and the scenario to the features of `df`
+        in place. `df` holds the base-grid rows from `start` on.
+        """
+        years_passed = max(0, year - BASE_YEAR)
         
         # --- 1. Projections ---
-        # Assumptions
-        temp_rate = 0.04
-        traffic_rate = 1.5
-        pm25_rate = 1.0
-        green_loss_rate = 0.5
-        
-        df["temperature"] = df["temperature"] + (years_passed * temp_rate)
-        df["traffic"] = df["traffic"] * (1 + (years_passed * (traffic_rate / 100)))
-        df["pm25"] = df["pm25"] * (1 + (years_passed * (pm25_rate / 100)))
-        df["green_cover"] = df["green_cover"] * (1 - (years_passed * (green_loss_rate / 100)))
+        cols = project_features(df, years_passed)
 
         # --- 2. Scenario Impacts ---
-        if scenario_type == "After":
-            it_park_mask = (df["x"].between(18, 21)) & (df["y"].between(10, 13))
-            df.loc[it_park_mask, "temperature"] += 1.5
-            df.loc[it_park_mask, "traffic"] += 900
-            df.loc[it_park_mask, "pm25"] *= 1.15
-            df.loc[it_park_mask, "green_cover"] -= 20
-        
-        df["traffic"] = df["traffic"].clip(lower=0)
-        df["green_cover"] = df["green_cover"].clip(lower=0)
-        
+        cols = self._apply_scenario(cols, scenario_type, df["x"].to_numpy(), df["y"].to_numpy(), start)
+        for col in self.features:
+            df[col] = cols[col]
+        return df
+
+    def _simulate(self, year, scenario_type="Before", incremental=None, before=None):
+        """
+        Runs one projection; returns (frame, changed row positions or None).
+        `before` (features and heat risk of the Before run) saves the lookup
+        of the cached Before result for incremental scenarios.
+        """
+        with stage("copy"):
+            df = self.base_df.copy()
+        with stage("projection"):
+            df = self._project_frame(df, year, scenario_type)
+
         # --- 3. Physics-Based Smoothing (Diffusion) ---
-        # Disabled to match Streamlit exactly as requested
-        # df = df.sort_values(by=["y", "x"])
-        # smooth_cols = ["temperature", "traffic", "pm25"]
-        # sigma = 1.2 
-        # for col in smooth_cols: ...
+        # Off by default to match Streamlit; needs the whole grid (see DIFFUSION)
+        if self.diffusion is not None:
+            with stage("diffusion"):
+                cols = self.diffusion.apply({col: df[col].to_numpy() for col in DIFFUSION_COLUMNS}, DIFFUSION_COLUMNS)
+                for col in DIFFUSION_COLUMNS:
+                    df[col] = cols[col]
 
         # --- 4. Run Model Prediction ---
-        X = df[self.features]
-        df["heat_risk_index"] = self.model.predict(X)
+        if incremental is None:
+            incremental = INCREMENTAL_SCENARIOS
+        if incremental and scenario_type != "Before":
+            # Cells the scenario leaves untouched keep the Before prediction for this year
+            if before is None:
+                before = self.get_result(year, "Before").frame
+            if len(before) == len(df):
+                with stage("prediction"):
+                    changed = self._changed_rows(before, df)
+                    risk = before["heat_risk_index"].to_numpy().copy()
+                    if len(changed):
+                        risk[changed] = self.predictor.predict(df[self.features].iloc[changed])
+                    df["heat_risk_index"] = risk
+                return self._classify(df), changed
+
+        with stage("prediction"):
+            X = df[self.features]
+            df["heat_risk_index"] = self.predictor.predict(X)
         
+        return self._classify(df), None
+
+    def _classify(self, df):
+        """Adds the Low/Medium/High `risk_level` of every cell's predicted heat risk."""
+        with stage("classification"):
+            df["risk_level"] = classify_risk_levels(df["heat_risk_index"].to_numpy(), *self.risk_thresholds)
         return df
 
+    # --- Footprint Scenarios ---
+    def _rasterize(self, scenario_id, geometry, impacts):
+        rows, coverage = self.spatial_index.coverage(geometry)
+        if not len(rows):
+            raise ValueError("footprint does not overlap the city grid")
+        return FootprintScenario(scenario_id, geometry, impacts, rows, coverage)
+
+    def register_footprint(self, footprint, impacts=None):
+        """
+        Registers a development proposal: a GeoJSON footprint rasterized onto
+        the grid with fractional cell coverage, plus impact parameters over
+        DEFAULT_IMPACTS. The scenario id is a hash of both, so re-posting the
+        same proposal returns the same id and its cached results.
+        """
+        geometry = parse_footprint(footprint)
+        impacts = parse_impacts(impacts)
+        key = scenario_id(geometry, impacts)
+        with self._results_lock:
+            existing = self._footprints.get(key)
+            if existing is not None:
+                self._footprints.move_to_end(key)
+                return existing
+
+        registered = self._rasterize(key, geometry, impacts)
+        with self._results_lock:
+            registered = self._footprints.setdefault(key, registered)
+            self._footprints.move_to_end(key)
+            while len(self._footprints) > FOOTPRINT_SCENARIO_ITEMS:
+                evicted, _ = self._footprints.popitem(last=False)
+                # Result keys are a cache key (year, scenario, ...) or start with one
+                for cached in [k for k in self._results if (k[0] if isinstance(k[0], tuple) else k)[1] == evicted]:
+                    del self._results[cached]
+        return registered
+
+    def get_footprint(self, scenario_id):
+        """The registered FootprintScenario for an id, or None."""
+        return self._footprints.get(scenario_id)
+
+    def footprint_summary(self, scenario_id, year):
+        """
+        Describes a registered footprint and its effect in `year`: coverage-weighted
+        Before/After means of every metric over the footprint's cells.
+        """
+        footprint = self._footprints.get(scenario_id)
+        if footprint is None:
+            raise KeyError(scenario_id)
+        before = self.get_result(year, "Before").frame
+        after = self.get_result(year, scenario_id).frame
+
+        metrics = {}
+        for col in self.features + ["heat_risk_index"]:
+            b = np.average(before[col].to_numpy()[footprint.rows], weights=footprint.coverage)
+            a = np.average(after[col].to_numpy()[footprint.rows], weights=footprint.coverage)
+            metrics[col] = {"before": float(b), "after": float(a), "delta": float(a - b)}
+        return {
+            "scenario_id": scenario_id,
+            "year": year,
+            "impacts": footprint.impacts,
+            "footprint": footprint.geometry.__geo_interface__,
+            "cells": len(footprint.rows),
+            "covered_cells": round(float(footprint.coverage.sum()), 4),
+            "metrics": metrics,
+        }
+
+    # --- Scenario Comparison ---
+    def _scenario_cells(self, scenario_type):
+        """(rows, coverage, footprint or None) of the base-grid cells a scenario modifies."""
+        footprint = self._footprints.get(scenario_type)
+        if footprint is not None:
+            return footprint.rows, footprint.coverage, footprint
+        if scenario_type == "After":
+            rows = self.spatial_index.in_bounds(IT_PARK_BOUNDS)
+            return rows, np.ones(len(rows)), None
+        raise ValueError(f"Cannot compare scenario '{scenario_type}'; use After or a footprint scenario id")
+
+    def _project_cells(self, base, scenario_type, footprint, rows, coverage, year):
+        """Projected, scenario-adjusted feature columns of the given rows of `base` (column arrays) only."""
+        cols = project_features({col: base[col][rows] for col in self.features}, max(0, year - BASE_YEAR))
+        if footprint is not None:
+            return apply_impacts(cols, np.arange(len(rows)), coverage, footprint.impacts)
+        return apply_scenario(cols, scenario_type, base["x"][rows], base["y"][rows])
+
+    def compare_scenarios(self, scenarios, years, rank_by="heat_risk_increase"):
+        """
+        Ranks K candidate scenarios (After, registered ids, or inline
+        {"footprint", "impacts"} proposals) against the shared Before baseline
+        of each year. The baseline comes from the result cache; each scenario
+        only projects the cells it modifies, and all (scenario, year) blocks
+        are scored in one stacked model call. Scenarios are ranked by
+        `rank_by` in the last year, smallest increase first.
+        """
+        if not 1 <= len(scenarios) <= COMPARE_MAX_SCENARIOS:
+            raise ValueError(f"Compare between 1 and {COMPARE_MAX_SCENARIOS} scenarios")
+        years = sorted({int(y) for y in years})
+        if not 1 <= len(years) <= COMPARE_MAX_YEARS or years[0] < BASE_YEAR or years[-1] > HORIZON_END:
+            raise ValueError(f"Compare 1-{COMPARE_MAX_YEARS} years within {BASE_YEAR}-{HORIZON_END}")
+        if rank_by not in COMPARE_RANK_METRICS:
+            raise ValueError(f"Unknown rank_by '{rank_by}'. Supported: {', '.join(COMPARE_RANK_METRICS)}")
+
+        # Resolved up front: registering many proposals may evict earlier ones from the registry
+        cells = {}
+        for scenario in scenarios:
+            if isinstance(scenario, dict):
+                footprint = self.register_footprint(scenario.get("footprint"), scenario.get("impacts"))
+                cells[footprint.scenario_id] = (footprint.rows, footprint.coverage, footprint)
+            elif scenario not in cells:
+                if not self.has_scenario(scenario):
+                    raise ValueError(f"Unknown scenario '{scenario}'")
+                cells[scenario] = self._scenario_cells(scenario)
+        ids = list(cells)
+
+        # Column arrays, fetched once: the base grid and each year's cached Before run
+        base = {col: self.base_df[col].to_numpy() for col in self.features + ["x", "y"]}
+        baselines = {}
+        for year in years:
+            frame = self.get_result(year, "Before").frame
+            baselines[year] = {col: frame[col].to_numpy() for col in self.features + ["heat_risk_index"]}
+        blocks = []
+        for year in years:
+            for sid in ids:
+                rows, coverage, footprint = cells[sid]
+                if self.diffusion is not None:
+                    # Diffusion spreads impacts beyond the footprint: take the full cached run
+                    if footprint is not None and not self.has_scenario(sid):
+                        raise ValueError(f"Compare at most {FOOTPRINT_SCENARIO_ITEMS} footprints while diffusion is enabled")
+                    after = self.get_result(year, sid).frame
+                    rows = self._changed_rows(self.get_result(year, "Before").frame, after)
+                    coverage = np.ones(len(rows))
+                    blocks.append((year, sid, rows, coverage, {col: after[col].to_numpy()[rows] for col in self.features}))
+                else:
+                    blocks.append((year, sid, rows, coverage, self._project_cells(base, sid, footprint, rows, coverage, year)))
+
+        # One model call for every affected cell of every scenario and year
+        X = pd.DataFrame({col: np.concatenate([np.asarray(b[4][col], dtype=np.float64) for b in blocks])
+                          for col in self.features})
+        with stage("prediction"):
+            risk = np.split(self.predictor.predict(X) if len(X) else np.empty(0),
+                            np.cumsum([len(b[2]) for b in blocks])[:-1])
+
+        results = {sid: {"scenario_id": sid, "cells": len(cells[sid][0]),
+                         "covered_cells": round(float(cells[sid][1].sum()), 4), "years": {}} for sid in ids}
+        high = self.risk_thresholds[1]
+        for (year, sid, rows, coverage, after), after_risk in zip(blocks, risk):
+            if not len(rows):
+                results[sid]["years"][year] = dict.fromkeys(COMPARE_RANK_METRICS, 0)
+                continue
+            before_cols = {col: values[rows] for col, values in baselines[year].items()}
+            before_risk = before_cols.pop("heat_risk_index")
+            change = after_risk - before_risk
+            metrics = zone_deltas(before_cols, after, coverage)
+            metrics.update({
+                "heat_risk_increase": round(float(np.average(change, weights=coverage)), 4),
+                "heat_risk_total": round(float(change.sum()), 4),
+                "high_risk_cells_added": int((after_risk >= high).sum() - (before_risk >= high).sum()),
+            })
+            results[sid]["years"][year] = metrics
+
+        ranked = sorted(ids, key=lambda sid: results[sid]["years"][years[-1]][rank_by])
+        for rank, sid in enumerate(ranked, start=1):
+            results[sid]["rank"] = rank
+        return {"years": years, "rank_by": rank_by, "scenarios": [results[sid] for sid in ranked]}
+
+    # --- Spatial Queries ---
+    def _cell_records(self, frame, rows):
+        return frame[CELL_COLUMNS].iloc[rows].to_dict("records")
+
+    def query_point(self, year, scenario_type, lat, lon):
+        """The cell containing (lat, lon) in the (year, scenario) prediction; None outside the grid."""
+        frame = self.get_result(year, scenario_type).frame
+        row = int(self.spatial_index.locate(lat, lon))
+        return None if row < 0 else self._cell_records(frame, [row])[0]
+
+    def query_region(self, year, scenario_type, geometry):
+        """
+        Cells intersecting a GeoJSON geometry (or Feature) plus the mean of
+        every metric over them, e.g. for a user-drawn site.
+        """
+        if geometry.get("type") == "Feature":
+            geometry = geometry.get("geometry") or {}
+        try:
+            shape = geojson_shape(geometry)
+        except Exception as e:
+            raise ValueError(f"Invalid GeoJSON geometry: {e}")
+        if shape.is_empty or not shape.is_valid:
+            raise ValueError("GeoJSON geometry is empty or invalid")
+
+        frame = self.get_result(year, scenario_type).frame
+        rows = self.spatial_index.intersecting(shape)
+        zone = frame.iloc[rows]
+        summary = {col: float(zone[col].mean()) for col in self.features + ["heat_risk_index"]} if len(rows) else {}
+        return {"count": len(rows), "summary": summary, "cells": self._cell_records(frame, rows)}
+
+    def query_nearest(self, year, scenario_type, lat, lon, k=8):
+        """The k cells nearest to (lat, lon), closest first, with their distance in metres."""
+        if not 1 <= k <= SPATIAL_MAX_K:
+            raise ValueError(f"k must be between 1 and {SPATIAL_MAX_K}")
+        frame = self.get_result(year, scenario_type).frame
+        rows, distances = self.spatial_index.nearest(lat, lon, k)
+        cells = self._cell_records(frame, rows)
+        for cell, distance in zip(cells, distances):
+            cell["distance_m"] = round(float(distance), 1)
+        return cells
+
+    # --- Streaming ---
+    def iter_prediction_chunks(self, year, scenario_type="Before", chunk_rows=STREAM_CHUNK_ROWS):
+        """
+        Yields the prediction frame for (year, scenario) as consecutive row
+        chunks. A cached result is sliced; otherwise every chunk is projected
+        and predicted on its own, so memory is bounded by `chunk_rows` instead
+        of the grid size. The model scores rows independently, so chunked and
+        full-batch predictions are identical. Diffusion couples neighbouring
+        cells, so with it enabled the full result is computed and sliced.
+        """
+        cached = self._results.get(self._cache_key(year, scenario_type))
+        if cached is None and self.diffusion is not None:
+            cached = self.get_result(year, scenario_type)
+        if cached is not None:
+            for start in range(0, len(cached.frame), chunk_rows):
+                yield cached.frame.iloc[start:start + chunk_rows]
+            return
+
+        base_df, predictor = self.base_df, self.predictor
+        for start in range(0, len(base_df), chunk_rows):
+            df = self._project_frame(base_df.iloc[start:start + chunk_rows].copy(), year, scenario_type, start)
+            df["heat_risk_index"] = predictor.predict(df[self.features])
+            yield self._classify(df)
+
+    def stream_encoded(self, year, scenario_type="Before", fmt="geojson", chunk_rows=STREAM_CHUNK_ROWS):
+        """
+        Returns (body generator, mimetype) for a streamed prediction response.
+        "geojson" yields the same bytes as the buffered FeatureCollection;
+        "ndjson" yields one GeoJSON Feature per line.
+        """
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Format '{fmt}' cannot be streamed. Supported: {', '.join(STREAM_FORMATS)}")
+
+        def blocks():
+            for chunk in self.iter_prediction_chunks(year, scenario_type, chunk_rows):
+                yield from iter_geojson_features(chunk, CELL_SIZE)
+
+        def feature_collection():
+            yield GEOJSON_PREFIX
+            for i, block in enumerate(blocks()):
+                if i:
+                    yield GEOJSON_SEPARATOR
+                yield ", ".join(block).encode("utf-8")
+            yield GEOJSON_SUFFIX
+
+        def feature_lines():
+            for block in blocks():
+                yield ("\n".join(block) + "\n").encode("utf-8")
+
+        body = feature_lines() if fmt == "ndjson" else feature_collection()
+        return body, STREAM_FORMATS[fmt]
+
+    def predict_horizon(self, years, scenario_type="Before"):
+        """
+        Projects every requested year at once: the (years x cells) feature
+        grids are stacked into one matrix for a single batched model call.
+        Returns cell coordinates plus per-cell series shaped (cells, years).
+        """
+        years = np.unique(np.asarray(years, dtype=int))
+        if len(years) == 0 or years[0] < BASE_YEAR or years[-1] > HORIZON_END:
+            raise ValueError(f"Years must lie within {BASE_YEAR}-{HORIZON_END}")
+
+        df = self.base_df
+        years_passed = (years - BASE_YEAR)[:, None]
+        with stage("projection"):
+            cols = project_features({col: df[col].to_numpy()[None, :] for col in self.features}, years_passed)
+            cols = self._apply_scenario(cols, scenario_type, df["x"].to_numpy(), df["y"].to_numpy())
+        if self.diffusion is not None:
+            with stage("diffusion"):
+                cols = self.diffusion.apply(
+                    {col: np.broadcast_to(v, (len(years), len(df))) for col, v in cols.items()}, DIFFUSION_COLUMNS
+                )
+
+        n_years, n_cells = len(years), len(df)
+        with stage("prediction"):
+            X = pd.DataFrame({col: cols[col].ravel() for col in self.features})
+            risk = self.predictor.predict(X).reshape(n_years, n_cells)
+
+        series = {col: cols[col].T for col in self.features}
+        series["heat_risk_index"] = risk.T
+        return {
+            "years": years,
+            "scenario": scenario_type,
+            "cells": {col: df[col].to_numpy() for col in ["x", "y", "lat", "lon"]},
+            "series": series,
+        }
+
+    def predict_ensemble(self, year, scenario_type="Before", members=200, seed=0):
+        """
+        Monte Carlo projection: samples `members` sets of growth rates around
+        PROJECTION_RATES and returns the per-cell mean and P10/P90 band of the
+        heat risk. Results are deterministic for a seed and cached for the
+        supported years and scenarios. Members are projected cell-block by
+        cell-block, so the diffusion stage is not applied to them.
+        """
+        if not 1 <= members <= ENSEMBLE_MAX_MEMBERS:
+            raise ValueError(f"members must be between 1 and {ENSEMBLE_MAX_MEMBERS}")
+        if year < BASE_YEAR or year > HORIZON_END:
+            raise ValueError(f"Year must lie within {BASE_YEAR}-{HORIZON_END}")
+        if scenario_type not in SCENARIOS:
+            raise ValueError(f"Ensembles are run for scenarios {SCENARIOS}")
+
+        key = (self._cache_key(year, scenario_type), "ensemble", members, seed)
+        result = cache_lookup("ensemble", self._results.get(key))
+        if result is not None:
+            return result
+
+        df = self.base_df
+        member_rates = sample_rates(PROJECTION_RATES, members, seed)
+        with stage("ensemble"):
+            bands = self.ensemble_runner.run(
+                self.predictor, self.features, project_features, apply_scenario,
+                df, max(0, year - BASE_YEAR), scenario_type, member_rates,
+            )
+        result = {
+            "year": year,
+            "scenario": scenario_type,
+            "members": members,
+            "seed": seed,
+            "cells": {col: df[col].to_numpy() for col in ["x", "y", "lat", "lon"]},
+            "heat_risk_index": bands,
+        }
+        if year not in SUPPORTED_YEARS or scenario_type not in SCENARIOS:
+            return result
+        with self._results_lock:
+            return self._results.setdefault(key, result)
+
     def to_geojson(self, df):
-        grid_size = 0.02
-        polygons = []
-        
-        for _, row in df.iterrows():
-            lat, lon = row["lat"], row["lon"]
-            polygon = Polygon([
-                (lon - grid_size/2, lat - grid_size/2),
-                (lon + grid_size/2, lat - grid_size/2),
-                (lon + grid_size/2, lat + grid_size/2),
-                (lon - grid_size/2, lat + grid_size/2)
-            ])
-            polygons.append(polygon)
-            
-        gdf = gpd.GeoDataFrame(df, geometry=polygons, crs="EPSG:4326")
-        return gdf.to_json() 
+        """Serializes a prediction frame to GeoJSON bytes (one square cell per row)."""
+        return encode_grid_geojson(df, CELL_SIZE)
 
     def get_it_park_geojson(self):
-        """Generates GeoJSON containing both the Boundary Polygon AND Points."""
+        """
+        Returns the IT park boundary (convex hull) and points as a cached
+        EncodedResult GeoJSON, or None if the data is unavailable. Rebuilt only
+        when IT_PARK_PATH changes on disk.
+        """
         try:
             if not os.path.exists(IT_PARK_PATH):
                 return None
-            
+            version = file_version(IT_PARK_PATH)
+            hit = self._it_park if self._it_park is not None and self._it_park[0] == version else None
+            if cache_lookup("it_park", hit) is not None:
+                return hit[1]
+
             df = pd.read_csv(IT_PARK_PATH)
             
             # 1. Create Points
@@ -121,54 +952,50 @@ class SimulationEngine:
             # 3. Combine
             combined_gdf = pd.concat([gdf_boundary, gdf_points], ignore_index=True)
             
-            return combined_gdf.to_json()
+            body = combined_gdf.to_json().encode("utf-8")
+            encoded = EncodedResult(body, hashlib.blake2b(body, digest_size=16).hexdigest(), "application/json")
+            self._it_park = (version, encoded)
+            return encoded
         except Exception as e:
             print(f"Error generating IT Park GeoJSON: {e}")
             return None
 
 class ImpactAnalysisEngine:
     @staticmethod
-    def analyze_impact(base_df, future_df):
-        mask = (future_df["x"].between(18, 21)) & (future_df["y"].between(10, 13))
-        
-        if not mask.any():
-            return {"delta_metrics": {}, "recommendations": [], "severity": "Low"}
+    def analyze_impact(base_df, future_df=None, wait=0.0):
+        """
+        Compares Before/After frames over the IT park zone. Also accepts a
+        ScenarioDelta in place of the two frames, which only carries the cells
+        the scenario changed. `wait` bounds how long to block for a fresh LLM
+        recommendation before answering with the rule-based one.
+        """
+        if isinstance(base_df, ScenarioDelta):
+            base_df, future_df = base_df.before, base_df.after
 
-        base_zone = base_df.loc[mask]
-        future_zone = future_df.loc[mask]
-        
-        deltas = {
-            "temperature_rise": round(future_zone["temperature"].mean() - base_zone["temperature"].mean(), 2),
-            "traffic_increase": round(future_zone["traffic"].mean() - base_zone["traffic"].mean(), 0),
-            "pm25_worsening": round(future_zone["pm25"].mean() - base_zone["pm25"].mean(), 2),
-            "green_cover_loss": round(base_zone["green_cover"].mean() - future_zone["green_cover"].mean(), 1)
-        }
+        with stage("impact_deltas"):
+            mask = bounds_mask(future_df["x"], future_df["y"], IT_PARK_BOUNDS)
+            
+            if not mask.any():
+                return {"delta_metrics": {}, "recommendations": [], "severity": "Low", "recommendation_status": "ready"}
 
-        if GEMINI_API_KEY:
-            try:
-                model = genai.GenerativeModel('gemini-pro')
-                prompt = f"""
-                You are a City Planner.
-                Data:
-                Temp Rise: {deltas['temperature_rise']}C
-                Traffic: +{deltas['traffic_increase']}
-                PM2.5: +{deltas['pm25_worsening']}
-                Green Loss: {deltas['green_cover_loss']}%
-                
-                Provide:
-                1. Severity (Low/Moderate/High/Critical)
-                2. 3 short, specific mitigation strategies.
-                Output JSON: {{ "severity": "...", "recommendations": [...] }}
-                """
-                response = model.generate_content(prompt)
-                clean_text = response.text.replace("```json", "").replace("```", "").strip()
-                result = json.loads(clean_text)
-                return {"delta_metrics": deltas, "recommendations": result.get("recommendations", []), "severity": result.get("severity", "Moderate")}
-            except:
-                pass
-        
+            base_zone = base_df.loc[mask]
+            future_zone = future_df.loc[mask]
+            
+            deltas = zone_deltas(base_zone, future_zone)
+
+        # Recommendations never block on the LLM: cached, rule-based, or pending a poll
+        with stage("recommendations"):
+            advice = recommendation_service.recommend(deltas, wait=wait)
         return {
             "delta_metrics": deltas,
-            "recommendations": ["Green buffers", "Traffic management", "Cool roofs"],
-            "severity": "Moderate"
+            "recommendations": advice["recommendations"],
+            "severity": advice["severity"],
+            "recommendation_status": advice["status"],
+            "recommendation_source": advice["source"],
+            "recommendation_id": advice["recommendation_id"],
         }
+
+    @staticmethod
+    def poll_recommendations(recommendation_id):
+        """Follow-up for a pending analysis; None if the id is unknown."""
+        return recommendation_service.poll(recommendation_id)
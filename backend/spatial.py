@@ -0,0 +1,133 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+
+from encoders import grid_geometry
+
+# Inclusive range of grid cell indices
+GridBounds = namedtuple("GridBounds", ["x_min", "x_max", "y_min", "y_max"])
+
+# Footprint of the proposed IT park on the city grid (shared by the scenario,
+# the impact analysis and src/simulate_it_park.py)
+IT_PARK_BOUNDS = GridBounds(18, 21, 10, 13)
+
+# Covered cell fractions below this are treated as slivers from coordinate rounding
+MIN_COVERAGE = 1e-6
+
+# Metres per degree of latitude, for reported kNN distances
+METERS_PER_DEGREE = 111_320.0
+
+
+def bounds_mask(x, y, bounds=IT_PARK_BOUNDS):
+    """Elementwise: does cell (x, y) lie inside `bounds`? Works on any broadcastable arrays."""
+    return (x >= bounds.x_min) & (x <= bounds.x_max) & (y >= bounds.y_min) & (y <= bounds.y_max)
+
+
+class GridIndex:
+    """
+    Spatial index over the cell centroids of a regular grid frame.
+
+    The dense (ny, nx) table of row positions answers point lookups in O(1)
+    and bounding-box windows in O(cells in the window); polygon queries only
+    test the cells of the polygon's bounding box. A KD-tree over the
+    centroids (built on first use) answers k-nearest queries in O(log n).
+    Every query returns row positions into the frame the index was built from.
+    """
+
+    def __init__(self, df, cell_size):
+        grid = grid_geometry(df, cell_size)
+        self.nx, self.ny = grid["nx"], grid["ny"]
+        self.x0, self.y0 = grid["x0"], grid["y0"]
+        self.origin = np.array(grid["origin"])
+        self.step = np.array(grid["step"])
+        self.rows = np.full(self.nx * self.ny, -1, dtype=np.int64)
+        self.rows[grid["flat_index"]] = np.arange(len(df))
+        self.rows = self.rows.reshape(self.ny, self.nx)
+
+        self._lonlat = np.column_stack([df["lon"].to_numpy(), df["lat"].to_numpy()])
+        # Degrees of longitude shrink with latitude; scale them for planar distances
+        self._lon_scale = np.cos(np.radians(self._lonlat[:, 1].mean())) if len(df) else 1.0
+        self._tree = None
+        self._tree_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lonlat)
+
+    # --- Grid lookups ---
+    def locate(self, lat, lon):
+        """Row position of the cell containing (lat, lon), or -1 outside the grid. Vectorized."""
+        i = np.rint((np.asarray(lon, dtype=np.float64) - self.origin[0]) / self.step[0]).astype(np.int64)
+        j = np.rint((np.asarray(lat, dtype=np.float64) - self.origin[1]) / self.step[1]).astype(np.int64)
+        inside = (i >= 0) & (i < self.nx) & (j >= 0) & (j < self.ny)
+        return np.where(inside, self.rows[np.where(inside, j, 0), np.where(inside, i, 0)], -1)
+
+    def in_bounds(self, bounds):
+        """Row positions of the cells inside GridBounds (cell indices)."""
+        window = self.rows[
+            max(bounds.y_min - self.y0, 0):max(bounds.y_max - self.y0 + 1, 0),
+            max(bounds.x_min - self.x0, 0):max(bounds.x_max - self.x0 + 1, 0),
+        ]
+        return np.sort(window[window >= 0])
+
+    def _window(self, lon_min, lat_min, lon_max, lat_max):
+        """Cell indices (i, j) of the cells whose footprint overlaps a lon/lat box."""
+        lo = np.floor((np.array([lon_min, lat_min]) - self.origin) / self.step + 0.5).astype(np.int64)
+        hi = np.ceil((np.array([lon_max, lat_max]) - self.origin) / self.step - 0.5).astype(np.int64)
+        lo = np.maximum(lo, 0)
+        hi = np.minimum(hi, [self.nx - 1, self.ny - 1])
+        if (hi < lo).any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        j, i = np.mgrid[lo[1]:hi[1] + 1, lo[0]:hi[0] + 1]
+        return i.ravel(), j.ravel()
+
+    def _candidate_cells(self, geometry):
+        """(row positions, cell footprints) of the existing cells in the geometry's bounding box."""
+        i, j = self._window(*geometry.bounds)
+        rows = self.rows[j, i]
+        i, j, rows = i[rows >= 0], j[rows >= 0], rows[rows >= 0]
+        lon = self.origin[0] + i * self.step[0]
+        lat = self.origin[1] + j * self.step[1]
+        half = self.step / 2
+        return rows, shapely.box(lon - half[0], lat - half[1], lon + half[0], lat + half[1])
+
+    def intersecting(self, geometry):
+        """
+        Row positions of the cells whose footprint (one grid step around the
+        centroid) intersects a shapely geometry, in frame order.
+        """
+        rows, cells = self._candidate_cells(geometry)
+        if not len(rows):
+            return rows
+        shapely.prepare(geometry)
+        return np.sort(rows[shapely.intersects(geometry, cells)])
+
+    def coverage(self, geometry):
+        """
+        Rasterizes a polygon: (row positions, covered fraction of each cell)
+        for every cell the polygon covers by at least MIN_COVERAGE, in frame order.
+        """
+        rows, cells = self._candidate_cells(geometry)
+        if not len(rows):
+            return rows, np.empty(0)
+        fraction = shapely.area(shapely.intersection(cells, geometry)) / (self.step[0] * self.step[1])
+        keep = fraction >= MIN_COVERAGE
+        order = np.argsort(rows[keep])
+        return rows[keep][order], np.minimum(fraction[keep][order], 1.0)
+
+    # --- Nearest neighbours ---
+    def _get_tree(self):
+        with self._tree_lock:
+            if self._tree is None:
+                self._tree = cKDTree(self._lonlat * [self._lon_scale, 1.0])
+            return self._tree
+
+    def nearest(self, lat, lon, k=1):
+        """(row positions, distances in metres) of the k cells nearest to (lat, lon), closest first."""
+        k = min(int(k), len(self))
+        if k < 1:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        distances, rows = self._get_tree().query([lon * self._lon_scale, lat], k=[*range(1, k + 1)])
+        return np.asarray(rows, dtype=np.int64), np.asarray(distances) * METERS_PER_DEGREE
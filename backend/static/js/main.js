@@ -47,12 +47,14 @@ els.closeAiPanel.addEventListener('click', () => { els.aiPanel.classList.add('hi
 async function fetchData() {
     setLoading(true);
     try {
-        // 1. Prediction Grid
-        const predUrl = `/api/predictions?year=${state.year}&scenario=${state.scenario}`;
-        const predRes = await fetch(predUrl);
-        const predData = await predRes.json();
+        // 1. Prediction Grid (binary columnar frame, expanded to features for Leaflet)
+        // Legend breaks come precomputed from /api/stats instead of a pass over every feature
+        const predUrl = `/api/predictions?year=${state.year}&scenario=${state.scenario}&format=binary`;
+        const statsUrl = `/api/stats?year=${state.year}&scenario=${state.scenario}&metric=${state.feature}`;
+        const [predRes, statsRes] = await Promise.all([fetch(predUrl), fetch(statsUrl)]);
+        const predData = gridFrameToGeoJSON(decodeGridFrame(await predRes.arrayBuffer()));
 
-        const quantiles = calculateQuantiles(predData, state.feature);
+        const quantiles = legendBreaks(await statsRes.json(), state.feature);
 
         if (geoJsonLayer) map.removeLayer(geoJsonLayer);
 
@@ -147,11 +149,59 @@ async function fetchITParkLayer() {
     }
 }
 
-function calculateQuantiles(data, property) {
-    const values = data.features.map(f => f.properties[property]).sort((a, b) => a - b);
-    if (values.length === 0) return { q20: 0, q40: 0, q60: 0, q80: 0 };
-    const getQ = (q) => values[Math.floor((values.length - 1) * q)];
-    return { q20: getQ(0.20), q40: getQ(0.40), q60: getQ(0.60), q80: getQ(0.80) };
+// Binary grid frame: "IDGF" | uint32 LE header length | JSON header | 8-byte aligned
+// float32 columns of ny * nx values, row-major (y, x), NaN where there is no cell.
+// Columns are Float32Array views over the response buffer (no copy).
+function decodeGridFrame(buffer) {
+    const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+    if (magic !== "IDGF") throw new Error("Not an IndiEM grid frame");
+    const headerLen = new DataView(buffer).getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLen)));
+    const base = 8 + headerLen;
+
+    const columns = {};
+    header.columns.forEach(col => {
+        columns[col.name] = new Float32Array(buffer, base + col.offset, col.count);
+    });
+    return { header, columns };
+}
+
+function gridFrameToGeoJSON(frame) {
+    const g = frame.header.grid;
+    const names = Object.keys(frame.columns);
+    const half = g.cell_size / 2;
+    const features = [];
+
+    for (let iy = 0; iy < g.ny; iy++) {
+        for (let ix = 0; ix < g.nx; ix++) {
+            const i = iy * g.nx + ix;
+            if (names.every(n => Number.isNaN(frame.columns[n][i]))) continue;
+
+            const properties = { x: ix + g.x0, y: iy + g.y0 };
+            names.forEach(n => { properties[n] = frame.columns[n][i]; });
+
+            const lon = g.origin[0] + ix * g.step[0];
+            const lat = g.origin[1] + iy * g.step[1];
+            features.push({
+                type: "Feature",
+                properties,
+                geometry: {
+                    type: "Polygon",
+                    coordinates: [[
+                        [lon - half, lat - half], [lon + half, lat - half],
+                        [lon + half, lat + half], [lon - half, lat + half], [lon - half, lat - half]
+                    ]]
+                }
+            });
+        }
+    }
+    return { type: "FeatureCollection", features };
+}
+
+function legendBreaks(stats, property) {
+    const breaks = stats.layers[property].breaks;
+    if (breaks.length === 0) return { q20: 0, q40: 0, q60: 0, q80: 0 };
+    return { q20: breaks[0], q40: breaks[1], q60: breaks[2], q80: breaks[3] };
 }
 
 function getFeatureStyle(feature, q) {
@@ -196,11 +246,30 @@ async function fetchAIAnalysis() {
                 <div class="metric"><span class="metric-label">PM2.5</span><span class="metric-value">+${m.pm25_worsening}</span></div>
             `;
         }
-        els.aiSeverity.innerText = data.severity;
-        els.aiRecommendations.innerHTML = data.recommendations.map(r => `<div class="rec-item">${r}</div>`).join('');
+        renderRecommendations(data);
+        if (data.recommendation_status === 'pending') pollRecommendations(data.recommendation_id, state.year);
     } catch (e) { els.aiRecommendations.innerHTML = "Analysis Failed"; }
 }
 
+function renderRecommendations(data) {
+    els.aiSeverity.innerText = data.severity;
+    els.aiRecommendations.innerHTML = data.recommendations.map(r => `<div class="rec-item">${r}</div>`).join('');
+}
+
+async function pollRecommendations(id, year, attempt = 0) {
+    /* Rule-based advice is shown at once; swap in the LLM answer when it is ready */
+    if (attempt >= 10 || year !== state.year) return;
+    await new Promise(resolve => setTimeout(resolve, 1000));
+    try {
+        const res = await fetch(`/api/impact-analysis/recommendations/${id}`);
+        if (!res.ok) return;
+        const data = await res.json();
+        if (year !== state.year) return;
+        if (data.status === 'ready') renderRecommendations(data);
+        else pollRecommendations(id, year, attempt + 1);
+    } catch (e) { /* keep the rule-based advice */ }
+}
+
 function updateLegend(q) {
     let html = `<b>${state.feature}</b><br>`;
     html += `<div style="display:flex; align-items:center;"><span style="background:${PALETTE.q20}; width:10px; height:10px; margin-right:5px;"></span> Low</div>`;
@@ -0,0 +1,255 @@
+import math
+
+import numpy as np
+
+# Quantile levels reported per layer, and the quintile cut points map legends use
+QUANTILE_LEVELS = (0.05, 0.1, 0.2, 0.25, 0.4, 0.5, 0.6, 0.75, 0.8, 0.9, 0.95)
+BREAK_LEVELS = (0.2, 0.4, 0.6, 0.8)
+
+# Equal-width histogram bins between a layer's min and max
+HISTOGRAM_BINS = 32
+
+# Relative error of sketch quantiles: any reported value v' of a true quantile v
+# satisfies |v' - v| <= SKETCH_RELATIVE_ACCURACY * |v|
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Magnitudes below this are counted in the sketch's zero bucket
+SKETCH_MIN_MAGNITUDE = 1e-9
+
+
+class _BucketStore:
+    """Contiguous bucket counts for the integer keys [offset, offset + len(counts))."""
+
+    def __init__(self, offset=0, counts=None):
+        self.offset = offset
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def _extend(self, lo, hi):
+        """Grows the key range to cover [lo, hi]."""
+        if not len(self.counts):
+            self.offset, self.counts = lo, np.zeros(hi - lo + 1, dtype=np.int64)
+            return
+        new_lo, new_hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        if (new_lo, new_hi) != (self.offset, self.offset + len(self.counts) - 1):
+            counts = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+            counts[self.offset - new_lo:self.offset - new_lo + len(self.counts)] = self.counts
+            self.offset, self.counts = new_lo, counts
+
+    def add_keys(self, keys):
+        if not len(keys):
+            return
+        lo, hi = int(keys.min()), int(keys.max())
+        self._extend(lo, hi)
+        self.counts[lo - self.offset:hi - self.offset + 1] += np.bincount(keys - lo, minlength=hi - lo + 1)
+
+    def merge(self, other):
+        if not len(other.counts):
+            return
+        self._extend(other.offset, other.offset + len(other.counts) - 1)
+        start = other.offset - self.offset
+        self.counts[start:start + len(other.counts)] += other.counts
+
+    def to_dict(self):
+        nonzero = np.flatnonzero(self.counts)
+        if not len(nonzero):
+            return {"offset": 0, "counts": []}
+        first, last = nonzero[0], nonzero[-1]
+        return {"offset": int(self.offset + first), "counts": self.counts[first:last + 1].tolist()}
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch (DDSketch). Values fall into
+    logarithmic buckets of ratio gamma = (1 + a) / (1 - a); a bucket reports
+    one representative value, so every quantile is within relative error `a`.
+    Sketches of disjoint chunks merge by adding bucket counts, giving the same
+    result as sketching the concatenated values, in any order.
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must lie in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = _BucketStore()
+        self.negative = _BucketStore()
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, values):
+        """Adds an array of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        small = np.abs(values) < SKETCH_MIN_MAGNITUDE
+        self.zero_count += int(small.sum())
+        self.positive.add_keys(self._keys(values[~small & (values > 0)]))
+        self.negative.add_keys(self._keys(-values[~small & (values < 0)]))
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other):
+        """Adds another sketch's counts in place; both must share the relative accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches of different relative accuracy")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        # Ascending order: negative buckets by decreasing magnitude, zeros, positive buckets
+        seen = 0
+        for i in range(len(self.negative.counts) - 1, -1, -1):
+            seen += self.negative.counts[i]
+            if seen > rank:
+                return self._clamp(-self._value(self.negative.offset + i))
+        seen += self.zero_count
+        if seen > rank:
+            return self._clamp(0.0)
+        cumulative = seen + np.cumsum(self.positive.counts)
+        i = min(int(np.searchsorted(cumulative, rank, side="right")), len(cumulative) - 1)
+        return self._clamp(self._value(self.positive.offset + i))
+
+    def _clamp(self, value):
+        return float(min(max(value, self.min), self.max))
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "positive": self.positive.to_dict(),
+            "negative": self.negative.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive = _BucketStore(data["positive"]["offset"], data["positive"]["counts"])
+        sketch.negative = _BucketStore(data["negative"]["offset"], data["negative"]["counts"])
+        sketch.zero_count = int(data["zero_count"])
+        sketch.count = int(data["count"])
+        if sketch.count:
+            sketch.min, sketch.max = float(data["min"]), float(data["max"])
+        return sketch
+
+
+class LayerStats:
+    """
+    Running summary of one layer over streamed chunks: exact count, min,
+    max, mean and standard deviation, plus a QuantileSketch for quantiles.
+    Chunk summaries merge, so a grid can be summarized without holding it.
+    """
+
+    def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.sketch.add(values)
+        self.total += float(values.sum())
+        self.total_sq += float(np.square(values).sum())
+        return self
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self.total += other.total
+        self.total_sq += other.total_sq
+        return self
+
+    def summary(self, levels=QUANTILE_LEVELS, bins=HISTOGRAM_BINS):
+        """Same shape as summarize(); quantiles and histogram come from the sketch."""
+        sketch = self.sketch
+        if not sketch.count:
+            return _empty_summary(sketch)
+        mean = self.total / sketch.count
+        std = math.sqrt(max(self.total_sq / sketch.count - mean * mean, 0.0))
+        quantiles = [sketch.quantile(q) for q in levels]
+        breaks = [sketch.quantile(q) for q in BREAK_LEVELS]
+        edges = _histogram_edges(sketch.min, sketch.max, bins)
+        # Each sketch bucket's count goes to the bin holding its representative value
+        keys, counts = _sketch_buckets(sketch)
+        values = np.concatenate([-sketch._value(keys[0]), [0.0], sketch._value(keys[1])])
+        weights = np.concatenate([counts[0], [sketch.zero_count], counts[1]])
+        hist, _ = np.histogram(np.clip(values, sketch.min, sketch.max), bins=edges, weights=weights)
+        return _summary(sketch, mean, std, levels, quantiles, breaks, edges, hist.astype(np.int64), exact=False)
+
+
+def _sketch_buckets(sketch):
+    """(negative keys, positive keys), (negative counts, positive counts) of the non-empty buckets."""
+    keys, counts = [], []
+    for store in (sketch.negative, sketch.positive):
+        nonzero = np.flatnonzero(store.counts)
+        keys.append(store.offset + nonzero)
+        counts.append(store.counts[nonzero])
+    return keys, counts
+
+
+def _histogram_edges(lo, hi, bins):
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def _empty_summary(sketch):
+    return {"count": 0, "min": None, "max": None, "mean": None, "std": None,
+            "quantiles": {}, "breaks": [], "histogram": {"edges": [], "counts": []},
+            "sketch": sketch.to_dict(), "exact": True}
+
+
+def _summary(sketch, mean, std, levels, quantiles, breaks, edges, counts, exact):
+    return {
+        "count": sketch.count,
+        "min": sketch.min,
+        "max": sketch.max,
+        "mean": float(mean),
+        "std": float(std),
+        "quantiles": {f"{q:g}": float(v) for q, v in zip(levels, quantiles)},
+        "breaks": [float(v) for v in breaks],
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+        "sketch": sketch.to_dict(),
+        "exact": exact,
+    }
+
+
+def summarize(values, levels=QUANTILE_LEVELS, bins=HISTOGRAM_BINS, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+    """
+    Summary of a full layer: exact quantiles (the lower data value at each
+    level, as the map legends always used), min/max, mean/std, an
+    equal-width histogram and the layer's mergeable sketch.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    values = values[~np.isnan(values)]
+    sketch = QuantileSketch(relative_accuracy).add(values)
+    if not len(values):
+        return _empty_summary(sketch)
+    quantiles = np.quantile(values, list(levels) + list(BREAK_LEVELS), method="lower")
+    edges = _histogram_edges(sketch.min, sketch.max, bins)
+    counts, _ = np.histogram(values, bins=edges)
+    return _summary(sketch, values.mean(), values.std(), levels, quantiles[:len(levels)],
+                    quantiles[len(levels):], edges, counts, exact=True)
@@ -0,0 +1,285 @@
+import math
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Mapbox Vector Tile geometry resolution and the margin (in the same units)
+# drawn beyond the tile edge so neighbouring tiles overlap without seams
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+# Cells are aggregated into coarser pyramid levels until one spans at least
+# this many pixels of a 256 px tile, which caps the features per tile
+MIN_CELL_PIXELS = 4
+
+MAX_ZOOM = 22
+MVT_MIMETYPE = "application/vnd.mapbox-vector-tile"
+
+
+# --- Pyramid ---
+class GridPyramid:
+    """
+    Mean/max aggregates of one metric over a regular grid. Level k merges
+    2**k x 2**k base cells; level 0 is the grid itself.
+    """
+
+    def __init__(self, values, grid):
+        self.grid = grid
+        total = np.where(np.isnan(values), 0.0, values)
+        count = (~np.isnan(values)).astype(np.int64)
+        peak = np.where(np.isnan(values), -np.inf, values)
+
+        self.levels = [self._level(total, count, peak)]
+        while max(total.shape) > 1:
+            total, count, peak = self._halve(total, count, peak)
+            self.levels.append(self._level(total, count, peak))
+
+    @staticmethod
+    def _level(total, count, peak):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+        return {"mean": mean, "max": np.where(count > 0, peak, np.nan), "count": count}
+
+    @staticmethod
+    def _halve(total, count, peak):
+        ny, nx = total.shape
+        pad = ((0, ny % 2), (0, nx % 2))
+        total = np.pad(total, pad)
+        count = np.pad(count, pad)
+        peak = np.pad(peak, pad, constant_values=-np.inf)
+
+        shape = (total.shape[0] // 2, 2, total.shape[1] // 2, 2)
+        return (
+            total.reshape(shape).sum(axis=(1, 3)),
+            count.reshape(shape).sum(axis=(1, 3)),
+            peak.reshape(shape).max(axis=(1, 3)),
+        )
+
+    def level_for_zoom(self, z):
+        """Finest level whose cells are at least MIN_CELL_PIXELS wide at zoom z."""
+        cell_pixels = self.grid["step"][0] / 360 * 256 * (2 ** z)
+        level = 0
+        while cell_pixels * (2 ** level) < MIN_CELL_PIXELS and level < len(self.levels) - 1:
+            level += 1
+        return level
+
+
+# --- Web Mercator ---
+def _lon_to_tile_x(lon, z):
+    return (np.asarray(lon) + 180.0) / 360.0 * (2 ** z)
+
+
+def _lat_to_tile_y(lat, z):
+    lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+    return (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * (2 ** z)
+
+
+def _tile_bounds(z, x, y):
+    """(lon_min, lat_min, lon_max, lat_max) of an XYZ tile."""
+    n = 2 ** z
+    lon_min = x / n * 360.0 - 180.0
+    lon_max = (x + 1) / n * 360.0 - 180.0
+    lat_max = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_min = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return lon_min, lat_min, lon_max, lat_max
+
+
+# --- Protobuf ---
+def _varint(n):
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 31)
+
+
+def _field(number, payload):
+    """Length-delimited field (wire type 2)."""
+    return _varint((number << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _packed(number, ints):
+    return _field(number, b"".join(_varint(i) for i in ints))
+
+
+def _double_value(v):
+    return _field(4, b"\x19" + struct.pack("<d", v))
+
+
+def _uint_value(v):
+    return _field(4, b"\x28" + _varint(v))
+
+
+MOVE_TO_1 = (1 & 0x7) | (1 << 3)
+LINE_TO_3 = (2 & 0x7) | (3 << 3)
+CLOSE_PATH = (7 & 0x7) | (1 << 3)
+
+
+def encode_tile(pyramid, layer, z, x, y):
+    """
+    Encodes the pyramid level suited to zoom `z` as a single-layer MVT. Each
+    aggregated cell becomes a square polygon with `mean`, `max` and `cells`
+    (number of base cells merged) properties. Only the cells overlapping the
+    tile are visited: their index range is computed from the grid geometry.
+    """
+    grid = pyramid.grid
+    level = pyramid.level_for_zoom(z)
+    agg = pyramid.levels[level]
+    factor = 2 ** level
+    ny, nx = agg["count"].shape
+
+    lon_step = grid["step"][0] * factor
+    lat_step = grid["step"][1] * factor
+    # Edge of aggregated cell i sits half a base cell before base cell i * factor
+    lon_edge0 = grid["origin"][0] - grid["step"][0] / 2
+    lat_edge0 = grid["origin"][1] - grid["step"][1] / 2
+
+    lon_min, lat_min, lon_max, lat_max = _tile_bounds(z, x, y)
+    i0 = max(0, int(math.floor((lon_min - lon_edge0) / lon_step)))
+    i1 = min(nx - 1, int(math.floor((lon_max - lon_edge0) / lon_step)))
+    j0 = max(0, int(math.floor((lat_min - lat_edge0) / lat_step)))
+    j1 = min(ny - 1, int(math.floor((lat_max - lat_edge0) / lat_step)))
+
+    features = []
+    values = []
+    if i0 <= i1 and j0 <= j1:
+        # Cell edges in tile coordinates (y grows downwards, i.e. southwards)
+        lon_edges = lon_edge0 + np.arange(i0, i1 + 2) * lon_step
+        lat_edges = lat_edge0 + np.arange(j0, j1 + 2) * lat_step
+        px = np.round((_lon_to_tile_x(lon_edges, z) - x) * TILE_EXTENT).astype(np.int64)
+        py = np.round((_lat_to_tile_y(lat_edges, z) - y) * TILE_EXTENT).astype(np.int64)
+        px = np.clip(px, -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER)
+        py = np.clip(py, -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER)
+
+        jj, ii = np.nonzero(agg["count"][j0:j1 + 1, i0:i1 + 1] > 0)
+        for j, i in zip(jj.tolist(), ii.tolist()):
+            left, right = int(px[i]), int(px[i + 1])
+            top, bottom = int(py[j + 1]), int(py[j])
+            width, height = right - left, bottom - top
+            if width <= 0 or height <= 0:
+                continue
+
+            gj, gi = j + j0, i + i0
+            tag_base = len(values)
+            values.append(_double_value(float(agg["mean"][gj, gi])))
+            values.append(_double_value(float(agg["max"][gj, gi])))
+            values.append(_uint_value(int(agg["count"][gj, gi])))
+
+            # Clockwise exterior ring: top-left, top-right, bottom-right, bottom-left
+            geometry = [
+                MOVE_TO_1, _zigzag(left), _zigzag(top),
+                LINE_TO_3, _zigzag(width), 0, 0, _zigzag(height), _zigzag(-width), 0,
+                CLOSE_PATH,
+            ]
+            features.append(_field(2,
+                b"\x08" + _varint(gj * nx + gi)
+                + _packed(2, [0, tag_base, 1, tag_base + 1, 2, tag_base + 2])
+                + b"\x18\x03"
+                + _packed(4, geometry)
+            ))
+
+    layer_msg = (
+        b"\x78\x02"
+        + _field(1, layer.encode("utf-8"))
+        + b"".join(features)
+        + _field(3, b"mean") + _field(3, b"max") + _field(3, b"cells")
+        + b"".join(values)
+        + b"\x28" + _varint(TILE_EXTENT)
+    )
+    return _field(3, layer_msg)
+
+
+# --- Cache ---
+class TileCache:
+    """
+    Two-tier LRU for encoded tiles: a bounded in-memory map backed by a
+    bounded directory of .pbf files that survives restarts and is shared by
+    workers on the same host. Keys are relative paths.
+    """
+
+    def __init__(self, memory_items=4096, disk_dir=None, disk_items=100000):
+        self.memory_items = memory_items
+        self.disk_dir = disk_dir
+        self.disk_items = disk_items
+        self._memory = OrderedDict()
+        self._disk_index = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            tile = self._memory.get(key)
+            if tile is not None:
+                self._memory.move_to_end(key)
+                return tile
+
+        if self.disk_dir:
+            path = os.path.join(self.disk_dir, key)
+            try:
+                with open(path, "rb") as f:
+                    tile = f.read()
+            except OSError:
+                return None
+            self._remember(key, tile)
+            with self._lock:
+                if self._disk_index is not None and key in self._disk_index:
+                    self._disk_index.move_to_end(key)
+            return tile
+        return None
+
+    def put(self, key, tile):
+        self._remember(key, tile)
+        if self.disk_dir:
+            self._write(key, tile)
+
+    def _remember(self, key, tile):
+        with self._lock:
+            self._memory[key] = tile
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _load_disk_index(self):
+        """Existing files, oldest first, so eviction continues across restarts."""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.path.getmtime(path), os.path.relpath(path, self.disk_dir)))
+                except OSError:
+                    pass
+        return OrderedDict((key, None) for _, key in sorted(entries))
+
+    def _write(self, key, tile):
+        path = os.path.join(self.disk_dir, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(tile)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Tile cache write failed for {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_index is None:
+                self._disk_index = self._load_disk_index()
+            self._disk_index[key] = None
+            self._disk_index.move_to_end(key)
+            evicted = []
+            while len(self._disk_index) > self.disk_items:
+                evicted.append(self._disk_index.popitem(last=False)[0])
+        for old in evicted:
+            try:
+                os.remove(os.path.join(self.disk_dir, old))
+            except OSError:
+                pass
@@ -0,0 +1,34 @@
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(__file__))
+
+from common import synthetic_grid, best_of, parse_sizes
+from columnar import write_columnar, load_columnar
+import pandas as pd
+
+def main():
+    sizes = parse_sizes(sys.argv[1:], [1_600, 1_000_000, 4_000_000])
+
+    print(f"{'cells':>10} {'read_csv':>12} {'mmap load':>12} {'mmap+scan':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            csv_path = os.path.join(tmp, f"grid_{n}.csv")
+            root = os.path.join(tmp, f"grid_{n}.columns")
+            df = synthetic_grid(n)
+            df.to_csv(csv_path, index=False)
+            os.makedirs(root)
+            write_columnar(df, root, "v1")
+            del df
+
+            repeats = 3 if n <= 1_000_000 else 1
+            t_csv = best_of(lambda: pd.read_csv(csv_path), repeats)
+            t_map = best_of(lambda: load_columnar(root, "v1"), repeats)
+            # Touching every page once, as the first simulation does
+            t_scan = best_of(lambda: load_columnar(root, "v1").sum(numeric_only=True), repeats)
+
+            print(f"{n:>10} {t_csv * 1000:10.1f}ms {t_map * 1000:10.1f}ms {t_scan * 1000:10.1f}ms {t_csv / t_map:7.0f}x")
+
+if __name__ == "__main__":
+    main()
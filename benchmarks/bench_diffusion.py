@@ -0,0 +1,43 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from common import best_of, parse_sizes
+from diffusion import ImplicitSolver, separable_gaussian, fft_gaussian, pick_gaussian_backend
+
+SIGMAS = [1.2, 3.0, 8.0]
+# The implicit solve (factorization or CG) is only timed up to this size
+IMPLICIT_MAX_CELLS = 4_000_000
+
+def main():
+    sizes = parse_sizes(sys.argv[1:], [1_000, 100_000, 1_000_000, 10_000_000])
+
+    print(f"{'cells':>10} {'sigma':>6} {'separable':>12} {'fft':>12} {'auto':>10} "
+          f"{'implicit setup':>15} {'implicit solve':>15}")
+    for n in sizes:
+        side = int(np.ceil(np.sqrt(n)))
+        grid = np.random.default_rng(0).normal(size=(side, side))
+        repeats = 3 if n <= 1_000_000 else 1
+
+        for sigma in SIGMAS:
+            t_sep = best_of(lambda: separable_gaussian(grid, sigma), repeats)
+            t_fft = best_of(lambda: fft_gaussian(grid, sigma), repeats)
+            auto = pick_gaussian_backend(grid.shape, sigma)
+
+            if n <= IMPLICIT_MAX_CELLS:
+                start = time.perf_counter()
+                solver = ImplicitSolver(grid.shape, sigma)
+                setup = f"{(time.perf_counter() - start) * 1000:13.1f}ms"
+                solve = f"{best_of(lambda: solver.solve(grid), repeats) * 1000:13.1f}ms"
+            else:
+                setup, solve = f"{'-':>15}", f"{'-':>15}"
+
+            print(f"{side * side:>10} {sigma:>6} {t_sep * 1000:10.1f}ms {t_fft * 1000:10.1f}ms "
+                  f"{auto:>10} {setup} {solve}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(__file__))
+
+import geopandas as gpd
+from shapely.geometry import Polygon
+
+from common import synthetic_grid, best_of, parse_sizes
+from encoders import encode_grid_geojson
+
+CELL_SIZE = 0.02
+# The shapely/GeoPandas path is only timed up to this size; beyond it a single
+# run takes minutes and the comparison adds nothing.
+LEGACY_MAX_CELLS = 100_000
+
+def legacy_geojson(df):
+    half = CELL_SIZE / 2
+    polygons = [
+        Polygon([
+            (row["lon"] - half, row["lat"] - half),
+            (row["lon"] + half, row["lat"] - half),
+            (row["lon"] + half, row["lat"] + half),
+            (row["lon"] - half, row["lat"] + half)
+        ])
+        for _, row in df.iterrows()
+    ]
+    return gpd.GeoDataFrame(df, geometry=polygons, crs="EPSG:4326").to_json()
+
+def main():
+    sizes = parse_sizes(sys.argv[1:], [1_600, 100_000, 1_000_000])
+
+    print(f"{'cells':>10} {'vectorized':>12} {'legacy':>12} {'speedup':>8} {'MB':>8}")
+    for n in sizes:
+        df = synthetic_grid(n)
+        repeats = 3 if n <= 100_000 else 1
+
+        payload = encode_grid_geojson(df, CELL_SIZE)
+        t_new = best_of(lambda: encode_grid_geojson(df, CELL_SIZE), repeats)
+
+        if n <= LEGACY_MAX_CELLS:
+            t_old = best_of(lambda: legacy_geojson(df), 1)
+            legacy = f"{t_old * 1000:10.1f}ms"
+            speedup = f"{t_old / t_new:7.1f}x"
+        else:
+            legacy, speedup = f"{'-':>12}", f"{'-':>8}"
+
+        print(f"{n:>10} {t_new * 1000:10.1f}ms {legacy} {speedup} {len(payload) / 1e6:8.1f}")
+
+if __name__ == "__main__":
+    main()
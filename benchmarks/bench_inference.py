@@ -0,0 +1,31 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from common import best_of, parse_sizes
+from services import ModelService
+from inference import CompiledTreeEnsemble
+
+def main():
+    sizes = parse_sizes(sys.argv[1:], [1_600, 1_000_000, 10_000_000])
+
+    model = ModelService.get_model()
+    compiled = CompiledTreeEnsemble.from_gradient_boosting(model)
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>10} {'sklearn':>12} {'compiled':>12} {'speedup':>8} {'max diff':>10}")
+    for n in sizes:
+        X = rng.normal([32, 800, 60, 20], [3, 600, 30, 15], size=(n, 4))
+        repeats = 3 if n <= 100_000 else 1
+
+        t_sk = best_of(lambda: model.predict(X), repeats)
+        t_c = best_of(lambda: compiled.predict(X), repeats)
+        diff = np.abs(compiled.predict(X) - model.predict(X)).max() if n <= 1_000_000 else float("nan")
+
+        print(f"{n:>10} {t_sk * 1000:10.1f}ms {t_c * 1000:10.1f}ms {t_sk / t_c:7.1f}x {diff:10.1e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+# Same bounding box and column layout as data/processed/city_with_heat_risk.csv
+LAT_MIN, LAT_MAX = 12.90, 13.15
+LON_MIN, LON_MAX = 80.10, 80.35
+
+def synthetic_grid(n_cells, seed=42):
+    """Builds a square-ish city grid with the processed dataset's columns."""
+    side = int(np.ceil(np.sqrt(n_cells)))
+    rng = np.random.default_rng(seed)
+
+    idx = np.arange(n_cells)
+    x = idx // side
+    y = idx % side
+    dist = np.hypot(x - side / 2, y - side / 2)
+    corridor = np.abs(x - side / 2) < max(3, side // 13)
+
+    df = pd.DataFrame({
+        "x": x,
+        "y": y,
+        "dist_center": dist,
+        "temperature": 32 + rng.normal(0, 1.5, n_cells) + dist * 0.05 * 40 / side,
+        "pm25": 40 + rng.normal(0, 10, n_cells) + corridor * 60,
+        "traffic": rng.integers(100, 400, n_cells) + corridor * 1500,
+        "encroachment_index": np.minimum(2, rng.random(n_cells) + (y < side / 8) * 1.2),
+    })
+    df["green_cover"] = (rng.uniform(5, 40, n_cells) - df["traffic"] / 200).clip(0, 50)
+    df["heat_risk_index"] = 0.45 * df["temperature"] + rng.normal(0, 0.05, n_cells)
+    df["predicted_heat_risk"] = df["heat_risk_index"]
+    df["lat"] = LAT_MIN + (y / max(side - 1, 1)) * (LAT_MAX - LAT_MIN)
+    df["lon"] = LON_MIN + (x / max(side - 1, 1)) * (LON_MAX - LON_MIN)
+    return df
+
+def best_of(fn, repeats=3):
+    """Returns the fastest wall-clock time of `repeats` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def parse_sizes(argv, default):
+    """Reads cell counts from the command line, e.g. `1600 100000 1e6`."""
+    if not argv:
+        return default
+    return [int(float(a)) for a in argv]
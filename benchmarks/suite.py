@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the simulation and serving hot paths.
+
+    python benchmarks/suite.py run                          # every case, 1.6k .. 4M cells
+    python benchmarks/suite.py run --cases get_prediction to_geojson --sizes 1600 1e6
+    python benchmarks/suite.py compare --threshold 0.15     # latest run vs the one before
+
+Every (case, size) runs in a fresh interpreter, so the reported peak RSS
+belongs to that case alone. Each run appends its latency percentiles,
+cells/sec and peak RSS to a JSON history; `compare` (or `run --compare`)
+flags cases whose median latency or peak RSS grew by more than the
+threshold and exits non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+HISTORY_PATH = os.path.join(BENCH_DIR, "history.json")
+
+DEFAULT_SIZES = [1_600, 250_000, 1_000_000, 4_000_000]
+DEFAULT_THRESHOLD = 0.15
+
+# Cases run at a fixed size; their cost does not depend on the grid
+SIZELESS_CASES = ["model_load"]
+
+
+# -------------------------------------------------
+# Cases (run inside the worker interpreter)
+# -------------------------------------------------
+def _engine(n, tmp):
+    """A SimulationEngine serving a synthetic n-cell grid instead of the processed CSV."""
+    import services
+    from common import synthetic_grid
+    from spatial import IT_PARK_BOUNDS, bounds_mask
+
+    df = synthetic_grid(n)
+    services.DATA_PATH = os.path.join(tmp, "city.csv")
+    services.IT_PARK_PATH = os.path.join(tmp, "it_park.csv")
+    df.to_csv(services.DATA_PATH, index=False)
+    df[bounds_mask(df["x"], df["y"], IT_PARK_BOUNDS)].to_csv(services.IT_PARK_PATH, index=False)
+    return services.SimulationEngine()
+
+
+def setup_case(case, n, tmp):
+    """Returns the callable timed for `case` on an n-cell grid."""
+    if case == "model_load":
+        import joblib
+        from services import MODEL_PATH
+        return lambda: joblib.load(MODEL_PATH)
+
+    if case == "generate_data":
+        sys.path.append(os.path.join(ROOT_DIR, "src"))
+        from generate_data import generate_chunks
+        side = int(n ** 0.5)
+        return lambda: sum(len(chunk) for chunk in generate_chunks(side, -(-n // side)))
+
+    engine = _engine(n, tmp)
+    if case == "get_prediction":
+        return lambda: engine.get_prediction(2040, "Before")
+    if case == "to_geojson":
+        frame = engine.get_result(2040, "After").frame
+        return lambda: engine.to_geojson(frame)
+    if case == "analyze_impact":
+        from services import ImpactAnalysisEngine
+        before = engine.get_result(2040, "Before").frame
+        after = engine.get_result(2040, "After").frame
+        return lambda: ImpactAnalysisEngine.analyze_impact(before, after)
+    if case == "it_park_geojson":
+        return engine.get_it_park_geojson
+    if case == "batch_chunk":
+        sys.path.append(os.path.join(ROOT_DIR, "src"))
+        import indiem
+        indiem._init_worker(indiem.MODEL_PATH, "sklearn")
+        thresholds = engine.risk_thresholds
+        chunk = engine.base_df
+        return lambda: indiem.process_chunk(chunk, [(2040, "After")], thresholds, "geojson")
+    raise ValueError(f"Unknown case '{case}'")
+
+
+CASES = ["model_load", "get_prediction", "to_geojson", "analyze_impact", "it_park_geojson",
+         "generate_data", "batch_chunk"]
+
+
+def default_repeats(n):
+    if n <= 250_000:
+        return 7
+    return 3 if n <= 1_000_000 else 2
+
+
+def run_case(case, n, repeats):
+    """Worker entry: times `case` and returns its result record."""
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = setup_case(case, n, tmp)
+        setup_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if repeats > 1:
+            fn()  # warm caches and lazy imports outside the timed runs
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        "case": case,
+        "cells": n,
+        "repeats": repeats,
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(latencies)) * 1000, 3),
+        "cells_per_sec": round(n / (p50 / 1000)) if n else None,
+        "setup_rss_mb": round(setup_rss, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def spawn_case(case, n, repeats):
+    env = dict(os.environ, GEMINI_API_KEY="", LLM_ENDPOINT="", TILE_CACHE_DIR="")
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "_case", case, str(n), str(repeats)],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{case} @ {n} cells failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'case':>16} {'cells':>10} {'p50':>11} {'p90':>11} {'p99':>11} {'cells/sec':>13} {'peak RSS':>10}")
+    for r in results:
+        rate = f"{r['cells_per_sec']:,}" if r["cells_per_sec"] else "-"
+        print(f"{r['case']:>16} {r['cells']:>10} {r['p50_ms']:9.1f}ms {r['p90_ms']:9.1f}ms {r['p99_ms']:9.1f}ms "
+              f"{rate:>13} {r['peak_rss_mb']:8.0f}MB")
+
+
+def run(args):
+    results = []
+    for case in args.cases:
+        sizes = [0] if case in SIZELESS_CASES else args.sizes
+        for n in sizes:
+            result = spawn_case(case, n, args.repeats or default_repeats(n))
+            results.append(result)
+            if args.progress:
+                print_results([result])
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "label": args.label,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    print_results(results)
+    if args.no_save:
+        return 0
+
+    history = load_history(args.history) + [record]
+    save_history(args.history, history)
+    print(f"\nSaved run {len(history) - 1} to {args.history}")
+    if args.compare and len(history) > 1:
+        return compare_runs(history[-2], history[-1], args.threshold)
+    return 0
+
+
+def compare_runs(baseline, current, threshold):
+    """Prints per-case ratios; returns 1 if any p50 latency or peak RSS regressed beyond `threshold`."""
+    base = {(r["case"], r["cells"]): r for r in baseline["results"]}
+    print(f"\nComparing {current.get('commit') or current['timestamp']} against "
+          f"{baseline.get('commit') or baseline['timestamp']} (threshold {threshold:.0%})")
+    print(f"{'case':>16} {'cells':>10} {'p50 ratio':>10} {'RSS ratio':>10}")
+
+    regressions = 0
+    for r in current["results"]:
+        b = base.get((r["case"], r["cells"]))
+        if b is None:
+            continue
+        time_ratio = r["p50_ms"] / b["p50_ms"] if b["p50_ms"] else 1.0
+        rss_ratio = r["peak_rss_mb"] / b["peak_rss_mb"] if b["peak_rss_mb"] else 1.0
+        flags = [name for name, ratio in [("latency", time_ratio), ("memory", rss_ratio)] if ratio > 1 + threshold]
+        regressions += bool(flags)
+        marker = f"  REGRESSION ({', '.join(flags)})" if flags else ""
+        print(f"{r['case']:>16} {r['cells']:>10} {time_ratio:9.2f}x {rss_ratio:9.2f}x{marker}")
+
+    print(f"\n{regressions} regression(s)" if regressions else "\nNo regressions")
+    return 1 if regressions else 0
+
+
+def compare(args):
+    history = load_history(args.history)
+    if len(history) < 2:
+        print(f"Need at least two runs in {args.history} to compare")
+        return 1
+    return compare_runs(history[args.baseline], history[args.current], args.threshold)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["_case"]:
+        sys.path.append(BENCH_DIR)
+        import common  # noqa: F401  (puts backend/ on sys.path)
+        case, n, repeats = argv[1], int(argv[2]), int(argv[3])
+        print(json.dumps(run_case(case, n, repeats)))
+        return 0
+
+    parser = argparse.ArgumentParser(prog="suite", description="IndiEM benchmark suite")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON run history")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and append them to the history")
+    run_parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    run_parser.add_argument("--sizes", nargs="+", type=lambda s: int(float(s)), default=DEFAULT_SIZES,
+                            help="grid sizes in cells, e.g. 1600 1e6")
+    run_parser.add_argument("--repeats", type=int, help="timed runs per case (default: by size)")
+    run_parser.add_argument("--label", help="free-form note stored with the run")
+    run_parser.add_argument("--no-save", action="store_true", help="print only, do not append to the history")
+    run_parser.add_argument("--compare", action="store_true", help="compare against the previous run afterwards")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.add_argument("--progress", action="store_true", help="print each result as it finishes")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two runs in the history")
+    compare_parser.add_argument("--baseline", type=int, default=-2, help="history index of the baseline run")
+    compare_parser.add_argument("--current", type=int, default=-1, help="history index of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="relative growth in p50 latency or peak RSS counted as a regression")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,9 @@ from streamlit_folium import st_folium
 import os
 import json
 import pandas as pd
-import requests
+from urllib.parse import urlencode
+
+from api_client import ApiClient, ApiError, API_BASE_URL, neighbouring_views
 
 # -------------------------------------------------
 # Page config
@@ -21,9 +23,14 @@ st.title("Chennai City – Urban Environmental Digital Twin")
 # Paths & Config
 # -------------------------------------------------
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-API_URL = "http://localhost:5000/api/predictions"
+SURFACE_3D_API_URL = f"{API_BASE_URL}/api/surface-3d"
+IT_PARK_API_URL = f"{API_BASE_URL}/api/it-park"
 IT_PARK_PATH = os.path.join(ROOT_DIR, "data", "processed", "it_park_impact.csv")
 
+# Slider positions, matching the backend's supported years and scenarios
+YEARS = [2025, 2030, 2035, 2040]
+SCENARIOS = ["Before", "After"]
+
 # -------------------------------------------------
 # Sidebar controls
 # -------------------------------------------------
@@ -36,10 +43,10 @@ feature = st.sidebar.selectbox(
 
 year = st.sidebar.slider(
     "Year",
-    min_value=2025,
-    max_value=2040,
-    step=5,
-    value=2025
+    min_value=YEARS[0],
+    max_value=YEARS[-1],
+    step=YEARS[1] - YEARS[0],
+    value=YEARS[0]
 )
 
 scenario_slider = st.sidebar.slider(
@@ -50,7 +57,7 @@ scenario_slider = st.sidebar.slider(
     help="0 = Before construction | 1 = After construction"
 )
 
-scenario = "After" if scenario_slider == 1 else "Before"
+scenario = SCENARIOS[scenario_slider]
 
 view_mode = st.sidebar.radio(
     "View Mode",
@@ -60,36 +67,50 @@ view_mode = st.sidebar.radio(
 # -------------------------------------------------
 # Load data from API
 # -------------------------------------------------
-@st.cache_data(ttl=60) # Cache for 60 seconds to avoid spamming the API on every interaction that doesn't change params
-def fetch_data(year, scenario):
-    try:
-        response = requests.get(API_URL, params={"year": year, "scenario": scenario})
-        if response.status_code == 200:
-            return gpd.read_file(response.text, driver="GeoJSON")
-        else:
-            st.error(f"Error fetching data: {response.status_code} - {response.text}")
-            return None
-    except requests.exceptions.ConnectionError:
-        st.error("Backend not reachable. Please run `python backend/app.py`.")
-        return None
+# One pooled client per server process, shared by every session and rerun
+@st.cache_resource
+def get_api_client():
+    return ApiClient()
+
+client = get_api_client()
+
+# Everything this view needs is requested at once; the analysis no longer waits for the map
+analysis_future = client.impact_analysis(year) if scenario == "After" else None
+surface_future = client.predictions(year, scenario)
+stats_future = client.stats(year, scenario)
 
-surface = fetch_data(year, scenario)
+# Warm the views one slider step away so the next interaction is served from memory
+client.prefetch(neighbouring_views(year, scenario, YEARS, SCENARIOS))
 
-if surface is None:
+try:
+    surface = surface_future.result()
+except ApiError as e:
+    st.error(str(e))
     st.stop()
 
+# Per-layer quantile breaks and ranges, precomputed by the backend for each year/scenario
+try:
+    layer_stats = stats_future.result()
+except ApiError:
+    layer_stats = None
+
 # -------------------------------------------------
 # Load IT Park Data (Static for boundary)
 # -------------------------------------------------
 # We still load this for the boundary visualization, though we could/should arguably extract this from the API too 
 # if we wanted to be 100% clean, but for now we keep the hybrid approach to minimize regression risk on the overlay.
-it_df = pd.read_csv(IT_PARK_PATH)
-it_park = gpd.GeoDataFrame(
-    it_df,
-    geometry=gpd.points_from_xy(it_df.lon, it_df.lat),
-    crs="EPSG:4326"
-)
-it_park_boundary = it_park.unary_union.convex_hull
+# Read once per process, not on every rerun; the frame is shared and must not be modified.
+@st.cache_resource
+def load_it_park():
+    it_df = pd.read_csv(IT_PARK_PATH)
+    it_park = gpd.GeoDataFrame(
+        it_df,
+        geometry=gpd.points_from_xy(it_df.lon, it_df.lat),
+        crs="EPSG:4326"
+    )
+    return it_park, it_park.unary_union.convex_hull
+
+it_park, it_park_boundary = load_it_park()
 
 # -------------------------------------------------
 # Metric selection
@@ -106,51 +127,24 @@ else:
     metric = "temperature"
 
 # -------------------------------------------------
-# Prepare 3D height (Z dimension)
+# 3D view template (heights are normalized server-side by /api/surface-3d)
 # -------------------------------------------------
-surface_3d = surface.copy()
-
-min_v = surface_3d[metric].min()
-max_v = surface_3d[metric].max()
-
-surface_3d["height"] = (
-    (surface_3d[metric] - min_v) / (max_v - min_v + 1e-6)
-) * 300  # meters
-
-CESIUM_DIR = os.path.join(ROOT_DIR, "dashboard", "cesium_data")
-os.makedirs(CESIUM_DIR, exist_ok=True)
-
-# For Cesium, we need to save the file locally as the HTML file reads it relative
-# We will overwrite this file based on current selection
-surface_3d["height"] = surface_3d[metric]
-surface_3d.to_file(
-    os.path.join(CESIUM_DIR, "heat_surface.geojson"),
-    driver="GeoJSON"
-)
-
-# IT park boundary
-it_gdf = gpd.GeoDataFrame(
-    {"name": ["IT Park"]},
-    geometry=[it_park_boundary],
-    crs="EPSG:4326"
-)
-
-it_gdf.to_file(
-    os.path.join(CESIUM_DIR, "it_park_boundary.geojson"),
-    driver="GeoJSON"
-)
+@st.cache_data
+def load_cesium_template():
+    with open(os.path.join(ROOT_DIR, "dashboard", "cesium_view.html"), "r", encoding="utf-8") as f:
+        return f.read()
 
 if view_mode == "3D Digital Twin":
     st.subheader(f"🌍 3D Urban Digital Twin (Year: {year} | {scenario})")
-    st.info("The 3D view consumes the generated GeoJSON. Refresh browser if Cesium doesn't update immediately.")
 
-    cesium_html_path = os.path.join(
-        ROOT_DIR, "dashboard", "cesium_view.html"
+    # The viewer fetches the cached surface straight from the backend; nothing is written locally
+    surface_url = f"{SURFACE_3D_API_URL}?{urlencode({'year': year, 'scenario': scenario, 'metric': metric})}"
+    cesium_html = (
+        load_cesium_template()
+        .replace("__SURFACE_URL__", surface_url)
+        .replace("__IT_PARK_URL__", IT_PARK_API_URL)
     )
 
-    with open(cesium_html_path, "r", encoding="utf-8") as f:
-        cesium_html = f.read()
-
     st.components.v1.html(
         cesium_html,
         height=750,
@@ -173,11 +167,11 @@ else:
         tiles="OpenStreetMap"
     )
 
-    # Quantile thresholds
-    q20 = surface[metric].quantile(0.20)
-    q40 = surface[metric].quantile(0.40)
-    q60 = surface[metric].quantile(0.60)
-    q80 = surface[metric].quantile(0.80)
+    # Quantile thresholds (from /api/stats; recomputed locally only if it is unavailable)
+    if layer_stats:
+        q20, q40, q60, q80 = layer_stats[metric]["breaks"]
+    else:
+        q20, q40, q60, q80 = surface[metric].quantile([0.20, 0.40, 0.60, 0.80])
 
     def style_function(feature_json):
         v = feature_json["properties"][metric]
@@ -271,45 +265,43 @@ else:
 # -------------------------------------------------
 st.subheader("🤖 AI-Driven Impact Analysis & Policy Recommendations")
 
-ANALYSIS_API_URL = "http://localhost:5000/api/impact-analysis"
-
 if scenario == "After":
-    # Fetch AI Analysis
+    # Requested alongside the map above; the backend blocks briefly for a fresh LLM answer
+    # and falls back to rule-based advice
     try:
-        res = requests.get(ANALYSIS_API_URL, params={"year": year})
-        if res.status_code == 200:
-            analysis = res.json()
-            
-            # --- 1. Display Delta Metrics ---
-            metrics = analysis["delta_metrics"]
-            
-            if metrics:
-                c1, c2, c3, c4 = st.columns(4)
-                c1.metric("Temp Rise (IT Park)", f"+{metrics['temperature_rise']} °C", delta_color="inverse")
-                c2.metric("Traffic Surge", f"+{metrics['traffic_increase']} vehicles", delta_color="inverse")
-                c3.metric("PM2.5 Worsening", f"+{metrics['pm25_worsening']} µg/m³", delta_color="inverse")
-                c4.metric("Green Cover Loss", f"-{metrics['green_cover_loss']} %", delta_color="inverse")
-            
-            st.divider()
-            
-            # --- 2. Display Severity & Suggestions ---
-            severity = analysis["severity"]
-            
-            if "High Impact" in severity:
-                st.error(f"**Impact Level: {severity}**")
-            elif "Moderate" in severity:
-                st.warning(f"**Impact Level: {severity}**")
-            else:
-                st.info(f"**Impact Level: {severity}**")
-            
-            st.markdown("### Generated Mitigation Strategies")
-            
-            for rec in analysis["recommendations"]:
-                st.info(f"🔹 {rec}")
-                
+        analysis = analysis_future.result()
+        
+        # --- 1. Display Delta Metrics ---
+        metrics = analysis["delta_metrics"]
+        
+        if metrics:
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Temp Rise (IT Park)", f"+{metrics['temperature_rise']} °C", delta_color="inverse")
+            c2.metric("Traffic Surge", f"+{metrics['traffic_increase']} vehicles", delta_color="inverse")
+            c3.metric("PM2.5 Worsening", f"+{metrics['pm25_worsening']} µg/m³", delta_color="inverse")
+            c4.metric("Green Cover Loss", f"-{metrics['green_cover_loss']} %", delta_color="inverse")
+        
+        st.divider()
+        
+        # --- 2. Display Severity & Suggestions ---
+        severity = analysis["severity"]
+        
+        if "High Impact" in severity or "Critical" in severity:
+            st.error(f"**Impact Level: {severity}**")
+        elif "Moderate" in severity:
+            st.warning(f"**Impact Level: {severity}**")
         else:
-            st.error(f"Failed to fetch analysis: {res.text}")
-            
+            st.info(f"**Impact Level: {severity}**")
+        
+        st.markdown("### Generated Mitigation Strategies")
+        if analysis.get("recommendation_source") == "rules":
+            st.caption("Rule-based recommendations (AI suggestions unavailable or still generating).")
+        
+        for rec in analysis["recommendations"]:
+            st.info(f"🔹 {rec}")
+
+    except ApiError as e:
+        st.error(f"Failed to fetch analysis: {e}")
     except Exception as e:
         st.error(f"Error connecting to AI engine: {e}")
 
@@ -0,0 +1,67 @@
+import json
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+# -------------------------------------------------
+# Binary grid frame client (?format=binary on /api/predictions)
+# -------------------------------------------------
+# Layout: b"IDGF" | uint32 LE header length | JSON header | 8-byte aligned
+# float32 column buffers of ny * nx values, row-major (y, x), NaN = no cell.
+GRID_FRAME_MAGIC = b"IDGF"
+
+
+def decode_grid_frame(buf):
+    """
+    Decode a binary grid frame without copying: returns (header, columns) where
+    each column is a read-only (ny, nx) float32 view into `buf`.
+    """
+    buf = memoryview(buf)
+    if bytes(buf[:4]) != GRID_FRAME_MAGIC:
+        raise ValueError("Not an IndiEM grid frame")
+    header_len = int(np.frombuffer(buf, dtype="<u4", count=1, offset=4)[0])
+    header = json.loads(bytes(buf[8:8 + header_len]))
+    base = 8 + header_len
+
+    shape = (header["grid"]["ny"], header["grid"]["nx"])
+    columns = {
+        col["name"]: np.frombuffer(
+            buf, dtype=col["dtype"], count=col["count"], offset=base + col["offset"]
+        ).reshape(shape)
+        for col in header["columns"]
+    }
+    return header, columns
+
+
+def grid_frame_to_geodataframe(buf):
+    """
+    Rebuild the cell polygons of a grid frame as a GeoDataFrame (one square of
+    `cell_size` per populated cell), matching the GeoJSON transport's layout.
+    """
+    header, columns = decode_grid_frame(buf)
+    grid = header["grid"]
+
+    y, x = np.indices((grid["ny"], grid["nx"]))
+    # A cell is absent when every column is NaN there
+    present = np.zeros(x.shape, dtype=bool)
+    for values in columns.values():
+        present |= ~np.isnan(values)
+
+    lon = grid["origin"][0] + x[present] * grid["step"][0]
+    lat = grid["origin"][1] + y[present] * grid["step"][1]
+    half = grid["cell_size"] / 2
+
+    df = pd.DataFrame({name: values[present] for name, values in columns.items()})
+    # Categorical columns arrive as float codes plus their categories in the header
+    for col in header["columns"]:
+        if "categories" in col:
+            codes = np.nan_to_num(df[col["name"]].to_numpy(), nan=-1).astype(np.int64)
+            df[col["name"]] = pd.Categorical.from_codes(codes, categories=col["categories"], ordered=True)
+    df["x"] = x[present] + grid["x0"]
+    df["y"] = y[present] + grid["y0"]
+    df["lat"] = lat
+    df["lon"] = lon
+
+    geometry = shapely.box(lon - half, lat - half, lon + half, lat + half)
+    return gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
@@ -1,5 +1,10 @@
+import os
 import pandas as pd
 
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CITY_PATH = os.path.join(ROOT_DIR, "data", "processed", "city_with_heat_risk.csv")
+IT_PARK_PATH = os.path.join(ROOT_DIR, "data", "processed", "it_park_impact.csv")
+
 # -----------------------------
 # Chennai-like bounding box
 # -----------------------------
@@ -9,21 +14,21 @@ LON_MIN, LON_MAX = 80.10, 80.35
 # -----------------------------
 # City-wide dataset
 # -----------------------------
-city = pd.read_csv("data/processed/city_with_heat_risk.csv")
+city = pd.read_csv(CITY_PATH)
 
 city["lat"] = LAT_MIN + (city["y"] / city["y"].max()) * (LAT_MAX - LAT_MIN)
 city["lon"] = LON_MIN + (city["x"] / city["x"].max()) * (LON_MAX - LON_MIN)
 
-city.to_csv("data/processed/city_with_heat_risk.csv", index=False)
+city.to_csv(CITY_PATH, index=False)
 print("Lat/Lon added to city dataset")
 
 # -----------------------------
 # IT park dataset
 # -----------------------------
-it = pd.read_csv("data/processed/it_park_impact.csv")
+it = pd.read_csv(IT_PARK_PATH)
 
 it["lat"] = LAT_MIN + (it["y"] / city["y"].max()) * (LAT_MAX - LAT_MIN)
 it["lon"] = LON_MIN + (it["x"] / city["x"].max()) * (LON_MAX - LON_MIN)
 
-it.to_csv("data/processed/it_park_impact.csv", index=False)
+it.to_csv(IT_PARK_PATH, index=False)
 print("Lat/Lon added to IT park dataset")
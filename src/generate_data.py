@@ -1,31 +1,127 @@
+import argparse
+import os
+
 import numpy as np
 import pandas as pd
 
-np.random.seed(42)
-GRID_SIZE = 40
-rows = []
+# Reference layout: every distance below is in cells of the original 40x40 city and
+# is scaled with the grid, so larger grids keep the same distributions per cell
+REFERENCE_SIZE = 40
+CORRIDOR_HALF_WIDTH = 3      # hotspot half-width / radius
+ENCROACHMENT_BAND = 5        # encroached rows along y = 0
+
+HOTSPOT_LAYOUTS = ["corridor", "corridors", "clusters"]
+COLUMNS = ["x", "y", "dist_center", "temperature", "pm25", "traffic", "encroachment_index", "green_cover"]
+
+
+def hotspot_mask(x, y, nx, ny, layout="corridor", hotspots=1, seed=42):
+    """
+    Cells with corridor-level traffic and PM2.5.
+      corridor:  one north-south corridor through the centre (the original city)
+      corridors: `hotspots` evenly spaced north-south and east-west corridors
+      clusters:  `hotspots` circular hotspots at seeded random positions
+    """
+    scale = min(nx, ny) / REFERENCE_SIZE
+    half_width = CORRIDOR_HALF_WIDTH * scale
+
+    if layout == "corridor":
+        return np.abs(x - nx / 2) < half_width
+    if layout == "corridors":
+        centres_x = (np.arange(hotspots) + 0.5) * nx / hotspots
+        centres_y = (np.arange(hotspots) + 0.5) * ny / hotspots
+        mask = np.zeros(len(x), dtype=bool)
+        for c in centres_x:
+            mask |= np.abs(x - c) < half_width
+        for c in centres_y:
+            mask |= np.abs(y - c) < half_width
+        return mask
+    if layout == "clusters":
+        # Own stream so positions do not depend on how the grid is chunked
+        rng = np.random.default_rng([seed, 1])
+        centres = rng.uniform([0, 0], [nx, ny], size=(hotspots, 2))
+        mask = np.zeros(len(x), dtype=bool)
+        for cx, cy in centres:
+            mask |= (x - cx) ** 2 + (y - cy) ** 2 < (2 * half_width) ** 2
+        return mask
+    raise ValueError(f"Unknown hotspot layout '{layout}'. Supported: {', '.join(HOTSPOT_LAYOUTS)}")
+
+
+def generate_chunks(nx=40, ny=40, seed=42, layout="corridor", hotspots=1, chunk_rows=1_000_000):
+    """
+    Yields the synthetic city as DataFrames of at most `chunk_rows` cells, in
+    x-major order like the original generator. Output is reproducible for a
+    given seed and chunk size.
+    """
+    rng = np.random.default_rng(seed)
+    scale = min(nx, ny) / REFERENCE_SIZE
+    n_cells = nx * ny
 
-for x in range(GRID_SIZE):
-    for y in range(GRID_SIZE):
-        dist = ((x-20)**2 + (y-20)**2) ** 0.5
-        rows.append({
+    for start in range(0, n_cells, chunk_rows):
+        idx = np.arange(start, min(start + chunk_rows, n_cells))
+        n = len(idx)
+        x = idx // ny
+        y = idx % ny
+
+        dist = np.hypot(x - nx / 2, y - ny / 2)
+        hot = hotspot_mask(x, y, nx, ny, layout, hotspots, seed)
+
+        traffic = rng.integers(100, 400, n) + hot * 1500
+        df = pd.DataFrame({
             "x": x,
             "y": y,
             "dist_center": dist,
-            "temperature": 32 + np.random.normal(0,1.5) + dist*0.05,
-            "pm25": 40 + np.random.normal(0,10) + (abs(x-20)<3)*60,
-            "traffic": np.random.randint(100,400) + (abs(x-20)<3)*1500,
-            "encroachment_index": min(2, np.random.rand() + (y<5)*1.2),
+            "temperature": 32 + rng.normal(0, 1.5, n) + (dist / scale) * 0.05,
+            "pm25": 40 + rng.normal(0, 10, n) + hot * 60,
+            "traffic": traffic,
+            "encroachment_index": np.minimum(2, rng.random(n) + (y < ENCROACHMENT_BAND * scale) * 1.2),
+            "green_cover": (rng.uniform(5, 40, n) - traffic / 200).clip(0, 50),
         })
+        yield df[COLUMNS]
 
-df = pd.DataFrame(rows)
 
-df["green_cover"] = (
-    np.random.uniform(5,40,len(df)) - df["traffic"]/200
-).clip(0,50)
+def write_chunks(chunks, path, fmt=None):
+    """Streams chunks to CSV or Parquet; only one chunk is held in memory."""
+    fmt = fmt or ("parquet" if path.endswith(".parquet") else "csv")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    rows = 0
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); use a .csv path instead")
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+        if writer is not None:
+            writer.close()
+    else:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic city grid")
+    parser.add_argument("--nx", type=int, default=40, help="cells along x")
+    parser.add_argument("--ny", type=int, default=40, help="cells along y")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--layout", choices=HOTSPOT_LAYOUTS, default="corridor", help="hotspot layout")
+    parser.add_argument("--hotspots", type=int, default=1, help="corridors/clusters for multi-hotspot layouts")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="cells generated and written per chunk")
+    parser.add_argument("--output", default="data/raw/city_grid_raw.csv", help=".csv or .parquet path")
+    args = parser.parse_args()
+
+    chunks = generate_chunks(args.nx, args.ny, args.seed, args.layout, args.hotspots, args.chunk_rows)
+    rows = write_chunks(chunks, args.output)
+    print(f"✅ Synthetic city data generated: {rows} cells -> {args.output}")
 
-import os
-os.makedirs("data/raw", exist_ok=True)
 
-df.to_csv("data/raw/city_grid_raw.csv", index=False)
-print("✅ Synthetic city data generated")
+if __name__ == "__main__":
+    main()
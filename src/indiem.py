@@ -0,0 +1,215 @@
+"""
+IndiEM command line.
+
+    python src/indiem.py batch --years 2025 2040 --scenarios Before After --workers 8
+
+`batch` streams the processed city grid in row chunks through
+projection -> model prediction -> planning decision -> surface export, spreading
+the chunks over a process pool, and reports throughput per stage.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT_DIR, "backend"))
+
+from encoders import iter_geojson_features, GEOJSON_PREFIX, GEOJSON_SEPARATOR, GEOJSON_SUFFIX
+from inference import CompiledTreeEnsemble
+from services import project_features, apply_scenario, BASE_YEAR, CELL_SIZE, SCENARIOS
+from utils import FEATURES, PLANNING_DECISIONS, planning_decisions, risk_thresholds
+
+DATA_PATH = os.path.join(ROOT_DIR, "data", "processed", "city_with_heat_risk.csv")
+MODEL_PATH = os.path.join(ROOT_DIR, "models", "heat_risk_model.pkl")
+OUTPUT_DIR = os.path.join(ROOT_DIR, "data", "batch")
+
+STAGES = ["read", "projection", "prediction", "decision", "export", "write"]
+
+# Exported per cell alongside the model features
+EXPORT_COLUMNS = ["x", "y", "lat", "lon"] + FEATURES + ["heat_risk_index", "planning_decision"]
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+_predictor = None
+
+
+def _init_worker(model_path, inference):
+    global _predictor
+    model = joblib.load(model_path)
+    _predictor = CompiledTreeEnsemble.from_gradient_boosting(model) if inference == "compiled" else model
+
+
+def _predict(X):
+    if isinstance(_predictor, CompiledTreeEnsemble):
+        # One thread per worker process; the pool provides the parallelism
+        return _predictor.predict(X, n_threads=1)
+    return _predictor.predict(X)
+
+
+def process_chunk(chunk, jobs, thresholds, fmt):
+    """
+    Runs every (year, scenario) job on one chunk. Returns the cell count,
+    seconds spent per stage and the encoded surface bytes per job.
+    """
+    timings = dict.fromkeys(STAGES, 0.0)
+    outputs = {}
+    x, y = chunk["x"].to_numpy(), chunk["y"].to_numpy()
+
+    for year, scenario in jobs:
+        t0 = time.perf_counter()
+        cols = project_features(chunk, max(0, year - BASE_YEAR))
+        cols = apply_scenario(cols, scenario, x, y)
+        out = chunk[["x", "y", "lat", "lon"]].copy()
+        for col in FEATURES:
+            out[col] = cols[col]
+        t1 = time.perf_counter()
+
+        out["heat_risk_index"] = _predict(out[FEATURES])
+        t2 = time.perf_counter()
+
+        out["planning_decision"] = planning_decisions(out["heat_risk_index"].to_numpy(), *thresholds)
+        t3 = time.perf_counter()
+
+        blocks = list(iter_geojson_features(out[EXPORT_COLUMNS], CELL_SIZE))
+        if fmt == "ndjson":
+            body = "".join("\n".join(block) + "\n" for block in blocks)
+        else:
+            body = ", ".join(", ".join(block) for block in blocks)
+        outputs[(year, scenario)] = body.encode("utf-8")
+        t4 = time.perf_counter()
+
+        timings["projection"] += t1 - t0
+        timings["prediction"] += t2 - t1
+        timings["decision"] += t3 - t2
+        timings["export"] += t4 - t3
+
+    return len(chunk), timings, outputs
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def baseline_thresholds(path, chunk_rows):
+    """Baseline planning thresholds, reading only the heat-risk column."""
+    risk = np.concatenate([
+        c["heat_risk_index"].to_numpy(dtype=np.float32)
+        for c in pd.read_csv(path, usecols=["heat_risk_index"], chunksize=chunk_rows)
+    ])
+    return risk_thresholds(risk)
+
+
+def run_batch(args):
+    jobs = [(year, scenario) for year in args.years for scenario in args.scenarios]
+    os.makedirs(args.output, exist_ok=True)
+    ext = "ndjson" if args.format == "ndjson" else "geojson"
+    paths = {job: os.path.join(args.output, f"surface_{job[0]}_{job[1]}.{ext}") for job in jobs}
+    files = {job: open(path, "wb") for job, path in paths.items()}
+
+    thresholds = baseline_thresholds(args.input, args.chunk_rows)
+    print(f"Planning thresholds: moderate > {thresholds[0]:.3f}, high > {thresholds[1]:.3f}")
+
+    totals = dict.fromkeys(STAGES, 0.0)
+    cells = 0
+    written = 0
+    start = time.perf_counter()
+
+    def write(result):
+        nonlocal cells, written
+        n, timings, outputs = result
+        t0 = time.perf_counter()
+        for job, body in outputs.items():
+            f = files[job]
+            if args.format == "geojson":
+                f.write(GEOJSON_SEPARATOR if written else GEOJSON_PREFIX)
+            f.write(body)
+        totals["write"] += time.perf_counter() - t0
+        for stage, seconds in timings.items():
+            totals[stage] += seconds
+        cells += n
+        written += 1
+        if args.progress:
+            print(f"  {cells} cells done ({cells / (time.perf_counter() - start):,.0f} cells/s)")
+
+    reader = pd.read_csv(args.input, chunksize=args.chunk_rows)
+
+    def next_chunk():
+        t0 = time.perf_counter()
+        chunk = next(reader, None)
+        totals["read"] += time.perf_counter() - t0
+        return chunk
+
+    try:
+        if args.workers <= 1:
+            _init_worker(args.model, args.inference)
+            while (chunk := next_chunk()) is not None:
+                write(process_chunk(chunk, jobs, thresholds, args.format))
+        else:
+            # At most two chunks per worker in flight keeps memory bounded
+            with ProcessPoolExecutor(args.workers, initializer=_init_worker,
+                                     initargs=(args.model, args.inference)) as pool:
+                pending = deque()
+                while True:
+                    chunk = next_chunk() if len(pending) < 2 * args.workers else None
+                    if chunk is not None:
+                        pending.append(pool.submit(process_chunk, chunk, jobs, thresholds, args.format))
+                        continue
+                    if not pending:
+                        break
+                    write(pending.popleft().result())
+        for f in files.values():
+            if args.format == "geojson":
+                f.write(GEOJSON_SUFFIX if written else GEOJSON_PREFIX + GEOJSON_SUFFIX)
+    finally:
+        for f in files.values():
+            f.close()
+
+    wall = time.perf_counter() - start
+    report(cells, len(jobs), totals, wall, args.workers)
+    for path in paths.values():
+        print(f"Saved to: {path}")
+
+
+def report(cells, n_jobs, totals, wall, workers):
+    """Per-stage throughput. Worker stages add up CPU time across processes."""
+    print(f"\n{cells} cells x {n_jobs} year/scenario runs in {wall:.2f}s "
+          f"({cells * n_jobs / wall:,.0f} cell-runs/s, {workers} worker(s))")
+    print(f"{'stage':>12} {'seconds':>10} {'cells/sec':>14}")
+    for stage in STAGES:
+        seconds = totals[stage]
+        # read/write handle each cell once; the other stages once per job
+        work = cells if stage in ("read", "write") else cells * n_jobs
+        rate = f"{work / seconds:,.0f}" if seconds > 0 else "-"
+        print(f"{stage:>12} {seconds:10.2f} {rate:>14}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="indiem", description="IndiEM urban digital twin tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="chunked, parallel simulation of the whole city grid")
+    batch.add_argument("--input", default=DATA_PATH, help="processed city grid CSV")
+    batch.add_argument("--model", default=MODEL_PATH)
+    batch.add_argument("--output", default=OUTPUT_DIR, help="directory for surface_<year>_<scenario> files")
+    batch.add_argument("--years", type=int, nargs="+", default=[2025, 2030, 2035, 2040])
+    batch.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (1 runs in-process)")
+    batch.add_argument("--chunk-rows", type=int, default=100_000, help="cells per chunk")
+    batch.add_argument("--inference", choices=["sklearn", "compiled"], default="sklearn")
+    batch.add_argument("--format", choices=["geojson", "ndjson"], default="geojson")
+    batch.add_argument("--progress", action="store_true", help="print progress after every chunk")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        run_batch(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,18 @@ import pandas as pd
 import numpy as np
 import joblib
 
+from utils import risk_thresholds, planning_decisions, IT_PARK_BOUNDS, bounds_mask
+
 # -------------------------------
-# Paths (Kaggle-safe)
+# Paths (relative to the repository root)
 # -------------------------------
-BASE_PATH = "/kaggle/working"   # change to "." if running locally
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-MODEL_PATH = f"{BASE_PATH}/models/heat_risk_model.pkl"
-DATA_PATH = f"{BASE_PATH}/data/processed/city_with_heat_risk.csv"
-OUTPUT_PATH = f"{BASE_PATH}/data/processed/it_park_impact.csv"
+MODEL_PATH = os.path.join(ROOT_DIR, "models", "heat_risk_model.pkl")
+DATA_PATH = os.path.join(ROOT_DIR, "data", "processed", "city_with_heat_risk.csv")
+OUTPUT_PATH = os.path.join(ROOT_DIR, "data", "processed", "it_park_impact.csv")
 
-os.makedirs(f"{BASE_PATH}/data/processed", exist_ok=True)
+os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
 
 # Load trained model
 model = joblib.load(MODEL_PATH)
@@ -20,10 +22,7 @@ model = joblib.load(MODEL_PATH)
 # Load processed city dataset
 df = pd.read_csv(DATA_PATH)
 
-it_park = df[
-    (df["x"].between(18, 21)) &
-    (df["y"].between(10, 13))
-].copy()
+it_park = df[bounds_mask(df["x"], df["y"], IT_PARK_BOUNDS)].copy()
 
 # -------------------------------
 # Future impact assumptions
@@ -50,18 +49,10 @@ it_park["future_heat_risk"] = model.predict(X_future)
 print("Model expects :", model.feature_names_in_)
 print("Provided data :", X_future.columns.tolist())
 
-HIGH_RISK = df["heat_risk_index"].quantile(0.8)
-MED_RISK = df["heat_risk_index"].quantile(0.6)
-
-def planning_decision(row):
-    if row["future_heat_risk"] > HIGH_RISK:
-        return "High risk – redesign with strong mitigation"
-    elif row["future_heat_risk"] > MED_RISK:
-        return "Moderate risk – green buffers & traffic control needed"
-    else:
-        return "Acceptable with standard measures"
+# Planning thresholds: 60th / 80th percentile of today's city-wide heat risk
+MED_RISK, HIGH_RISK = risk_thresholds(df["heat_risk_index"])
 
-it_park["planning_decision"] = it_park.apply(planning_decision, axis=1)
+it_park["planning_decision"] = planning_decisions(it_park["future_heat_risk"], MED_RISK, HIGH_RISK)
 
 it_park.to_csv(OUTPUT_PATH, index=False)
 
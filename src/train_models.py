@@ -8,11 +8,11 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
-BASE_PATH = "/kaggle/working"
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-RAW_DATA_PATH = f"{BASE_PATH}/data/raw/city_grid_raw.csv"
-MODEL_DIR = f"{BASE_PATH}/models"
-PROCESSED_DIR = f"{BASE_PATH}/data/processed"
+RAW_DATA_PATH = os.path.join(ROOT_DIR, "data", "raw", "city_grid_raw.csv")
+MODEL_DIR = os.path.join(ROOT_DIR, "models")
+PROCESSED_DIR = os.path.join(ROOT_DIR, "data", "processed")
 
 os.makedirs(MODEL_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
@@ -1,6 +1,16 @@
+import os
+import sys
+
 import joblib
 import pandas as pd
 
+# Vectorized classification lives with the backend so the API and the scripts share it
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from classification import (  # noqa: E402
+    RISK_LEVELS, PLANNING_DECISIONS, classify_risk_levels, planning_decisions, risk_thresholds,
+)
+from spatial import IT_PARK_BOUNDS, bounds_mask  # noqa: E402
+
 # -------------------------------------------------
 # Global feature definition (DO NOT CHANGE)
 # -------------------------------------------------
@@ -39,9 +49,7 @@ def predict_heat_risk(model, df: pd.DataFrame):
 # Risk classification helper
 # -------------------------------------------------
 def classify_risk(value, low_threshold, high_threshold):
-    if value >= high_threshold:
-        return "High"
-    elif value >= low_threshold:
-        return "Medium"
-    else:
-        return "Low"
+    """
+    Scalar form of classify_risk_levels; classify whole arrays with that instead.
+    """
+    return str(classify_risk_levels([value], low_threshold, high_threshold)[0])
@@ -2,20 +2,20 @@ import sys
 import os
 import json
 
-# Add project root to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
 
-from backend.services import SimulationEngine
+from services import SimulationEngine
 
 def test_geojson():
     engine = SimulationEngine()
-    geojson_str = engine.get_it_park_geojson()
+    geojson = engine.get_it_park_geojson()
     
-    if not geojson_str:
+    if not geojson:
         print("GeoJSON is None!")
         return
 
-    data = json.loads(geojson_str)
+    data = json.loads(geojson.body)
     print(f"Features count: {len(data.get('features', []))}")
     
     for f in data.get('features', []):
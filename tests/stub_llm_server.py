@@ -0,0 +1,70 @@
+"""
+Local stand-in for an LLM endpoint, for exercising the recommendation pipeline
+without network access. Answers POST {"prompt": ...} with {"text": ...} holding
+the JSON the planner prompt asks for.
+
+Run it and point the backend at it:
+    python tests/stub_llm_server.py --port 8765 --delay 0.5
+    LLM_ENDPOINT=http://127.0.0.1:8765/generate python backend/app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = {
+    "severity": "High",
+    "recommendations": [
+        "Stub: shade trees along the park access roads",
+        "Stub: district cooling for the office blocks",
+        "Stub: bus rapid transit feeder to the campus",
+    ],
+}
+
+
+def make_handler(delay, status):
+    class StubHandler(BaseHTTPRequestHandler):
+        calls = 0
+
+        def do_POST(self):
+            StubHandler.calls += 1
+            length = int(self.headers.get("Content-Length", 0))
+            json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(delay)
+
+            body = json.dumps({"text": "```json\n" + json.dumps(ANSWER) + "\n```"}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(port=0, delay=0.0, status=200):
+    """Starts the stub in a daemon thread; returns (server, url, handler class)."""
+    handler = make_handler(delay, status)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/generate", handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub LLM server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each answer")
+    parser.add_argument("--status", type=int, default=200, help="HTTP status to answer with")
+    args = parser.parse_args()
+
+    server, url, _ = start_stub_server(args.port, args.delay, args.status)
+    print(f"Stub LLM listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+
+# Add src and backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import indiem
+from services import SimulationEngine
+
+def test_batch_pipeline():
+    engine = SimulationEngine()
+
+    with tempfile.TemporaryDirectory() as out:
+        for workers, fmt in [(1, "geojson"), (2, "ndjson")]:
+            indiem.main([
+                "batch", "--output", out, "--years", "2025", "2040", "--scenarios", "Before", "After",
+                "--workers", str(workers), "--chunk-rows", "300", "--format", fmt,
+            ])
+
+            for year in [2025, 2040]:
+                for scenario in ["Before", "After"]:
+                    path = os.path.join(out, f"surface_{year}_{scenario}.{fmt}")
+                    with open(path) as f:
+                        if fmt == "geojson":
+                            features = json.load(f)["features"]
+                        else:
+                            features = [json.loads(line) for line in f]
+
+                    expected = engine.get_result(year, scenario).frame
+                    risk = np.array([f["properties"]["heat_risk_index"] for f in features])
+                    ids = [int(f["id"]) for f in features]
+                    if ids != list(range(len(expected))) or not np.allclose(risk, expected["heat_risk_index"]):
+                        print(f"❌ FAILED: {fmt} surface for {year}/{scenario} ({workers} workers) differs from the engine.")
+                        sys.exit(1)
+                    if {f["properties"]["planning_decision"] for f in features} - set(indiem.PLANNING_DECISIONS):
+                        print("❌ FAILED: Unknown planning decision in the export.")
+                        sys.exit(1)
+
+    print("✅ Batch Pipeline Verification Passed!")
+
+if __name__ == "__main__":
+    test_batch_pipeline()
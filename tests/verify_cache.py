@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, DATA_PATH
+
+def test_result_cache():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+    engine.warm_up(years=[2030])
+
+    first = engine.get_result(2030, "After")
+    again = engine.get_result(2030, "After")
+    if first is not again:
+        print("❌ FAILED: Warm result was recomputed instead of served from cache.")
+        sys.exit(1)
+
+    if engine.get_result(2030, "Before").etag == first.etag:
+        print("❌ FAILED: Different scenarios share an ETag.")
+        sys.exit(1)
+
+    # Touching the data file must invalidate every cached result
+    stat = os.stat(DATA_PATH)
+    try:
+        os.utime(DATA_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        refreshed = engine.get_result(2030, "After")
+    finally:
+        os.utime(DATA_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    if refreshed is first:
+        print("❌ FAILED: Cache was not invalidated after the data file changed.")
+        sys.exit(1)
+    if refreshed.etag != first.etag:
+        print("❌ FAILED: Same inputs produced a different payload after reload.")
+        sys.exit(1)
+
+    print("✅ Result Cache Verification Passed!")
+
+if __name__ == "__main__":
+    test_result_cache()
@@ -0,0 +1,62 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add backend, src and dashboard to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+
+from classification import classify_risk_levels, planning_decisions, risk_thresholds, PLANNING_DECISIONS
+from utils import classify_risk
+from services import SimulationEngine
+from grid_client import grid_frame_to_geodataframe
+
+def legacy_decision(value, med, high):
+    if value > high:
+        return PLANNING_DECISIONS[2]
+    elif value > med:
+        return PLANNING_DECISIONS[1]
+    return PLANNING_DECISIONS[0]
+
+def test_classification():
+    rng = np.random.default_rng(0)
+    values = rng.normal(15, 1, 10_000)
+    med, high = risk_thresholds(values)
+    # Exact threshold hits exercise the >= / > boundaries
+    values[:4] = [med, high, np.nextafter(med, -np.inf), np.nextafter(high, np.inf)]
+
+    levels = classify_risk_levels(values, med, high)
+    decisions = planning_decisions(values, med, high)
+    if not isinstance(levels, pd.Categorical) or not levels.ordered:
+        print("❌ FAILED: Classification should return an ordered Categorical.")
+        sys.exit(1)
+    if list(levels.astype(str)) != [classify_risk(v, med, high) for v in values]:
+        print("❌ FAILED: Risk levels differ from the scalar classify_risk.")
+        sys.exit(1)
+    if list(decisions.astype(str)) != [legacy_decision(v, med, high) for v in values]:
+        print("❌ FAILED: Planning decisions differ from the row-wise rules.")
+        sys.exit(1)
+    if not pd.isna(classify_risk_levels([np.nan], med, high)[0]):
+        print("❌ FAILED: NaN should stay missing.")
+        sys.exit(1)
+
+    engine = SimulationEngine()
+    df = engine.get_result(2040, "After").frame
+    expected = classify_risk_levels(df["heat_risk_index"], *engine.risk_thresholds)
+    if not (df["risk_level"].astype(str) == expected.astype(str)).all():
+        print("❌ FAILED: Prediction frames should carry the risk level of every cell.")
+        sys.exit(1)
+
+    gdf = grid_frame_to_geodataframe(engine.get_encoded(2040, "After", "binary").body)
+    gdf = gdf.sort_values(["x", "y"]).reset_index(drop=True)
+    if list(gdf["risk_level"].astype(str)) != list(df["risk_level"].astype(str)):
+        print("❌ FAILED: risk_level does not round-trip through the binary frame.")
+        sys.exit(1)
+
+    print(f"Risk levels 2040/After: {df['risk_level'].value_counts().to_dict()}")
+    print("✅ Risk Classification Verification Passed!")
+
+if __name__ == "__main__":
+    test_classification()
@@ -0,0 +1,72 @@
+import sys
+import os
+import threading
+
+# Add backend and dashboard to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+
+from werkzeug.serving import make_server
+from api_client import ApiClient, ApiError, neighbouring_views
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def test_dashboard_client():
+    # Slider neighbours: adjacent years first, then the other scenario
+    years, scenarios = [2025, 2030, 2035, 2040], ["Before", "After"]
+    if neighbouring_views(2030, "Before", years, scenarios) != [(2025, "Before"), (2035, "Before"), (2030, "After")]:
+        fail("Neighbouring views should be the adjacent years and the other scenario.")
+    if neighbouring_views(2040, "After", years, scenarios) != [(2035, "After"), (2040, "Before")]:
+        fail("The last year has a single neighbouring year.")
+
+    from app import app, engine
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ApiClient(f"http://127.0.0.1:{server.server_port}")
+    try:
+        # Concurrent fetches of one view share a single request and decoded frame
+        surface = client.predictions(2035, "After")
+        stats = client.stats(2035, "After")
+        analysis = client.impact_analysis(2035, wait=0)
+        if client.predictions(2035, "After") is not surface:
+            fail("Fetches of the same view should be memoized.")
+        frame = surface.result(timeout=120)
+        if len(frame) != len(engine.get_result(2035, "After").frame):
+            fail("The decoded grid should hold every cell.")
+        if stats.result(timeout=60)["heat_risk_index"]["breaks"] != engine.get_stats(2035, "After")["heat_risk_index"]["breaks"]:
+            fail("Stats should come from /api/stats.")
+        if "delta_metrics" not in analysis.result(timeout=60):
+            fail("Impact analysis should be fetched alongside the grid.")
+
+        # Prefetched neighbours are ready before they are asked for
+        client.prefetch(neighbouring_views(2035, "After", years, scenarios))
+        prefetched = client.predictions(2040, "After")
+        prefetched.result(timeout=120)
+        if client.predictions(2040, "After") is not prefetched:
+            fail("A prefetched view should be served from the memoized future.")
+
+        # Errors surface as ApiError and are not cached
+        bad = client.predictions(2035, "Nowhere")
+        try:
+            bad.result(timeout=30)
+            fail("An invalid scenario should raise ApiError.")
+        except ApiError:
+            pass
+        if client.predictions(2035, "Nowhere") is bad:
+            fail("Failed fetches should be retried, not memoized.")
+    finally:
+        server.shutdown()
+
+    try:
+        ApiClient("http://127.0.0.1:9").stats(2025, "Before").result(timeout=30)
+        fail("An unreachable backend should raise ApiError.")
+    except ApiError as e:
+        if "not reachable" not in str(e):
+            fail(f"Unexpected error message: {e}")
+
+    print("✅ Dashboard Client Verification Passed!")
+
+if __name__ == "__main__":
+    test_dashboard_client()
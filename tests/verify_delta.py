@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, ImpactAnalysisEngine
+
+def test_incremental_scenario():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+
+    for year in [2025, 2035]:
+        full = engine.get_prediction(year, "After", incremental=False)
+        delta = engine.get_prediction(year, "After", incremental=True)
+
+        if not full.equals(delta):
+            print(f"❌ FAILED: Incremental After prediction for {year} differs from a full run.")
+            sys.exit(1)
+
+    delta = engine.get_scenario_delta(2035, "After")
+    print(f"Cells re-predicted for the IT park: {len(delta.after)} of {len(engine.base_df)}")
+    if len(delta.after) == 0 or len(delta.after) >= len(engine.base_df):
+        print("❌ FAILED: Delta should cover only the IT park cells.")
+        sys.exit(1)
+
+    from_delta = ImpactAnalysisEngine.analyze_impact(delta)["delta_metrics"]
+    from_frames = ImpactAnalysisEngine.analyze_impact(
+        engine.get_prediction(2035, "Before"), engine.get_prediction(2035, "After", incremental=False)
+    )["delta_metrics"]
+    if from_delta != from_frames:
+        print("❌ FAILED: Impact metrics from the delta differ from the full frames.")
+        sys.exit(1)
+
+    print("✅ Incremental Scenario Verification Passed!")
+
+if __name__ == "__main__":
+    test_incremental_scenario()
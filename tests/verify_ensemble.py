@@ -0,0 +1,51 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, PROJECTION_RATES, project_features, apply_scenario
+from ensemble import EnsembleRunner, sample_rates
+
+def test_ensemble():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+    df = engine.base_df
+    args = (engine.predictor, engine.features, project_features, apply_scenario, df, 15)
+
+    # Zero spread: every member is the deterministic projection
+    fixed = sample_rates(PROJECTION_RATES, 8, seed=1, spread={})
+    bands = EnsembleRunner(workers=1).run(*args, "After", fixed)
+    expected = engine.get_prediction(2040, "After", incremental=False)["heat_risk_index"].to_numpy()
+    if not all(np.allclose(bands[k], expected) for k in ["mean", "p10", "p90"]):
+        print("❌ FAILED: A zero-spread ensemble should reproduce the deterministic prediction.")
+        sys.exit(1)
+
+    # Chunking and the process pool do not change the result
+    rates = sample_rates(PROJECTION_RATES, 64, seed=3)
+    serial = EnsembleRunner(workers=1).run(*args, "After", rates)
+    runner = EnsembleRunner(workers=2, task_rows=64 * 300)
+    pooled = runner.run(*args, "After", rates)
+    runner.shutdown()
+    if not all(np.array_equal(serial[k], pooled[k]) for k in serial):
+        print("❌ FAILED: Pooled, chunked ensemble differs from the in-process run.")
+        sys.exit(1)
+
+    result = engine.predict_ensemble(2040, "After", members=64, seed=3)
+    band = result["heat_risk_index"]
+    if not (np.all(band["p10"] <= band["mean"]) and np.all(band["mean"] <= band["p90"])):
+        print("❌ FAILED: Mean should lie within the P10/P90 band.")
+        sys.exit(1)
+    if (band["p90"] - band["p10"]).max() <= 0:
+        print("❌ FAILED: Sampled growth rates should produce a non-empty band.")
+        sys.exit(1)
+    if engine.predict_ensemble(2040, "After", members=64, seed=3) is not result:
+        print("❌ FAILED: Ensembles for supported years should be cached.")
+        sys.exit(1)
+
+    print(f"Mean P10-P90 width: {(band['p90'] - band['p10']).mean():.3f}")
+    print("✅ Ensemble Verification Passed!")
+
+if __name__ == "__main__":
+    test_ensemble()
@@ -0,0 +1,124 @@
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from executor import SimulationExecutor, Overloaded
+from metrics import SIMULATION_REQUESTS
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            fail("Timed out waiting for concurrent callers.")
+        time.sleep(0.01)
+
+def test_executor():
+    # --- Single flight and backpressure ---
+    executor = SimulationExecutor(workers=1, max_pending=1)
+    release, calls, results = threading.Event(), [], []
+
+    def slow():
+        calls.append(1)
+        release.wait(30)
+        return object()
+
+    coalesced = SIMULATION_REQUESTS.value(outcome="coalesced")
+    threads = [threading.Thread(target=lambda: results.append(executor.coalesce("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: SIMULATION_REQUESTS.value(outcome="coalesced") - coalesced == 7)
+    try:
+        executor.coalesce("other", slow)
+        fail("A new key beyond max_pending should be rejected.")
+    except Overloaded:
+        pass
+    release.set()
+    for t in threads:
+        t.join()
+    if len(calls) != 1 or len(results) != 8 or len({id(r) for r in results}) != 1:
+        fail(f"Identical concurrent calls should share one computation: {len(calls)} runs")
+    if executor.pending():
+        fail("Finished flights should be cleared.")
+
+    def broken():
+        raise RuntimeError("boom")
+    for _ in range(2):
+        try:
+            executor.coalesce("k", broken)
+            fail("Errors should propagate to the caller.")
+        except RuntimeError:
+            pass
+    if executor.coalesce("k", lambda: 42) != 42:
+        fail("A failed flight should not poison later calls.")
+
+    # --- Engine: coalesced cache misses ---
+    from services import SimulationEngine
+    engine = SimulationEngine()
+    engine.simulations = SimulationExecutor(workers=1)   # keep the gated method in this process
+    compute, runs, gate = engine._compute_result, [], threading.Event()
+
+    def gated(year, scenario_type, *args):
+        runs.append((year, scenario_type))
+        gate.wait(30)
+        return compute(year, scenario_type, *args)
+
+    engine._compute_result = gated
+    coalesced = SIMULATION_REQUESTS.value(outcome="coalesced")
+    frames = []
+    threads = [threading.Thread(target=lambda: frames.append(engine.get_result(2030, "Before"))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: SIMULATION_REQUESTS.value(outcome="coalesced") - coalesced == 5)
+    gate.set()
+    for t in threads:
+        t.join()
+    if runs != [(2030, "Before")] or len({id(f) for f in frames}) != 1:
+        fail(f"Concurrent identical requests should run one simulation: {runs}")
+    del engine._compute_result
+
+    # --- Process pool offload gives the in-process result ---
+    triangle = {"type": "Polygon", "coordinates": [[[80.15, 12.95], [80.24, 12.97], [80.20, 13.05], [80.15, 12.95]]]}
+    fp = engine.register_footprint(triangle)
+    pooled = SimulationEngine()
+    pooled.register_footprint(triangle)
+    pooled.simulations = SimulationExecutor(workers=2, max_pending=4)
+    try:
+        for scenario in ["Before", "After", fp.scenario_id]:
+            a, b = pooled.get_result(2035, scenario), engine.get_result(2035, scenario)
+            if a.body != b.body or a.etag != b.etag:
+                fail(f"Offloaded {scenario} result should match the in-process one.")
+            if (a.changed is None) != (b.changed is None) or (a.changed is not None and list(a.changed) != list(b.changed)):
+                fail(f"Offloaded {scenario} should keep the incremental changed rows.")
+        if pooled.simulations._pool is None:
+            fail("Cache misses should have run in the process pool.")
+    finally:
+        pooled.simulations.shutdown()
+
+    # --- 503 when the queue is full ---
+    from app import app, engine as app_engine
+    client = app.test_client()
+    created = client.post("/api/scenarios", json={"footprint": triangle, "impacts": {"traffic_delta": 123}})
+    sid = created.get_json()["scenario_id"]
+    limit = app_engine.simulations.max_pending
+    app_engine.simulations.max_pending = 0
+    try:
+        response = client.get(f"/api/predictions?year=2040&scenario={sid}")
+        if response.status_code != 503 or response.headers.get("Retry-After") is None:
+            fail(f"A full simulation queue should answer 503 with Retry-After: {response.status_code}")
+    finally:
+        app_engine.simulations.max_pending = limit
+    if client.get(f"/api/predictions?year=2040&scenario={sid}").status_code != 200:
+        fail("Requests should succeed once the queue has room.")
+
+    print("✅ Simulation Executor Verification Passed!")
+
+if __name__ == "__main__":
+    test_executor()
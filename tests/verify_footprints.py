@@ -0,0 +1,104 @@
+import sys
+import os
+import numpy as np
+from shapely.geometry import box, shape
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import services
+from services import SimulationEngine
+from spatial import IT_PARK_BOUNDS, bounds_mask
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def cell_box(index, x0, x1, y0, y1):
+    """Lon/lat box covering the footprints of cells x0..x1, y0..y1 exactly."""
+    (lon0, lat0), (dlon, dlat) = index.origin, index.step
+    return box(lon0 + (x0 - index.x0 - 0.5) * dlon, lat0 + (y0 - index.y0 - 0.5) * dlat,
+               lon0 + (x1 - index.x0 + 0.5) * dlon, lat0 + (y1 - index.y0 + 0.5) * dlat)
+
+def test_footprints():
+    engine = SimulationEngine()
+    index = engine.spatial_index
+    df = engine.base_df
+    b = IT_PARK_BOUNDS
+
+    # The IT park drawn as a polygon with default impacts reproduces the built-in "After"
+    park = cell_box(index, b.x_min, b.x_max, b.y_min, b.y_max)
+    footprint = engine.register_footprint(park.__geo_interface__)
+    expected = np.flatnonzero(bounds_mask(df["x"].to_numpy(), df["y"].to_numpy(), b))
+    if not np.array_equal(footprint.rows, expected) or not np.allclose(footprint.coverage, 1.0):
+        fail("IT park polygon should cover exactly the IT park cells.")
+    after = engine.get_result(2030, "After").frame
+    custom = engine.get_result(2030, footprint.scenario_id).frame
+    for col in engine.features + ["heat_risk_index"]:
+        if not np.allclose(after[col], custom[col]):
+            fail(f"Footprint scenario differs from the built-in After scenario in {col}.")
+
+    # Content addressing: same proposal -> same id and cached result; new impacts -> new id
+    reordered = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [list(park.exterior.coords)[::-1]]}}
+    if engine.register_footprint(reordered).scenario_id != footprint.scenario_id:
+        fail("The same footprint should map to the same scenario id.")
+    if engine.get_result(2030, footprint.scenario_id) is not engine.get_result(2030, footprint.scenario_id):
+        fail("Footprint results should be cached.")
+    stronger = engine.register_footprint(park.__geo_interface__, {"traffic_delta": 2000})
+    if stronger.scenario_id == footprint.scenario_id or stronger.impacts["temperature_delta"] != 1.5:
+        fail("Impact overrides should get their own id on top of the defaults.")
+
+    # Fractional coverage: half of one cell and a triangle against per-cell shapely areas
+    (lon0, lat0), (dlon, dlat) = index.origin, index.step
+    cell_area = dlon * dlat
+    half = box(lon0 + 4.5 * dlon, lat0 + 6.5 * dlat, lon0 + 5.0 * dlon, lat0 + 7.5 * dlat)
+    rows, coverage = index.coverage(half)
+    if len(rows) != 1 or not np.isclose(coverage[0], 0.5) or df["x"].iloc[rows[0]] != index.x0 + 5:
+        fail("Half a cell should be rasterized with coverage 0.5.")
+    triangle = {"type": "Polygon", "coordinates": [[[80.15, 12.95], [80.24, 12.97], [80.20, 13.05], [80.15, 12.95]]]}
+    partial = engine.register_footprint(triangle, {"temperature_delta": 2.0})
+    cells = [box(a - dlon / 2, c - dlat / 2, a + dlon / 2, c + dlat / 2) for a, c in zip(df["lon"], df["lat"])]
+    brute = np.array([cell.intersection(shape(triangle)).area / cell_area for cell in cells])
+    if not np.array_equal(partial.rows, np.flatnonzero(brute >= 1e-6)) or not np.allclose(partial.coverage, brute[brute >= 1e-6]):
+        fail("Vectorized coverage differs from per-cell intersection areas.")
+    projected = engine.get_result(2025, partial.scenario_id).frame
+    if not np.allclose(projected["temperature"] - df["temperature"], 2.0 * brute):
+        fail("Temperature impacts should scale with cell coverage.")
+
+    # Streaming (chunk offsets) and horizon use the same rasterized impacts
+    engine._results.pop(engine._cache_key(2035, partial.scenario_id), None)
+    chunks = list(engine.iter_prediction_chunks(2035, partial.scenario_id, chunk_rows=333))
+    streamed = np.concatenate([c["heat_risk_index"].to_numpy() for c in chunks])
+    buffered = engine.get_prediction(2035, partial.scenario_id, incremental=False)["heat_risk_index"]
+    if not np.allclose(streamed, buffered):
+        fail("Chunked footprint predictions differ from the full run.")
+    horizon = engine.predict_horizon([2035], partial.scenario_id)
+    if not np.allclose(horizon["series"]["heat_risk_index"][:, 0], buffered):
+        fail("Horizon footprint predictions differ from the full run.")
+
+    summary = engine.footprint_summary(footprint.scenario_id, 2030)
+    if summary["cells"] != len(expected) or summary["metrics"]["traffic"]["delta"] <= 0:
+        fail("Footprint summary is wrong.")
+
+    # Invalid proposals
+    for bad, impacts in [({"type": "Polygon", "coordinates": [[[70, 10], [71, 10], [71, 11], [70, 10]]]}, None),
+                         ({"type": "Point", "coordinates": [80.2, 13.0]}, None),
+                         (park.__geo_interface__, {"pm25_factor": -1}),
+                         (park.__geo_interface__, {"height": 3})]:
+        try:
+            engine.register_footprint(bad, impacts)
+            fail(f"Invalid proposal accepted: {bad['type']} {impacts}")
+        except ValueError:
+            pass
+
+    # Least recently used footprints are evicted with their cached results
+    services.FOOTPRINT_SCENARIO_ITEMS = 2
+    engine.register_footprint(half.__geo_interface__)
+    if engine.has_scenario(footprint.scenario_id) or any(
+            (k[0] if isinstance(k[0], tuple) else k)[1] == footprint.scenario_id for k in engine._results):
+        fail("Evicted footprint scenarios should drop their cached results.")
+
+    print("✅ Footprint Scenario Verification Passed!")
+
+if __name__ == "__main__":
+    test_footprints()
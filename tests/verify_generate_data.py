@@ -0,0 +1,55 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from generate_data import generate_chunks, hotspot_mask
+
+RAW_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "city_grid_raw.csv")
+
+def test_generator():
+    reference = pd.read_csv(RAW_PATH)
+    generated = pd.concat(generate_chunks(40, 40, seed=7, chunk_rows=300), ignore_index=True)
+
+    if list(generated.columns) != list(reference.columns) or len(generated) != len(reference):
+        print("❌ FAILED: 40x40 output does not have the original layout.")
+        sys.exit(1)
+    if not (generated[["x", "y"]].to_numpy() == reference[["x", "y"]].to_numpy()).all():
+        print("❌ FAILED: Cells are not in the original x-major order.")
+        sys.exit(1)
+    if not np.allclose(generated["dist_center"], reference["dist_center"]):
+        print("❌ FAILED: dist_center differs from the original grid.")
+        sys.exit(1)
+
+    # Same distributions as the original script (different random draws)
+    for col in ["temperature", "pm25", "traffic", "encroachment_index", "green_cover"]:
+        p = ks_2samp(generated[col], reference[col]).pvalue
+        print(f"{col:>20}: KS p-value {p:.3f}")
+        if p < 0.01:
+            print(f"❌ FAILED: {col} distribution differs from the original generator.")
+            sys.exit(1)
+
+    # Larger grids keep the per-cell distributions of the reference city
+    big = pd.concat(generate_chunks(400, 400, seed=7, chunk_rows=50_000), ignore_index=True)
+    if abs(big["temperature"].mean() - reference["temperature"].mean()) > 0.2:
+        print("❌ FAILED: Temperature gradient does not scale with the grid.")
+        sys.exit(1)
+    if abs((big["traffic"] > 1000).mean() - (reference["traffic"] > 1000).mean()) > 0.03:
+        print("❌ FAILED: Corridor share does not scale with the grid.")
+        sys.exit(1)
+
+    x, y = np.meshgrid(np.arange(100), np.arange(100), indexing="ij")
+    for layout in ["corridors", "clusters"]:
+        mask = hotspot_mask(x.ravel(), y.ravel(), 100, 100, layout, hotspots=3)
+        if not 0 < mask.mean() < 0.8:
+            print(f"❌ FAILED: {layout} layout produced a degenerate hotspot mask.")
+            sys.exit(1)
+
+    print("✅ Generator Verification Passed!")
+
+if __name__ == "__main__":
+    test_generator()
@@ -0,0 +1,52 @@
+import sys
+import os
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import Polygon
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, CELL_SIZE
+
+def reference_geojson(df):
+    """The original shapely/GeoPandas encoder, kept as the source of truth."""
+    half = CELL_SIZE / 2
+    polygons = [
+        Polygon([
+            (row["lon"] - half, row["lat"] - half),
+            (row["lon"] + half, row["lat"] - half),
+            (row["lon"] + half, row["lat"] + half),
+            (row["lon"] - half, row["lat"] + half)
+        ])
+        for _, row in df.iterrows()
+    ]
+    return gpd.GeoDataFrame(df, geometry=polygons, crs="EPSG:4326").to_json()
+
+def test_geojson_encoder():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+
+    for year, scenario in [(2025, "Before"), (2040, "After")]:
+        df = engine.get_prediction(year, scenario)
+        encoded = engine.to_geojson(df).decode("utf-8")
+        expected = reference_geojson(df)
+
+        print(f"{year}/{scenario}: {len(encoded)} bytes")
+        if encoded != expected:
+            print("❌ FAILED: Vectorized GeoJSON differs from the GeoPandas output.")
+            sys.exit(1)
+
+    # NaNs, ints, strings and a non-default index must round-trip the same way
+    df = engine.base_df.head(50).copy()
+    df.loc[df.index[::7], "pm25"] = np.nan
+    df["label"] = np.where(df["x"] > 0, "inner", "edge")
+    df.index = df.index + 1000
+    if engine.to_geojson(df).decode("utf-8") != reference_geojson(df):
+        print("❌ FAILED: Edge-case frame differs from the GeoPandas output.")
+        sys.exit(1)
+
+    print("✅ GeoJSON Encoder Verification Passed!")
+
+if __name__ == "__main__":
+    test_geojson_encoder()
@@ -0,0 +1,40 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine
+
+def test_prediction_horizon():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+
+    years = list(range(2025, 2061, 1))
+    for scenario in ["Before", "After"]:
+        horizon = engine.predict_horizon(years, scenario)
+        series = horizon["series"]
+        print(f"{scenario}: {series['heat_risk_index'].shape} (cells x years)")
+
+        # Every slice must equal the single-year simulation exactly
+        for i, year in enumerate(horizon["years"]):
+            if year not in (2025, 2033, 2040, 2060):
+                continue
+            single = engine.get_prediction(int(year), scenario, incremental=False)
+            for col in engine.features + ["heat_risk_index"]:
+                if not np.array_equal(series[col][:, i], single[col].to_numpy()):
+                    print(f"❌ FAILED: {col} for {year}/{scenario} differs from get_prediction.")
+                    sys.exit(1)
+
+    try:
+        engine.predict_horizon([2024, 2030])
+        print("❌ FAILED: Years before 2025 should be rejected.")
+        sys.exit(1)
+    except ValueError:
+        pass
+
+    print("✅ Prediction Horizon Verification Passed!")
+
+if __name__ == "__main__":
+    test_prediction_horizon()
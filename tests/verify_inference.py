@@ -0,0 +1,39 @@
+import sys
+import os
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, ModelService
+from inference import CompiledTreeEnsemble
+
+TOLERANCE = 1e-9
+
+def test_compiled_inference():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+    model = ModelService.get_model()
+    compiled = CompiledTreeEnsemble.from_gradient_boosting(model)
+    print(f"Compiled {compiled.n_trees} trees (max depth {compiled.max_depth})")
+
+    frames = [engine.get_prediction(year, "After")[engine.features] for year in [2025, 2040]]
+
+    # Wide random inputs, plus rows sitting exactly on split thresholds
+    rng = np.random.default_rng(0)
+    wide = rng.normal([32, 800, 60, 20], [4, 800, 40, 20], size=(50_000, 4))
+    on_split = np.repeat(frames[0].to_numpy()[:1], compiled.n_trees, axis=0)
+    for i, est in enumerate(model.estimators_[:, 0]):
+        on_split[i, est.tree_.feature[0]] = est.tree_.threshold[0]
+
+    for X in frames + [wide, on_split]:
+        diff = np.abs(compiled.predict(X) - model.predict(X)).max()
+        print(f"{len(X):>7} rows: max |compiled - sklearn| = {diff:.2e}")
+        if diff > TOLERANCE:
+            print("❌ FAILED: Compiled ensemble diverges from model.predict.")
+            sys.exit(1)
+
+    print("✅ Compiled Inference Verification Passed!")
+
+if __name__ == "__main__":
+    test_compiled_inference()
@@ -0,0 +1,62 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import services
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def test_it_park():
+    from app import app, engine
+    client = app.test_client()
+
+    response = client.get("/api/it-park")
+    if response.status_code != 200:
+        fail(f"/api/it-park should be served: {response.status_code}")
+    types = [f["properties"]["type"] for f in response.get_json()["features"]]
+    if types.count("Boundary") != 1 or "Point" not in types:
+        fail("The IT park GeoJSON should hold one Boundary and the points.")
+    if "no-cache" not in response.headers.get("Cache-Control", ""):
+        fail("Clients should revalidate the IT park layer.")
+    again = client.get("/api/it-park", headers={"If-None-Match": response.headers["ETag"]})
+    if again.status_code != 304 or again.data:
+        fail("An unchanged IT park layer should revalidate with an empty 304.")
+
+    # Built once, rebuilt only when the source file changes
+    original = services.IT_PARK_PATH
+    tmp = tempfile.mkdtemp()
+    try:
+        services.IT_PARK_PATH = os.path.join(tmp, "it_park.csv")
+        shutil.copy(original, services.IT_PARK_PATH)
+        first = engine.get_it_park_geojson()
+        if engine.get_it_park_geojson() is not first:
+            fail("The IT park GeoJSON should be cached while the file is unchanged.")
+
+        with open(services.IT_PARK_PATH) as f:
+            lines = f.read().splitlines()
+        with open(services.IT_PARK_PATH, "w") as f:
+            f.write("\n".join(lines[:-1]) + "\n")
+        rebuilt = engine.get_it_park_geojson()
+        if rebuilt.etag == first.etag:
+            fail("Editing the source file should rebuild the GeoJSON.")
+        if len(json.loads(rebuilt.body)["features"]) != len(json.loads(first.body)["features"]) - 1:
+            fail("The rebuilt GeoJSON should reflect the edited file.")
+
+        os.remove(services.IT_PARK_PATH)
+        if client.get("/api/it-park").status_code != 404:
+            fail("Missing IT park data should answer 404.")
+    finally:
+        services.IT_PARK_PATH = original
+        shutil.rmtree(tmp)
+
+    print("✅ IT Park Endpoint Verification Passed!")
+
+if __name__ == "__main__":
+    test_it_park()
@@ -0,0 +1,78 @@
+import sys
+import os
+import re
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ["SERVER_TIMING"] = "1"
+
+import metrics
+from metrics import Registry, server_timing_header
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? \S+$')
+
+def test_metrics():
+    # Exposition format: cumulative buckets, +Inf equals _count, escaped labels
+    registry = Registry()
+    latency = registry.histogram("test_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0))
+    hits = registry.counter("test_total", "Test counter", ["cache", "outcome"])
+    for value in [0.05, 0.1, 0.5, 3.0]:
+        latency.observe(value, stage='a"b')
+    hits.inc(cache="result", outcome="hit")
+    hits.inc(2, cache="result", outcome="hit")
+    text = registry.render()
+    expected = [
+        'test_seconds_bucket{stage="a\\"b",le="0.1"} 2',
+        'test_seconds_bucket{stage="a\\"b",le="1.0"} 3',
+        'test_seconds_bucket{stage="a\\"b",le="+Inf"} 4',
+        'test_seconds_count{stage="a\\"b"} 4',
+        'test_total{cache="result",outcome="hit"} 3',
+        '# TYPE test_seconds histogram',
+    ]
+    for line in expected:
+        if line not in text.splitlines():
+            fail(f"Missing exposition line: {line}")
+    if server_timing_header([("prediction", 0.002), ("prediction", 0.001), ("etag", 0.0005)]) != "prediction;dur=3.00, etag;dur=0.50":
+        fail("Server-Timing header should sum repeated stages in order.")
+
+    # End to end through the Flask app
+    from app import app
+    client = app.test_client()
+
+    response = client.get("/api/predictions?year=2040&scenario=After")
+    timing = response.headers.get("Server-Timing", "")
+    if response.status_code != 200 or "total;dur=" not in timing:
+        fail("Prediction responses should carry a Server-Timing header.")
+    client.get("/api/predictions?year=2040&scenario=After")
+    client.get("/api/predictions?year=2040&scenario=After&format=binary")
+    client.get("/tiles/heat_risk_index/2040/After/10/733/474.pbf")
+    client.get("/api/impact-analysis?year=2040")
+
+    response = client.get("/api/metrics")
+    if not response.content_type.startswith("text/plain; version=0.0.4"):
+        fail("Metrics should use the Prometheus text content type.")
+    text = response.get_data(as_text=True)
+    for line in text.splitlines():
+        if not line.startswith("#") and not SAMPLE.match(line):
+            fail(f"Malformed sample line: {line}")
+
+    for stage in ["copy", "projection", "prediction", "classification", "geojson_encode", "binary_encode",
+                  "tile_encode", "pyramid_build", "impact_deltas", "recommendations"]:
+        if metrics.STAGE_SECONDS.count(stage=stage) == 0:
+            fail(f"Stage '{stage}' was not recorded.")
+    if metrics.CACHE_REQUESTS.value(cache="result", outcome="hit") == 0:
+        fail("Result cache hits are not counted.")
+    if metrics.PAYLOAD_BYTES.count(kind="geojson") == 0 or metrics.PAYLOAD_BYTES.count(kind="tile") == 0:
+        fail("Payload sizes are not recorded.")
+    if 'indiem_http_request_seconds_count{endpoint="/api/predictions",method="GET",status="200"}' not in text:
+        fail("Request latency is not recorded per endpoint.")
+
+    print(response.get_data(as_text=True).count("\n"), "metric lines")
+    print("✅ Metrics Verification Passed!")
+
+if __name__ == "__main__":
+    test_metrics()
@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+
+# Add backend and tests to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.append(os.path.dirname(__file__))
+
+from recommendations import RecommendationService, HTTPLLMClient, rule_based_recommendations, round_deltas
+from stub_llm_server import start_stub_server
+
+DELTAS = {"temperature_rise": 1.5, "traffic_increase": 912.0, "pm25_worsening": 7.8, "green_cover_loss": 20.0}
+
+def wait_ready(service, rec_id, limit=5.0):
+    deadline = time.monotonic() + limit
+    while time.monotonic() < deadline:
+        advice = service.poll(rec_id)
+        if advice["status"] == "ready":
+            return advice
+        time.sleep(0.05)
+    return advice
+
+def test_recommendations():
+    # Fast stub: first request answers at once with rules, the poll returns the LLM answer
+    _, url, handler = start_stub_server(delay=0.3)
+    service = RecommendationService(HTTPLLMClient(url, timeout=2), timeout=2)
+
+    start = time.monotonic()
+    first = service.recommend(DELTAS)
+    elapsed = time.monotonic() - start
+    print(f"First response in {elapsed * 1000:.1f}ms: {first['status']} ({first['source']})")
+    if first["status"] != "pending" or first["source"] != "rules" or elapsed > 0.2:
+        print("❌ FAILED: A cache miss should return rule-based advice without waiting for the LLM.")
+        sys.exit(1)
+
+    ready = wait_ready(service, first["recommendation_id"])
+    if ready["source"] != "llm" or ready["severity"] != "High Impact":
+        print(f"❌ FAILED: Poll did not deliver the LLM answer: {ready}")
+        sys.exit(1)
+
+    # Nearby deltas round to the same key and hit the cache without another LLM call
+    nearby = dict(DELTAS, traffic_increase=905.0, temperature_rise=1.52)
+    hit = service.recommend(nearby)
+    if hit["status"] != "ready" or hit["source"] != "llm" or handler.calls != 1:
+        print("❌ FAILED: Rounded deltas should be served from the cache.")
+        sys.exit(1)
+
+    stats = service.stats()
+    print("Stats:", stats)
+    if stats["hits"] != 1 or stats["misses"] != 1 or stats["hit_rate"] != 0.5:
+        print("❌ FAILED: Cache hit rate is not reported correctly.")
+        sys.exit(1)
+
+    # Slow stub: the hard timeout resolves to the deterministic fallback
+    _, slow_url, _ = start_stub_server(delay=2.0)
+    slow = RecommendationService(HTTPLLMClient(slow_url, timeout=0.3), timeout=0.3)
+    advice = slow.recommend(DELTAS, wait=1.0)
+    advice = wait_ready(slow, advice["recommendation_id"])
+    if advice["source"] != "rules" or advice["recommendations"] != rule_based_recommendations(round_deltas(DELTAS))["recommendations"]:
+        print(f"❌ FAILED: Timed-out LLM call should fall back to rules: {advice}")
+        sys.exit(1)
+
+    # Failing stub: errors are reported and fall back as well
+    _, bad_url, _ = start_stub_server(status=500)
+    failing = RecommendationService(HTTPLLMClient(bad_url, timeout=1), timeout=1)
+    advice = failing.recommend(DELTAS, wait=1.0)
+    if advice["status"] != "ready" or advice["source"] != "rules" or failing.stats()["llm_failed"] != 1:
+        print(f"❌ FAILED: LLM errors should fall back to rules: {advice}")
+        sys.exit(1)
+
+    print("✅ Recommendation Pipeline Verification Passed!")
+
+if __name__ == "__main__":
+    test_recommendations()
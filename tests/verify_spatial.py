@@ -0,0 +1,91 @@
+import sys
+import os
+import numpy as np
+from shapely.geometry import Polygon, box
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine
+from spatial import GridIndex, IT_PARK_BOUNDS, bounds_mask
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def test_spatial_index():
+    engine = SimulationEngine()
+    df = engine.base_df
+    index = engine.spatial_index
+    lat, lon = df["lat"].to_numpy(), df["lon"].to_numpy()
+    x, y = df["x"].to_numpy(), df["y"].to_numpy()
+    step = index.step
+
+    # Point lookups: every centroid (nudged inside its cell) maps back to its own row
+    rows = index.locate(lat + 0.3 * step[1], lon - 0.3 * step[0])
+    if not np.array_equal(rows, np.arange(len(df))):
+        fail("Point lookup does not return the containing cell.")
+    if index.locate(0.0, 0.0) != -1:
+        fail("Points outside the grid should not match a cell.")
+
+    # The shared IT park footprint
+    expected = np.flatnonzero(bounds_mask(x, y, IT_PARK_BOUNDS))
+    if not len(expected) or not np.array_equal(index.in_bounds(IT_PARK_BOUNDS), expected):
+        fail("Grid-bounds window differs from the IT park mask.")
+
+    # Polygon queries against a brute-force scan of every cell footprint
+    half = step / 2
+    cells = [box(a - half[0], b - half[1], a + half[0], b + half[1]) for a, b in zip(lon, lat)]
+    polygons = [
+        Polygon([(80.15, 12.95), (80.24, 12.97), (80.20, 13.05)]),
+        box(lon[expected].min(), lat[expected].min(), lon[expected].max(), lat[expected].max()),
+        box(80.2201, 13.0101, 80.2202, 13.0102),   # inside a single cell
+        box(70.0, 10.0, 71.0, 11.0),               # outside the city
+    ]
+    for polygon in polygons:
+        brute = np.array([i for i, cell in enumerate(cells) if cell.intersects(polygon)], dtype=np.int64)
+        if not np.array_equal(index.intersecting(polygon), brute):
+            fail(f"Polygon query differs from a full scan for {polygon.wkt[:60]}.")
+    if not np.array_equal(index.intersecting(polygons[1]), expected):
+        fail("The IT park's bounding box should select exactly the IT park cells.")
+
+    # k-nearest against sorted planar distances
+    scale = np.cos(np.radians(lat.mean()))
+    for qlat, qlon, k in [(13.0, 80.2, 1), (12.93, 80.31, 9), (12.5, 79.9, 5)]:
+        rows, distances = index.nearest(qlat, qlon, k)
+        brute = np.hypot((lon - qlon) * scale, lat - qlat)
+        if not np.allclose(np.sort(brute)[:k] * 111_320.0, distances) or not np.allclose(brute[rows] * 111_320.0, distances):
+            fail(f"Nearest-cell query is wrong at ({qlat}, {qlon}).")
+
+    # Engine queries read the cached prediction for (year, scenario)
+    frame = engine.get_result(2035, "After").frame
+    row = expected[0]
+    cell = engine.query_point(2035, "After", lat[row], lon[row])
+    if cell is None or cell["x"] != x[row] or cell["heat_risk_index"] != frame["heat_risk_index"].iloc[row]:
+        fail("query_point returned the wrong cell.")
+    if engine.query_point(2035, "After", 0.0, 0.0) is not None:
+        fail("query_point outside the grid should return None.")
+
+    region = engine.query_region(2035, "After", {"type": "Feature", "geometry": polygons[1].__geo_interface__})
+    if region["count"] != len(expected) or not np.isclose(region["summary"]["traffic"], frame["traffic"].iloc[expected].mean()):
+        fail("query_region summary does not match the IT park cells.")
+    try:
+        engine.query_region(2035, "After", {"type": "Polygon", "coordinates": []})
+        fail("An empty polygon should be rejected.")
+    except ValueError:
+        pass
+
+    nearest = engine.query_nearest(2035, "After", lat[row], lon[row], k=5)
+    if len(nearest) != 5 or nearest[0]["x"] != x[row] or nearest[0]["distance_m"] != 0:
+        fail("query_nearest should start with the cell at the query point.")
+
+    # Rebuilt indexes are independent of the frame's row order
+    shuffled = df.sample(frac=1, random_state=0)
+    positions = GridIndex(shuffled, 0.02).locate(lat[row], lon[row])
+    if shuffled.iloc[int(positions)]["x"] != x[row]:
+        fail("Index built on a shuffled frame returns the wrong row.")
+
+    print("✅ Spatial Index Verification Passed!")
+
+if __name__ == "__main__":
+    test_spatial_index()
@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from stats import QuantileSketch, LayerStats, summarize, QUANTILE_LEVELS, SKETCH_RELATIVE_ACCURACY
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def test_stats():
+    # --- Sketch accuracy and merging ---
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.lognormal(3.0, 1.0, 50_000), -rng.random(500), np.zeros(20)])
+    full = QuantileSketch().add(values)
+    merged = QuantileSketch()
+    for chunk in np.array_split(rng.permutation(values), 9):
+        merged.merge(QuantileSketch().add(chunk))
+    if merged.to_dict() != full.to_dict():
+        fail("Merged chunk sketches should equal the sketch of all values.")
+    for q in QUANTILE_LEVELS + (0.0, 1.0):
+        exact = np.quantile(values, q, method="lower")
+        if abs(merged.quantile(q) - exact) > SKETCH_RELATIVE_ACCURACY * abs(exact) * 1.0001:
+            fail(f"Sketch quantile {q} off: {merged.quantile(q)} vs {exact}")
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(full.to_dict())))
+    if restored.to_dict() != full.to_dict() or restored.quantile(0.5) != full.quantile(0.5):
+        fail("Sketch should round-trip through JSON.")
+
+    # --- Exact summary and streamed summary agree ---
+    exact = summarize(values)
+    if exact["breaks"] != np.quantile(values, [0.2, 0.4, 0.6, 0.8], method="lower").tolist():
+        fail("Legend breaks should be the exact lower quintiles.")
+    if sum(exact["histogram"]["counts"]) != len(values) or exact["min"] != values.min():
+        fail("Histogram should count every value between min and max.")
+    streamed = LayerStats()
+    for chunk in np.array_split(values, 5):
+        streamed.add(chunk)
+    approx = streamed.summary()
+    if approx["exact"] or approx["count"] != len(values) or not np.isclose(approx["mean"], values.mean()):
+        fail("Streamed summary should keep exact count and mean.")
+    for a, b in zip(approx["breaks"], exact["breaks"]):
+        if abs(a - b) > SKETCH_RELATIVE_ACCURACY * abs(b) * 1.0001:
+            fail("Streamed breaks should be within the sketch accuracy.")
+    if sum(approx["histogram"]["counts"]) != len(values):
+        fail("Streamed histogram should count every value.")
+
+    # --- Engine and endpoint ---
+    from services import SimulationEngine, STATS_LAYERS
+    engine = SimulationEngine()
+    stats = engine.get_stats(2040, "After")
+    frame = engine.get_result(2040, "After").frame
+    if set(stats) != set(STATS_LAYERS):
+        fail("get_stats should summarize every stats layer.")
+    if stats["heat_risk_index"]["breaks"] != np.quantile(frame["heat_risk_index"], [0.2, 0.4, 0.6, 0.8], method="lower").tolist():
+        fail("Cached stats should match the cached prediction.")
+    if engine.get_stats(2040, "After") is not stats:
+        fail("Stats of a supported year should be cached.")
+    off_grid = engine.get_stats(2037, "After")
+    if off_grid["temperature"]["exact"] or off_grid["temperature"]["count"] != len(frame):
+        fail("Other horizon years should be summarized from streamed chunks.")
+    try:
+        engine.get_stats(2100, "Before")
+        fail("Years beyond the horizon should be rejected.")
+    except ValueError:
+        pass
+
+    from app import app
+    client = app.test_client()
+    response = client.get("/api/stats?year=2040&scenario=After&metric=heat_risk_index,traffic")
+    body = response.get_json()
+    if response.status_code != 200 or set(body["layers"]) != {"heat_risk_index", "traffic"}:
+        fail(f"/api/stats should return the selected layers: {response.status_code}")
+    if "sketch" in body["layers"]["traffic"] or body["layers"]["traffic"]["breaks"] != stats["traffic"]["breaks"]:
+        fail("Sketches should only be sent with ?sketch=1.")
+    with_sketch = client.get("/api/stats?year=2040&scenario=After&metric=pm25&sketch=1").get_json()
+    if QuantileSketch.from_dict(with_sketch["layers"]["pm25"]["sketch"]).count != len(frame):
+        fail("?sketch=1 should include a decodable sketch.")
+    again = client.get("/api/stats?year=2040&scenario=After&metric=heat_risk_index,traffic",
+                       headers={"If-None-Match": response.headers["ETag"]})
+    if again.status_code != 304:
+        fail("Unchanged stats should revalidate with 304.")
+    if client.get("/api/stats?metric=nope").status_code != 400 or client.get("/api/stats?scenario=nope").status_code != 400:
+        fail("Unknown metrics and scenarios should be rejected.")
+
+    print("✅ Layer Statistics Verification Passed!")
+
+if __name__ == "__main__":
+    test_stats()
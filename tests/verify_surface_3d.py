@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from services import SimulationEngine, SURFACE_3D_MAX_HEIGHT
+
+def fail(message):
+    print(f"❌ FAILED: {message}")
+    sys.exit(1)
+
+def test_surface_3d():
+    engine = SimulationEngine()
+    frame = engine.get_result(2035, "After").frame
+
+    # Heights span 0..SURFACE_3D_MAX_HEIGHT over the layer's own range
+    surface = engine.get_surface_3d(2035, "After", "traffic")
+    features = json.loads(surface.body)["features"]
+    if len(features) != len(frame):
+        fail("The 3D surface should carry one feature per cell.")
+    heights = np.array([f["properties"]["height"] for f in features])
+    values = np.array([f["properties"]["traffic"] for f in features])
+    if heights.min() != 0 or heights.max() != SURFACE_3D_MAX_HEIGHT:
+        fail(f"Heights should span 0..{SURFACE_3D_MAX_HEIGHT}: {heights.min()}..{heights.max()}")
+    if not np.array_equal(values, frame["traffic"].to_numpy()) or heights[values.argmax()] != heights.max():
+        fail("Heights should follow the layer values cell by cell.")
+    if engine.get_surface_3d(2035, "After", "traffic") is not surface:
+        fail("The 3D surface should be cached per (year, scenario, metric).")
+    if engine.get_surface_3d(2035, "After", "pm25").etag == surface.etag:
+        fail("Each metric should get its own surface.")
+    for args in [(2035, "After", "risk_level"), (2031, "After", "traffic")]:
+        try:
+            engine.get_surface_3d(*args)
+            fail(f"{args} should be rejected.")
+        except ValueError:
+            pass
+
+    from app import app
+    client = app.test_client()
+    response = client.get("/api/surface-3d?year=2035&scenario=After&metric=traffic")
+    if response.status_code != 200 or response.data != surface.body:
+        fail("/api/surface-3d should serve the cached surface.")
+    again = client.get("/api/surface-3d?year=2035&scenario=After&metric=traffic",
+                       headers={"If-None-Match": response.headers["ETag"]})
+    if again.status_code != 304:
+        fail("Unchanged surfaces should revalidate with 304.")
+    if client.get("/api/surface-3d?year=2035&metric=nope").status_code != 400:
+        fail("Unknown metrics should be rejected.")
+
+    print("✅ 3D Surface Verification Passed!")
+
+if __name__ == "__main__":
+    test_surface_3d()
@@ -0,0 +1,119 @@
+import sys
+import os
+import math
+import struct
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import services
+from services import SimulationEngine
+from tiles import TileCache
+
+def read_varint(buf, pos):
+    shift = result = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+def read_fields(buf):
+    """Minimal protobuf walker: yields (field, wire_type, value)."""
+    pos = 0
+    while pos < len(buf):
+        tag, pos = read_varint(buf, pos)
+        field, wire = tag >> 3, tag & 7
+        if wire == 0:
+            value, pos = read_varint(buf, pos)
+        elif wire == 1:
+            value, pos = struct.unpack("<d", buf[pos:pos + 8])[0], pos + 8
+        elif wire == 2:
+            n, pos = read_varint(buf, pos)
+            value, pos = buf[pos:pos + n], pos + n
+        else:
+            raise ValueError(f"unexpected wire type {wire}")
+        yield field, wire, value
+
+def read_packed(buf):
+    pos, out = 0, []
+    while pos < len(buf):
+        v, pos = read_varint(buf, pos)
+        out.append(v)
+    return out
+
+def decode_tile(buf):
+    """Returns {feature id: {property: value}} for the single layer in an MVT."""
+    layers = [v for f, _, v in read_fields(buf) if f == 3]
+    assert len(layers) == 1
+    keys, values, features = [], [], []
+    for f, _, v in read_fields(layers[0]):
+        if f == 3:
+            keys.append(v.decode())
+        elif f == 4:
+            values.append(next(read_fields(v))[2])
+        elif f == 2:
+            features.append(v)
+
+    decoded = {}
+    for feature in features:
+        fields = {f: v for f, _, v in read_fields(feature)}
+        tags = read_packed(fields[2])
+        geometry = read_packed(fields[4])
+        assert fields[3] == 3 and geometry[0] == 9 and geometry[3] == 26 and geometry[-1] == 15
+        decoded[fields[1]] = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+    return decoded
+
+def tiles_covering(df, z):
+    n = 2 ** z
+    lon0, lon1 = df["lon"].min(), df["lon"].max()
+    lat0, lat1 = df["lat"].min(), df["lat"].max()
+    tx = lambda lon: int((lon + 180) / 360 * n)
+    ty = lambda lat: int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return [(z, x, y) for x in range(tx(lon0) - 1, tx(lon1) + 2) for y in range(ty(lat1) - 1, ty(lat0) + 2)]
+
+def test_vector_tiles():
+    services.TILE_CACHE_DIR = tempfile.mkdtemp()
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+    engine.tile_cache = TileCache(memory_items=16, disk_dir=services.TILE_CACHE_DIR)
+    df = engine.get_result(2035, "After").frame
+    values = df["heat_risk_index"].to_numpy()
+
+    # Every zoom must account for each cell exactly once across the tiles covering the city
+    for z in [4, 9, 12]:
+        features = {}
+        for tile in tiles_covering(df, z):
+            features.update(decode_tile(engine.get_tile("heat_risk_index", 2035, "After", *tile)))
+        cells = sum(f["cells"] for f in features.values())
+        mean = sum(f["mean"] * f["cells"] for f in features.values()) / cells
+        peak = max(f["max"] for f in features.values())
+        print(f"z={z}: {len(features)} features covering {cells} cells")
+        if cells != len(df) or not np.isclose(mean, values.mean()) or peak != values.max():
+            print(f"❌ FAILED: Zoom {z} aggregates do not match the prediction grid.")
+            sys.exit(1)
+
+    # Served from disk after the memory tier is dropped
+    key_count = sum(len(files) for _, _, files in os.walk(services.TILE_CACHE_DIR))
+    tile = tiles_covering(df, 12)[5]
+    first = engine.get_tile("heat_risk_index", 2035, "After", *tile)
+    engine.tile_cache._memory.clear()
+    if engine.get_tile("heat_risk_index", 2035, "After", *tile) != first or key_count == 0:
+        print("❌ FAILED: Disk tile cache did not return the stored tile.")
+        sys.exit(1)
+
+    try:
+        engine.get_tile("heat_risk_index", 2035, "After", 3, 8, 0)
+        print("❌ FAILED: Out-of-range tile coordinates should be rejected.")
+        sys.exit(1)
+    except ValueError:
+        pass
+
+    print("✅ Vector Tile Verification Passed!")
+
+if __name__ == "__main__":
+    test_vector_tiles()
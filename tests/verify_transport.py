@@ -0,0 +1,41 @@
+import sys
+import os
+import numpy as np
+
+# Add backend and dashboard to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "backend"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+
+from services import SimulationEngine
+from grid_client import decode_grid_frame, grid_frame_to_geodataframe
+
+def test_binary_transport():
+    print("Initializing SimulationEngine...")
+    engine = SimulationEngine()
+    df = engine.get_result(2035, "After").frame
+
+    geojson = engine.get_encoded(2035, "After", "geojson").body
+    binary = engine.get_encoded(2035, "After", "binary").body
+    print(f"GeoJSON: {len(geojson)} bytes, binary: {len(binary)} bytes ({len(geojson) / len(binary):.1f}x smaller)")
+
+    header, columns = decode_grid_frame(binary)
+    if columns["heat_risk_index"].base is None:
+        print("❌ FAILED: Columns should be views over the response buffer.")
+        sys.exit(1)
+
+    for col in ["temperature", "traffic", "pm25", "green_cover", "heat_risk_index"]:
+        decoded = columns[col][df["y"].to_numpy(), df["x"].to_numpy()]
+        expected = df[col].to_numpy().astype(np.float32)
+        if not np.array_equal(decoded, expected):
+            print(f"❌ FAILED: {col} does not round-trip through the binary frame.")
+            sys.exit(1)
+
+    gdf = grid_frame_to_geodataframe(binary).sort_values(["x", "y"]).reset_index(drop=True)
+    if len(gdf) != len(df) or not np.allclose(gdf["lat"], df["lat"]) or not np.allclose(gdf["lon"], df["lon"]):
+        print("❌ FAILED: Cell coordinates rebuilt from the grid header do not match.")
+        sys.exit(1)
+
+    print("✅ Binary Transport Verification Passed!")
+
+if __name__ == "__main__":
+    test_binary_transport()